@@ -0,0 +1,239 @@
+"""
+Compact per-user feature summary for the Gemini prompt.
+
+The model used to get every transaction verbatim, so prompt size, memory and
+latency grew with history. `extract` reduces a user's last `months` to a
+fixed set of sections: monthly income/spend with top categories (from the
+daily rollups), top and recurring merchants, income sources with their
+cadence, and the largest outlying expenses. `fit_budget` then drops the
+lowest-ranked entries until the serialized summary fits a token budget.
+"""
+import hashlib
+import json
+import math
+import re
+import statistics
+from array import array
+from datetime import date, timedelta
+from typing import Any, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.category import Category
+from app.models.daily_rollup import DailyRollup
+from app.models.merchant import Merchant
+from app.models.transaction import Transaction
+from app.services import lookups
+
+TOP_CATEGORIES = 5
+TOP_MERCHANTS = 10
+MAX_INCOME_SOURCES = 5
+MAX_OUTLIERS = 5
+# An outlier is large against all expenses (robust z-score over median/MAD) and,
+# for a merchant seen before, at least OUTLIER_MERCHANT_RATIO times its usual charge
+OUTLIER_Z = 3.5
+OUTLIER_MERCHANT_RATIO = 2.0
+# A recurring charge shows up about once a month, in at least RECURRING_MONTHS
+# months, with a steady amount (coefficient of variation at most RECURRING_MAX_CV)
+RECURRING_MONTHS = 3
+RECURRING_MAX_CV = 0.4
+
+# Cut first when over budget: least informative entries of each list go before the monthly history
+TRIM_ORDER = ("outliers", "merchants", "income_sources", "recurring", "months")
+
+# Part of every fingerprint; bump when the extractor or prompt changes so old insights stop matching
+SUMMARY_VERSION = 1
+
+_NOISE = re.compile(r"[\d#*]+")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four characters per token for English and JSON."""
+    return math.ceil(len(text) / 4)
+
+def dumps(features: dict) -> str:
+    return json.dumps(features, separators=(",", ":"))
+
+def _month(d: date) -> str:
+    return f"{d.year:04d}-{d.month:02d}"
+
+def _merchant_key(description: Optional[str]) -> str:
+    # Card processors append store numbers and reference ids; group on the name
+    return " ".join(_NOISE.sub(" ", (description or "").lower()).split())
+
+def _cadence(dates: list[date]) -> str:
+    if len(dates) < 2:
+        return "once"
+    gap = statistics.median((b - a).days for a, b in zip(dates, dates[1:]))
+    for label, low, high in (("weekly", 6, 8), ("biweekly", 13, 14), ("semimonthly", 15, 17), ("monthly", 27, 33)):
+        if low <= gap <= high:
+            return label
+    return f"every ~{round(gap)} days"
+
+def window_start(today: date, months: int) -> date:
+    """First day of the month `months - 1` before today's."""
+    start = today.replace(day=1)
+    for _ in range(months - 1):
+        start = (start - timedelta(days=1)).replace(day=1)
+    return start
+
+def _monthly(db: Session, user_id: int, start: date, end: date) -> list[dict]:
+    rows = db.query(
+        DailyRollup.date, DailyRollup.category_id,
+        func.sum(DailyRollup.income_total), func.sum(DailyRollup.expense_total),
+    ).filter(
+        DailyRollup.user_id == user_id, DailyRollup.date >= start, DailyRollup.date <= end
+    ).group_by(DailyRollup.date, DailyRollup.category_id).all()
+    names = lookups.category_names(db, {category_id for _, category_id, _, _ in rows})
+    months: dict[str, dict] = {}
+    for day, category_id, income, expense in rows:
+        category = names.get(category_id)
+        m = months.setdefault(_month(day), {"income": 0.0, "spend": 0.0, "categories": {}})
+        m["income"] += float(income or 0)
+        m["spend"] += float(expense or 0)
+        if expense:
+            name = category or "uncategorized"
+            m["categories"][name] = m["categories"].get(name, 0.0) + float(expense)
+    result = []
+    for key in sorted(months):
+        m = months[key]
+        top = sorted(m["categories"].items(), key=lambda kv: -kv[1])[:TOP_CATEGORIES]
+        result.append({
+            "month": key,
+            "income": round(m["income"], 2),
+            "spend": round(m["spend"], 2),
+            "top_categories": {name: round(v, 2) for name, v in top},
+        })
+    return result
+
+def extract(db: Session, user_id: int, today: Optional[date] = None, months: int = 6) -> dict:
+    """Fixed-size summary of a user's last `months` calendar months.
+
+    Reads the daily rollups once and streams the window's transactions once;
+    memory grows with distinct merchants and the number of expenses (one
+    double each, for the outlier median), never with the rest of the history.
+    """
+    today = today or date.today()
+    start = window_start(today, months)
+    monthly = _monthly(db, user_id, start, today)
+
+    merchants: dict[str, dict] = {}
+    income: dict[str, dict] = {}
+    expenses = array("d")
+    rows = db.query(
+        Transaction.date, Transaction.amount, Category.name, Merchant.name
+    ).outerjoin(Category, Category.id == Transaction.category_id).outerjoin(
+        Merchant, Merchant.id == Transaction.merchant_id
+    ).filter(
+        Transaction.user_id == user_id, Transaction.date >= start, Transaction.date <= today
+    ).order_by(Transaction.date).yield_per(2000)
+    for day, amount, category, description in rows:
+        amount = float(amount)
+        key = _merchant_key(description) or (category or "unknown")
+        if amount >= 0:
+            src = income.setdefault(key, {"name": description or key, "total": 0.0, "dates": []})
+            src["total"] += amount
+            src["dates"].append(day)
+            continue
+        spend = -amount
+        expenses.append(spend)
+        m = merchants.get(key)
+        if m is None:
+            m = merchants[key] = {"name": description or key, "category": category, "count": 0,
+                                  "total": 0.0, "sq": 0.0, "months": set(), "max": 0.0, "max_date": day}
+        m["count"] += 1
+        m["total"] += spend
+        m["sq"] += spend * spend
+        m["months"].add(_month(day))
+        if spend > m["max"]:
+            m["max"], m["max_date"] = spend, day
+
+    outliers = []
+    if len(expenses) >= 8:
+        median = statistics.median(expenses)
+        mad = statistics.median(abs(x - median) for x in expenses) or 1.0
+        for m in merchants.values():
+            # 0.6745 scales the MAD to a standard deviation for normal data
+            if 0.6745 * (m["max"] - median) / mad <= OUTLIER_Z:
+                continue
+            if m["count"] > 1:
+                usual = (m["total"] - m["max"]) / (m["count"] - 1)
+                if m["max"] < OUTLIER_MERCHANT_RATIO * usual:
+                    continue
+            outliers.append({"date": m["max_date"].isoformat(), "merchant": m["name"],
+                             "category": m["category"], "amount": round(m["max"], 2)})
+        outliers = sorted(outliers, key=lambda o: -o["amount"])[:MAX_OUTLIERS]
+
+    recurring, top = [], []
+    for m in merchants.values():
+        mean = m["total"] / m["count"]
+        cv = math.sqrt(max(m["sq"] / m["count"] - mean * mean, 0.0)) / mean if mean else 0.0
+        entry = {"merchant": m["name"], "category": m["category"], "count": m["count"],
+                 "total": round(m["total"], 2)}
+        seen = len(m["months"])
+        if seen >= RECURRING_MONTHS and m["count"] <= seen + 1 and cv <= RECURRING_MAX_CV:
+            recurring.append({**entry, "typical_amount": round(mean, 2), "months_seen": seen})
+        top.append(entry)
+    recurring.sort(key=lambda e: -e["total"])
+    top.sort(key=lambda e: -e["total"])
+
+    sources = sorted(income.values(), key=lambda s: -s["total"])[:MAX_INCOME_SOURCES]
+    total_income = sum(m["income"] for m in monthly)
+    total_spend = sum(m["spend"] for m in monthly)
+    return {
+        "window": {"from": start.isoformat(), "to": today.isoformat(), "months": len(monthly)},
+        "totals": {
+            "income": round(total_income, 2),
+            "spend": round(total_spend, 2),
+            "net": round(total_income - total_spend, 2),
+            "expense_count": len(expenses),
+        },
+        "months": monthly,
+        "income_sources": [
+            {"source": s["name"], "total": round(s["total"], 2), "count": len(s["dates"]),
+             "cadence": _cadence(s["dates"])}
+            for s in sources
+        ],
+        "recurring": recurring[:TOP_MERCHANTS],
+        "merchants": top[:TOP_MERCHANTS],
+        "outliers": outliers,
+    }
+
+def fingerprint(db: Session, user_id: int, months: int, today: Optional[date] = None, salt: str = "") -> str:
+    """Content hash of the data a summary would be built from.
+
+    Covers the user's daily rollups inside the window plus the window start,
+    SUMMARY_VERSION and `salt` (model and budget settings), so it changes
+    whenever a transaction in the window is added, removed or re-amounted or
+    re-categorized, and when the window moves to a new month. One indexed
+    range scan; no transactions are read.
+    """
+    start = window_start(today or date.today(), months)
+    h = hashlib.sha256(f"{SUMMARY_VERSION}|{salt}|{start.isoformat()}".encode())
+    rows = db.query(
+        DailyRollup.date, DailyRollup.account_id, DailyRollup.category_id, DailyRollup.txn_count,
+        DailyRollup.income_total, DailyRollup.expense_total,
+    ).filter(
+        DailyRollup.user_id == user_id, DailyRollup.date >= start
+    ).order_by(DailyRollup.date, DailyRollup.account_id, DailyRollup.category_id)
+    for row in rows.yield_per(2000):
+        h.update("|".join(map(str, row)).encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+def fit_budget(features: dict, budget: int) -> dict:
+    """Trim list sections, last entries first and in TRIM_ORDER, until `dumps(features)` fits `budget` tokens.
+
+    Months are trimmed oldest first. Returns a trimmed copy; the input is left alone.
+    """
+    fitted = {k: (list(v) if isinstance(v, list) else v) for k, v in features.items()}
+    while estimate_tokens(dumps(fitted)) > budget:
+        for section in TRIM_ORDER:
+            if fitted.get(section):
+                fitted[section].pop(0 if section == "months" else -1)
+                break
+        else:
+            break
+    return fitted
+
+def summary_for_prompt(db: Session, user_id: int, budget: int, months: int = 6,
+                       today: Optional[date] = None) -> dict[str, Any]:
+    return fit_budget(extract(db, user_id, today=today, months=months), budget)
@@ -1,53 +1,60 @@
 from app.models.gemini_insight import GeminiInsight
 import datetime
-from app.db.session import SessionLocal
-from app.models.transaction import Transaction
-import google.generativeai as genai
-import os
+from app.ai import features
+from app.ai.providers import LLMUnavailable, ResilientLLM, make_llm
+from app.services import jobs
 import json
 import re
-from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Dict, Any
+import threading
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from typing import Dict, Any
 from app.config import settings
+from app.core.cache import register
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+REFRESH_JOB = "gemini_insights"
 
-def get_all_transactions() -> List[Dict[str, Any]]:
-    """Fetches all transactions from the database."""
-    db = SessionLocal()
-    try:
-        transactions = db.query(Transaction).all()
-        return [
-            {
-                "id": t.id,
-                "user_id": t.user_id,
-                "account_id": t.account_id,
-                "date": str(t.date),
-                "amount": float(t.amount),
-                "category": t.category,
-                "description": t.description,
-            }
-            for t in transactions
-        ]
-    finally:
-        db.close()
-
-def ask_gemini_for_insights(transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
-    prompt = (
-        "Given the following list of financial transactions, "
+def build_prompt(summary: Dict[str, Any]) -> str:
+    return (
+        "Given the following summary of a user's recent finances (amounts in their currency, "
+        "spend as positive numbers), "
         "generate a single JSON object with financial insights and recommendations. "
         "The object should have a key 'insights' which is an array of insight objects. "
         "Each insight object should follow this format: "
         "{\n  'id': 1,\n  'type': 'spending_reduction|emergency_fund|cash_flow|subscriptions|goals',\n  'title': 'Engaging headline (max 60 chars)',\n  'description': 'Helpful explanation with data (max 100 chars)',\n  'action_text': 'Button text (max 20 chars)',\n  'trend_direction': 'up|down|neutral',\n  'impact_level': 'high|medium|low',\n  'priority': 1,\n  'data_points': {\n    'primary_metric': 'Main number/percentage',\n    'comparison_period': 'Context period',\n    'supporting_details': 'Additional context'\n  }\n}\n"
-        "Transactions: " + str(transactions)
+        "Summary: " + features.dumps(summary)
     )
-    model = genai.GenerativeModel("gemini-2.5-flash")
+
+_llm: ResilientLLM | None = None
+_llm_lock = threading.Lock()
+
+def get_llm() -> ResilientLLM:
+    """The process-wide LLM client, built from settings on first use."""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            _llm = make_llm()
+        return _llm
+
+def set_llm(llm: ResilientLLM | None) -> ResilientLLM | None:
+    """Swap the LLM client (tests, benchmarks); returns the previous one."""
+    global _llm
+    with _llm_lock:
+        previous, _llm = _llm, llm
+        return previous
+
+def shutdown_llm() -> None:
+    previous = set_llm(None)
+    if previous is not None:
+        previous.shutdown()
+
+def ask_gemini_for_insights(summary: Dict[str, Any]) -> Dict[str, Any]:
+    prompt = build_prompt(summary)
     try:
-        response = model.generate_content(prompt)
-        raw_text = response.text
-    except Exception as e:
+        raw_text = get_llm().complete(prompt)
+    except LLMUnavailable as e:
         print(f"Error calling Gemini API: {e}")
-        raw_text = None
+        return _create_fallback_insight("Insights are temporarily unavailable.")
 
     if not raw_text:
         return _create_fallback_insight("Gemini did not return any content.")
@@ -85,45 +92,82 @@ def _create_fallback_insight(description: str) -> Dict[str, Any]:
         ]
     }
 
-def get_financial_insights() -> Dict[str, Any]:
-    user_id = 1
-    db = SessionLocal()
-    try:
-        latest = db.query(GeminiInsight).filter(GeminiInsight.user_id == user_id).order_by(GeminiInsight.created_at.desc()).first()
-        now = datetime.datetime.utcnow()
-        
-        if latest and (now - latest.created_at).days < 30:
-            return json.loads(latest.insights_json)
-
-        transactions = get_all_transactions()
-        result = ask_gemini_for_insights(transactions)
-
-        insight_obj = GeminiInsight(
-            user_id=user_id,
-            created_at=now,
-            insights_json=json.dumps(result)
-        )
-        db.add(insight_obj)
-        db.commit()
-        return result
-
-    except SQLAlchemyError as e:
-        print(f"Database error during insight retrieval or saving: {e}")
-        db.rollback()
-        transactions = get_all_transactions()
-        result = ask_gemini_for_insights(transactions)
-        insights = result.get("insights")
-        if insights and isinstance(insights, list) and len(insights) > 0 and insights[0]["id"] != 0:
-            try:
-                insight_obj = GeminiInsight(
-                    user_id=user_id,
-                    created_at=now,
-                    insights_json=json.dumps(result)
-                )
-                db.add(insight_obj)
-                db.commit()
-            except SQLAlchemyError as e:
-                print("Error saving Gemini insight:", e)
-                db.rollback()
-        db.close()
-        return result
\ No newline at end of file
+class InsightCacheStats:
+    """Counters for GET /debug/caches: how often a stored insight matched the user's data."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.llm_calls = 0
+        self.llm_calls_avoided = 0
+
+    def count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "llm_calls": self.llm_calls,
+            "llm_calls_avoided": self.llm_calls_avoided,
+        }
+
+insight_stats = register("gemini_insights", InsightCacheStats())
+
+def data_fingerprint(db: Session, user_id: int) -> str:
+    salt = f"{settings.LLM_PROVIDER}|{settings.GEMINI_MODEL}|{settings.GEMINI_PROMPT_TOKEN_BUDGET}"
+    return features.fingerprint(db, user_id, settings.GEMINI_SUMMARY_MONTHS, salt=salt)
+
+def latest_insight(db: Session, user_id: int) -> GeminiInsight | None:
+    return db.query(GeminiInsight).filter(
+        GeminiInsight.user_id == user_id
+    ).order_by(GeminiInsight.created_at.desc(), GeminiInsight.id.desc()).first()
+
+def cached_insight(db: Session, user_id: int, fingerprint: str) -> GeminiInsight | None:
+    """The stored insight generated from exactly this data, if any."""
+    return db.query(GeminiInsight).filter(
+        GeminiInsight.user_id == user_id, GeminiInsight.fingerprint == fingerprint
+    ).order_by(GeminiInsight.id.desc()).first()
+
+def prune_insights(db: Session, user_id: int, keep: int) -> int:
+    """Delete all but the user's `keep` newest insights; returns how many went."""
+    newest = select(GeminiInsight.id).where(GeminiInsight.user_id == user_id).order_by(
+        GeminiInsight.created_at.desc(), GeminiInsight.id.desc()
+    ).limit(keep)
+    return db.execute(
+        delete(GeminiInsight).where(GeminiInsight.user_id == user_id, GeminiInsight.id.not_in(newest))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+@jobs.handler(REFRESH_JOB)
+def refresh_insights(db: Session, user_id: int) -> None:
+    """Generate and store a new insight; a failed call leaves the last good one in place."""
+    fingerprint = data_fingerprint(db, user_id)
+    if cached_insight(db, user_id, fingerprint) is not None:
+        # Queued before an earlier job stored an insight for this same data
+        insight_stats.count(llm_calls_avoided=1)
+        return
+    summary = features.summary_for_prompt(
+        db, user_id, settings.GEMINI_PROMPT_TOKEN_BUDGET, months=settings.GEMINI_SUMMARY_MONTHS
+    )
+    # Don't hold a connection through the model call
+    db.rollback()
+    insight_stats.count(llm_calls=1)
+    result = ask_gemini_for_insights(summary)
+    first = result["insights"][0] if result.get("insights") else None
+    if first is None or first.get("id") == 0:
+        raise jobs.JobFailed(first["description"] if first else "Gemini returned no insights.")
+    db.add(GeminiInsight(
+        user_id=user_id,
+        created_at=datetime.datetime.utcnow(),
+        insights_json=json.dumps(result),
+        fingerprint=fingerprint
+    ))
+    db.flush()
+    prune_insights(db, user_id, settings.GEMINI_INSIGHTS_KEEP)
+    db.commit()
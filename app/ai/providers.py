@@ -0,0 +1,276 @@
+"""
+LLM providers and the resilience layer in front of them.
+
+A provider turns a prompt into text with a per-call timeout. `ResilientLLM`
+wraps one with an overall deadline, bounded retries with backoff, optional
+hedging (a second identical request when the first is slow; the first
+answer wins) and a circuit breaker that stops calling an upstream that keeps
+failing. Callers get `LLMUnavailable` and fall back instead of waiting.
+
+Providers:
+- "gemini": Google Gemini (needs google-generativeai and GEMINI_API_KEY)
+- "stub":   in-process fake with configurable latency and failure injection
+- "http":   the same fake behind `pluto llm-stub`, reached over HTTP
+"""
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Optional
+from app.config import settings
+
+class LLMError(Exception):
+    """A single provider call failed or timed out."""
+
+class LLMUnavailable(Exception):
+    """No answer within the deadline, retries exhausted or the circuit is open."""
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def generate(self, prompt: str, timeout: float) -> str:
+        """The model's text for `prompt`; raises `LLMError` on failure or after `timeout` seconds."""
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: str):
+        # Imported here so the API starts without the SDK when another provider is configured
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model)
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        try:
+            response = self.model.generate_content(prompt, request_options={"timeout": timeout})
+            text = response.text
+        except Exception as e:
+            raise LLMError(f"Gemini call failed: {e}") from e
+        if not text:
+            raise LLMError("Gemini did not return any content.")
+        return text
+
+STUB_RESPONSE = json.dumps({"insights": [{
+    "id": 1, "type": "goals", "title": "Stub insight", "description": "Generated by the local LLM stub",
+    "action_text": "Review", "trend_direction": "neutral", "impact_level": "low", "priority": 1,
+    "data_points": {"primary_metric": "N/A", "comparison_period": "N/A", "supporting_details": "stub"},
+}]})
+
+@dataclass
+class StubBehavior:
+    """Latency and failure injection shared by the in-process stub and `pluto llm-stub`.
+
+    Each call sleeps `latency` plus up to `jitter` seconds, then fails with
+    probability `failure_rate`; with probability `hang_rate` it instead
+    sleeps `hang_seconds`, like an upstream that accepted the request and
+    went quiet.
+    """
+    latency: float = 0.5
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    hang_rate: float = 0.0
+    hang_seconds: float = 300.0
+
+    def plan(self, rng: random.Random) -> tuple[float, bool]:
+        """(seconds to wait, whether the call then fails)."""
+        if rng.random() < self.hang_rate:
+            return self.hang_seconds, True
+        return self.latency + rng.uniform(0, self.jitter), rng.random() < self.failure_rate
+
+class StubProvider(LLMProvider):
+    name = "stub"
+
+    def __init__(self, behavior: StubBehavior, seed: Optional[int] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.behavior = behavior
+        self.rng = random.Random(seed)
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        with self._lock:
+            self.calls += 1
+            delay, fail = self.behavior.plan(self.rng)
+        # The stub honours the timeout the way a real client socket would
+        self.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise LLMError(f"stub timed out after {timeout:.2f}s")
+        if fail:
+            raise LLMError("stub injected failure")
+        return STUB_RESPONSE
+
+class HTTPStubProvider(LLMProvider):
+    name = "http"
+
+    def __init__(self, url: str):
+        import httpx
+        self.httpx = httpx
+        self.client = httpx.Client(base_url=url)
+
+    def generate(self, prompt: str, timeout: float) -> str:
+        try:
+            response = self.client.post("/generate", json={"prompt": prompt}, timeout=timeout)
+            response.raise_for_status()
+        except self.httpx.HTTPError as e:
+            raise LLMError(f"LLM stub call failed: {e!r}") from e
+        return response.json()["text"]
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `reset_after` seconds one trial call is let through."""
+
+    def __init__(self, failures: int, reset_after: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = failures
+        self.reset_after = reset_after
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.threshold <= 0 or self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at >= self.reset_after and not self._trial:
+                self._trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if ok:
+                self.consecutive = 0
+                self.opened_at = None
+                return
+            self.consecutive += 1
+            if self.threshold > 0 and (self.consecutive >= self.threshold or self.opened_at is not None):
+                self.opened_at = self.clock()
+
+class ResilientLLM:
+    """Deadline, retries, hedging and a circuit breaker around a provider.
+
+    Provider calls run on a bounded thread pool so that a hung upstream costs
+    a pool thread, never the caller: `complete` always returns or raises
+    within `deadline` seconds.
+    """
+
+    def __init__(self, provider: LLMProvider, timeout: float, deadline: float, retries: int = 0,
+                 backoff: float = 0.5, hedge_after: float = 0.0, breaker: Optional[CircuitBreaker] = None,
+                 max_concurrency: int = 8):
+        self.provider = provider
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker(0, 0)
+        self.pool = ThreadPoolExecutor(max_concurrency, thread_name_prefix="pluto-llm")
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "hedges": 0,
+                       "hedge_wins": 0, "deadline_exceeded": 0, "short_circuited": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def _attempt(self, prompt: str, budget: float) -> str:
+        timeout = min(self.timeout, budget)
+        end = time.monotonic() + timeout
+        primary = self.pool.submit(self.provider.generate, prompt, timeout)
+        pending: dict[Future, bool] = {primary: False}
+        if 0 < self.hedge_after < timeout:
+            done, _ = wait([primary], timeout=self.hedge_after)
+            if not done:
+                self._count("hedges")
+                pending[self.pool.submit(self.provider.generate, prompt, end - time.monotonic())] = True
+        error: Optional[BaseException] = None
+        while pending:
+            done, _ = wait(list(pending), timeout=max(end - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                hedge = pending.pop(future)
+                if future.exception() is None:
+                    if hedge:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        for future in pending:
+            future.cancel()
+        raise LLMError(str(error) if error else f"no answer within {timeout:.2f}s")
+
+    def complete(self, prompt: str) -> str:
+        self._count("calls")
+        start = time.monotonic()
+        last: Optional[BaseException] = None
+        for attempt in range(self.retries + 1):
+            remaining = self.deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                self._count("deadline_exceeded")
+                break
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise LLMUnavailable("LLM circuit is open; not calling the provider")
+            if attempt:
+                self._count("retries")
+            try:
+                text = self._attempt(prompt, remaining)
+            except LLMError as e:
+                self.breaker.record(False)
+                last = e
+                pause = min(self.backoff * 2 ** attempt, self.deadline - (time.monotonic() - start))
+                if attempt < self.retries and pause > 0:
+                    time.sleep(pause)
+                continue
+            self.breaker.record(True)
+            self._count("succeeded")
+            return text
+        self._count("failed")
+        raise LLMUnavailable(f"LLM call failed after {attempt + 1} attempt(s): {last}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        return {"provider": self.provider.name, "breaker": self.breaker.state, **counts,
+                "breaker_rejections": self.breaker.rejected}
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def make_provider(name: str) -> LLMProvider:
+    if name == "gemini":
+        return GeminiProvider(settings.GEMINI_MODEL, settings.GEMINI_API_KEY)
+    if name == "stub":
+        return StubProvider(StubBehavior(
+            latency=settings.LLM_STUB_LATENCY_SECONDS, jitter=settings.LLM_STUB_JITTER_SECONDS,
+            failure_rate=settings.LLM_STUB_FAILURE_RATE, hang_rate=settings.LLM_STUB_HANG_RATE,
+        ))
+    if name == "http":
+        return HTTPStubProvider(settings.LLM_STUB_URL)
+    raise ValueError(f"Unknown LLM_PROVIDER {name!r}; expected gemini, stub or http")
+
+def make_llm(provider: Optional[LLMProvider] = None) -> ResilientLLM:
+    return ResilientLLM(
+        provider or make_provider(settings.LLM_PROVIDER),
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        deadline=settings.LLM_DEADLINE_SECONDS,
+        retries=settings.LLM_RETRIES,
+        backoff=settings.LLM_BACKOFF_SECONDS,
+        hedge_after=settings.LLM_HEDGE_AFTER_SECONDS,
+        breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS),
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    )
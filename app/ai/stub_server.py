@@ -0,0 +1,36 @@
+"""
+Local stand-in for the LLM API, for load-testing timeouts, retries, hedging
+and the circuit breaker offline.
+
+    pluto llm-stub --port 8090 --latency 2 --jitter 1 --failure-rate 0.1 --hang-rate 0.02
+    LLM_PROVIDER=http LLM_STUB_URL=http://127.0.0.1:8090 uvicorn app.main:app
+"""
+import asyncio
+import random
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+from app.ai.providers import STUB_RESPONSE, StubBehavior
+
+class GenerateRequest(BaseModel):
+    prompt: str
+
+def create_app(behavior: StubBehavior, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Pluto LLM stub")
+    rng = random.Random(seed)
+    app.state.calls = 0
+
+    @app.post("/generate")
+    async def generate(payload: GenerateRequest):
+        app.state.calls += 1
+        delay, fail = behavior.plan(rng)
+        await asyncio.sleep(delay)
+        if fail:
+            raise HTTPException(status_code=503, detail="Injected failure")
+        return {"text": STUB_RESPONSE}
+
+    @app.get("/stats")
+    def stats():
+        return {"calls": app.state.calls, "behavior": vars(behavior)}
+
+    return app
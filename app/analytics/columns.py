@@ -0,0 +1,209 @@
+"""
+Per-user columnar transaction cache behind the /insights endpoints.
+
+`TransactionColumns` holds a user's history as parallel typed arrays in
+(date, id) order: day numbers (int32 ordinals), amounts in cents (int64),
+category ids (int16 while the ids fit) and account ids (int32), 18
+bytes per transaction instead of an ORM object or a row tuple. Date windows
+are bisected out of the day column and every report is computed straight
+from the arrays; amounts reach the statistics kernel as a numpy view of the
+cents buffer when numpy is installed.
+
+`ColumnCache` keeps the columns of recently active users and evicts the
+least recently used ones once their combined size passes its byte budget
+(COLUMN_CACHE_MB). Entries are tagged with the user's data version
+(app.services.ledger). Every write path bumps it in the same transaction,
+so the first lookup after a write misses and reloads, in every process,
+without explicit invalidation. Footprint and hit ratio appear under
+`transaction_columns` in GET /debug/caches.
+"""
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from datetime import date
+from typing import Optional
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+from app.analytics.kernel import column, np, summarize
+from app.config import settings
+from app.core.cache import register
+from app.models.transaction import Transaction
+from app.schemas.insight import MathematicalCalculations
+from app.services import ledger, lookups
+
+INT16_MAX = 2 ** 15 - 1
+
+class TransactionColumns:
+    def __init__(self, days: array, cents: array, categories: array, accounts: array, names: dict[int, str]):
+        self.days = days
+        self.cents = cents
+        self.categories = categories
+        self.accounts = accounts
+        # Names of the category ids that occur, for reports
+        self.names = names
+
+    @classmethod
+    def load(cls, db: Session, user_id: int, start_date: Optional[date] = None) -> "TransactionColumns":
+        """One indexed range scan of the user's transactions (from `start_date` on, if given)."""
+        stmt = select(
+            Transaction.date,
+            cast(func.round(Transaction.amount * 100), BigInteger),
+            func.coalesce(Transaction.category_id, 0),
+            Transaction.account_id,
+        ).where(Transaction.user_id == user_id)
+        if start_date is not None:
+            stmt = stmt.where(Transaction.date >= start_date)
+        days, cents, categories, accounts = [], [], [], []
+        for d, amount, category, account in db.execute(stmt.order_by(Transaction.date, Transaction.id)):
+            days.append(d.toordinal())
+            cents.append(amount)
+            categories.append(category)
+            accounts.append(account)
+        # Built from lists so each array is allocated once at its exact size
+        return cls(
+            array("i", days), array("q", cents),
+            array("h" if max(categories, default=0) <= INT16_MAX else "i", categories),
+            array("i", accounts), lookups.category_names(db, set(categories)),
+        )
+
+    def _take(self, rows) -> "TransactionColumns":
+        if isinstance(rows, slice):
+            return TransactionColumns(self.days[rows], self.cents[rows], self.categories[rows],
+                                      self.accounts[rows], self.names)
+        return TransactionColumns(*(
+            array(a.typecode, (a[i] for i in rows))
+            for a in (self.days, self.cents, self.categories, self.accounts)
+        ), self.names)
+
+    def window(self, start_date: date, end_date: Optional[date] = None) -> "TransactionColumns":
+        lo = bisect_left(self.days, start_date.toordinal())
+        hi = len(self.days) if end_date is None else bisect_right(self.days, end_date.toordinal())
+        return self._take(slice(lo, hi))
+
+    def for_account(self, account_id: int) -> "TransactionColumns":
+        return self._take([i for i, a in enumerate(self.accounts) if a == account_id])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(sys.getsizeof(a) for a in (self.days, self.cents, self.categories, self.accounts))
+
+    def amounts(self):
+        """Amounts in currency units, as the kernel's column type."""
+        if np is not None and self.cents:
+            return np.frombuffer(self.cents, dtype=np.int64) / 100
+        return column(c / 100 for c in self.cents)
+
+    def summary(self, basis: str = "amount") -> MathematicalCalculations:
+        return summarize(self.amounts(), basis=basis)
+
+    def income_and_spend(self) -> tuple[float, float]:
+        income = sum(c for c in self.cents if c > 0)
+        spend = -sum(c for c in self.cents if c < 0)
+        return income / 100, spend / 100
+
+    def category_spend(self) -> list[tuple]:
+        """(category name, spend) largest first; None names uncategorized spend."""
+        totals = defaultdict(int)
+        for c, category in zip(self.cents, self.categories):
+            if c < 0:
+                totals[category] -= c
+        return [
+            (self.names.get(category), total / 100)
+            for category, total in sorted(totals.items(), key=lambda x: x[1], reverse=True)
+        ]
+
+    def daily_spend(self) -> list[tuple]:
+        """(date, spend, expense count) per day with any spending, oldest first."""
+        days: dict[int, list] = {}
+        for d, c in zip(self.days, self.cents):
+            if c < 0:
+                day = days.setdefault(d, [0, 0])
+                day[0] -= c
+                day[1] += 1
+        return [(date.fromordinal(d), total / 100, count) for d, (total, count) in days.items()]
+
+    def distinct_categories(self) -> int:
+        return len(set(self.categories) - {0})
+
+class ColumnCache:
+    """Per-user TransactionColumns, LRU-evicted by total size; safe to share across threads."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[int, tuple[int, TransactionColumns]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _drop(self, user_id: int) -> None:
+        _, cols = self._data.pop(user_id)
+        self.nbytes -= cols.nbytes
+
+    def get(self, user_id: int, version: int) -> Optional[TransactionColumns]:
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] != version:
+                # Written since it was loaded
+                self._drop(user_id)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, version: int, cols: TransactionColumns) -> None:
+        size = cols.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if user_id in self._data:
+                self._drop(user_id)
+            self._data[user_id] = (version, cols)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def columns(self, db: Session, user_id: int) -> TransactionColumns:
+        """The user's full history, from the cache while it is current."""
+        version = ledger.current(db, user_id)
+        cols = self.get(user_id, version)
+        if cols is None:
+            cols = TransactionColumns.load(db, user_id)
+            self.put(user_id, version, cols)
+        return cols
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._data),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+column_cache = register("transaction_columns", ColumnCache(int(settings.COLUMN_CACHE_MB * 1024 * 1024)))
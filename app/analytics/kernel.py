@@ -0,0 +1,135 @@
+import math
+from array import array
+from typing import Any, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the streaming path covers every input
+    np = None
+
+from app.schemas.insight import MathematicalCalculations
+
+BASES = ("amount", "expense")
+
+def empty_summary() -> MathematicalCalculations:
+    return MathematicalCalculations(
+        mean=0, median=0, standard_deviation=0, variance=0,
+        min_value=0, max_value=0, total_transactions=0,
+        income_total=0, expense_total=0, net_flow=0
+    )
+
+def column(values: Iterable[Any]):
+    """Materialize an amount column, as a float64 array when numpy is available.
+
+    Without numpy the values are returned untouched so `summarize` can stream them.
+    """
+    if np is None:
+        return values
+    return np.fromiter((float(v) for v in values if v is not None), dtype=np.float64)
+
+def summarize(amounts, basis: str = "amount") -> MathematicalCalculations:
+    """Compute MathematicalCalculations for a column of signed amounts.
+
+    `amounts` is a numpy array or any iterable of numbers (Decimal, float,
+    str). Non-numeric and non-finite values are skipped. Income and expense
+    totals always cover every amount; the descriptive statistics (mean,
+    median, dispersion, min, max) cover either every amount (`basis="amount"`)
+    or only the expense magnitudes (`basis="expense"`).
+    """
+    if basis not in BASES:
+        raise ValueError(f"basis must be one of {BASES}")
+    if np is not None and isinstance(amounts, np.ndarray):
+        return _summarize_array(amounts, basis)
+    return _summarize_stream(amounts, basis)
+
+def make_summary(n, income, expense, k, mean, variance, median, lo, hi) -> MathematicalCalculations:
+    """Round raw moments into MathematicalCalculations; k is the number of basis values."""
+    if k == 0:
+        return empty_summary().model_copy(update={
+            "income_total": round(income, 2),
+            "expense_total": round(expense, 2),
+            "net_flow": round(income - expense, 2),
+        })
+    return MathematicalCalculations(
+        mean=round(mean, 2),
+        median=round(median, 2),
+        standard_deviation=round(math.sqrt(variance), 2),
+        variance=round(variance, 2),
+        min_value=round(lo, 2),
+        max_value=round(hi, 2),
+        total_transactions=n,
+        income_total=round(income, 2),
+        expense_total=round(expense, 2),
+        net_flow=round(income - expense, 2),
+    )
+
+def _summarize_stream(amounts: Iterable[Any], basis: str) -> MathematicalCalculations:
+    # One pass: totals, Welford mean/variance and min/max, while buffering
+    # the basis values into a compact double array for the median.
+    n = 0
+    income = expense = 0.0
+    k = 0
+    mean = m2 = 0.0
+    lo, hi = math.inf, -math.inf
+    values = array("d")
+    expense_only = basis == "expense"
+    for raw in amounts:
+        try:
+            x = float(raw)
+        except (TypeError, ValueError):
+            continue
+        if not math.isfinite(x):
+            continue
+        n += 1
+        if x > 0:
+            income += x
+        elif x < 0:
+            expense -= x
+        if expense_only:
+            if x >= 0:
+                continue
+            x = -x
+        k += 1
+        delta = x - mean
+        mean += delta / k
+        m2 += delta * (x - mean)
+        if x < lo:
+            lo = x
+        if x > hi:
+            hi = x
+        values.append(x)
+    variance = m2 / (k - 1) if k > 1 else 0.0
+    return make_summary(n, income, expense, k, mean, variance, _median(values), lo, hi)
+
+def _summarize_array(a, basis: str) -> MathematicalCalculations:
+    a = np.asarray(a, dtype=np.float64)
+    a = a[np.isfinite(a)]
+    spent = a < 0
+    expenses = -a[spent]
+    income = float(a[a > 0].sum())
+    expense = float(expenses.sum())
+    values = expenses if basis == "expense" else a
+    k = values.size
+    if k == 0:
+        return make_summary(a.size, income, expense, 0, 0, 0, 0, 0, 0)
+    variance = float(values.var(ddof=1)) if k > 1 else 0.0
+    return make_summary(
+        int(a.size), income, expense, k, float(values.mean()), variance,
+        _median(values), float(values.min()), float(values.max()),
+    )
+
+def _median(values) -> float:
+    """Median by selection (introselect via numpy.partition) rather than a full sort."""
+    k = len(values)
+    if k == 0:
+        return 0.0
+    mid = k // 2
+    if np is None:
+        # Pure-Python fallback: C-level sorting beats an interpreted quickselect.
+        ordered = sorted(values)
+        return ordered[mid] if k % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    arr = np.frombuffer(values, dtype=np.float64) if isinstance(values, array) else values
+    if k % 2:
+        return float(np.partition(arr, mid)[mid])
+    part = np.partition(arr, (mid - 1, mid))
+    return float((part[mid - 1] + part[mid]) / 2)
@@ -0,0 +1,198 @@
+import statistics
+from datetime import date, timedelta
+from typing import Iterable, Sequence
+from app.analytics.kernel import empty_summary
+from app.schemas.insight import (
+    CategoryBreakdown,
+    FinancialSummary,
+    MathematicalCalculations,
+    PlutoScore,
+    SpendingInsight,
+    TrendAnalysis,
+)
+
+SCORE_WINDOW_DAYS = 30
+SUMMARY_WINDOW_DAYS = 365
+
+def spending_insight(
+    days: int,
+    end_date: date,
+    txn_count: int,
+    income_total: float,
+    expense_stats: MathematicalCalculations,
+    category_totals: Iterable[tuple],
+    daily: Iterable[tuple],
+) -> SpendingInsight:
+    """Assemble SpendingInsight from window aggregates.
+
+    `expense_stats` is the kernel summary over expenses, `category_totals`
+    yields (category, total) largest first and `daily` yields
+    (date, expense_total, expense_count) per day.
+    """
+    total_spending = expense_stats.expense_total
+    if not total_spending:
+        return SpendingInsight(
+            total_spending=0,
+            average_daily=0,
+            top_category="",
+            spending_trend="stable",
+            category_breakdown=[],
+            mathematical_insights=empty_summary().model_copy(update={
+                "income_total": round(income_total, 2),
+                "net_flow": round(income_total, 2),
+            })
+        )
+
+    # Category breakdown with calculations
+    category_breakdown = [
+        CategoryBreakdown(
+            category=cat or "Other",
+            total=round(float(total), 2),
+            percentage=round((float(total) / total_spending) * 100, 2)
+        )
+        for cat, total in category_totals
+    ]
+
+    # Determine spending trend: average expense in the recent half of the window vs the older half
+    midpoint = end_date - timedelta(days=days // 2)
+    recent_total = recent_count = older_total = older_count = 0
+    for d, total, count in daily:
+        if d > midpoint:
+            recent_total += float(total); recent_count += count
+        else:
+            older_total += float(total); older_count += count
+
+    if recent_count and older_count:
+        recent_avg = recent_total / recent_count
+        older_avg = older_total / older_count
+
+        if recent_avg > older_avg * 1.1:
+            trend = "increasing"
+        elif recent_avg < older_avg * 0.9:
+            trend = "decreasing"
+        else:
+            trend = "stable"
+    else:
+        trend = "stable"
+
+    return SpendingInsight(
+        total_spending=round(total_spending, 2),
+        average_daily=round(total_spending / days, 2),
+        top_category=category_breakdown[0].category if category_breakdown else "",
+        spending_trend=trend,
+        category_breakdown=category_breakdown,
+        mathematical_insights=expense_stats.model_copy(update={
+            "total_transactions": txn_count,
+            "income_total": round(income_total, 2),
+            "net_flow": round(income_total - total_spending, 2),
+        })
+    )
+
+def trend_analysis(daily_totals: Sequence[float]) -> TrendAnalysis:
+    """Linear trend, volatility and a next-week projection over daily spend totals."""
+    if not daily_totals:
+        return TrendAnalysis(
+            trend_direction="stable",
+            trend_strength=0,
+            volatility=0,
+            prediction_next_week=0,
+            mathematical_analysis="Insufficient data for analysis"
+        )
+
+    # Calculate trend using linear regression
+    n = len(daily_totals)
+    if n >= 2:
+        x_values = list(range(n))
+        y_values = daily_totals
+
+        # Simple linear regression
+        x_mean = statistics.mean(x_values)
+        y_mean = statistics.mean(y_values)
+
+        numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values))
+        denominator = sum((x - x_mean) ** 2 for x in x_values)
+
+        if denominator != 0:
+            slope = numerator / denominator
+            trend_direction = "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable"
+            trend_strength = abs(slope)
+        else:
+            trend_direction = "stable"
+            trend_strength = 0
+    else:
+        trend_direction = "stable"
+        trend_strength = 0
+
+    # Calculate volatility (standard deviation)
+    volatility = statistics.stdev(daily_totals) if len(daily_totals) > 1 else 0
+
+    # Simple prediction for next week
+    recent_avg = statistics.mean(daily_totals[-7:]) if len(daily_totals) >= 7 else statistics.mean(daily_totals)
+    prediction_next_week = round(recent_avg * 7, 2)
+
+    # Mathematical analysis summary
+    if n >= 10:
+        analysis = f"Based on {n} days of data. Trend: {trend_direction}, Volatility: {volatility:.2f}, Prediction: ${prediction_next_week:.2f}"
+    elif n >= 5:
+        analysis = f"Limited data ({n} days). Trend: {trend_direction}, Volatility: {volatility:.2f}"
+    else:
+        analysis = f"Insufficient data ({n} days) for reliable analysis"
+
+    return TrendAnalysis(
+        trend_direction=trend_direction,
+        trend_strength=round(trend_strength, 4),
+        volatility=round(volatility, 2),
+        prediction_next_week=prediction_next_week,
+        mathematical_analysis=analysis
+    )
+
+def pluto_score(income: float, spend: float, distinct_cats: int) -> PlutoScore:
+    """Score = 70% savings rate + 30% category diversity (capped at 6 categories)."""
+    savings_rate = (income - spend) / income if income > 0 else 0.0
+    diversity = min(distinct_cats, 6) / 6.0
+    score = max(0, min(100, round((0.7 * savings_rate + 0.3 * diversity) * 100, 2)))
+    return PlutoScore(
+        score=score,
+        window_days=SCORE_WINDOW_DAYS,
+        income_30d=round(income, 2),
+        spend_30d=round(spend, 2),
+        savings_rate=round(savings_rate, 3),
+        category_diversity=distinct_cats,
+    )
+
+def financial_summary(
+    balances: Iterable,
+    totals: MathematicalCalculations,
+    math_summary: MathematicalCalculations,
+) -> FinancialSummary:
+    """Combine account balances, all-time totals and the yearly summary."""
+    total_balance = 0
+    account_count = 0
+    for balance in balances:
+        account_count += 1
+        try:
+            balance = float(balance)
+            if not (balance == float('inf') or balance == float('-inf') or balance != balance):
+                total_balance += balance
+        except (ValueError, TypeError):
+            continue
+
+    if not totals.total_transactions:
+        return FinancialSummary(
+            total_balance=0,
+            total_income=0,
+            total_expenses=0,
+            net_worth=0,
+            account_count=account_count,
+            mathematical_summary=empty_summary()
+        )
+
+    net_worth = totals.income_total - totals.expense_total
+    return FinancialSummary(
+        total_balance=round(total_balance, 2),
+        total_income=round(totals.income_total, 2),
+        total_expenses=round(totals.expense_total, 2),
+        net_worth=round(net_worth, 2),
+        account_count=account_count,
+        mathematical_summary=math_summary
+    )
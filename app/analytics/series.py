@@ -0,0 +1,122 @@
+"""
+Time-bucketed series for charts, aggregated from the daily rollups.
+
+`series` sums a user's rollups per day, week (starting Monday) or calendar
+month, optionally split by category or account, with the bucketing done in
+SQL where the dialect can truncate dates (SQLite, PostgreSQL); elsewhere the
+query groups by day and the days are folded into buckets here. Either way
+one row comes back per (bucket, group) with any activity, never one per
+transaction. The result is dense: every group has a value for every bucket
+in the window, 0 where nothing happened, aligned with `buckets`.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.orm import Session
+from app.models.account import Account
+from app.models.daily_rollup import DailyRollup
+from app.schemas.insight import SeriesLine, TimeSeries
+from app.services import lookups
+
+BUCKETS = ("day", "week", "month")
+METRICS = ("spend", "income", "net")
+GROUPS = ("category", "account")
+# Two years of days
+MAX_PERIODS = 731
+
+def bucket_start(d: date, bucket: str) -> date:
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+def bucket_starts(end_date: date, bucket: str, periods: int) -> list[date]:
+    """Starts of the `periods` buckets ending with the one containing `end_date`, oldest first."""
+    starts = [bucket_start(end_date, bucket)]
+    for _ in range(periods - 1):
+        starts.append(bucket_start(starts[-1] - timedelta(days=1), bucket))
+    starts.reverse()
+    return starts
+
+def _bucket_column(dialect: str, bucket: str):
+    d = DailyRollup.date
+    if bucket == "day":
+        return d
+    if dialect == "sqlite":
+        if bucket == "week":
+            # Forward to the week's Sunday (or stay on it), then back to its Monday
+            return func.date(d, "weekday 0", "-6 days", type_=Date)
+        return func.date(d, "start of month", type_=Date)
+    if dialect == "postgresql":
+        return cast(func.date_trunc(bucket, d), Date)
+    return d
+
+def _metric(metric: str):
+    if metric == "spend":
+        return func.sum(DailyRollup.expense_total), DailyRollup.expense_count > 0
+    if metric == "income":
+        return func.sum(DailyRollup.income_total), DailyRollup.income_count > 0
+    return func.sum(DailyRollup.income_total - DailyRollup.expense_total), None
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+def _names(db: Session, user_id: int, group_by: str, keys: set) -> dict:
+    if group_by == "category":
+        names = lookups.category_names(db, keys)
+        return {key: names.get(key, "Other") for key in keys}
+    return dict(db.execute(
+        select(Account.id, Account.name).where(Account.user_id == user_id, Account.id.in_(keys))
+    ).all())
+
+def series(
+    db: Session, user_id: int, bucket: str = "month", metric: str = "spend",
+    group_by: Optional[str] = None, periods: int = 12, end_date: Optional[date] = None,
+) -> TimeSeries:
+    """Zero-filled `metric` totals for the last `periods` buckets up to `end_date` (default today)."""
+    end_date = end_date or date.today()
+    starts = bucket_starts(end_date, bucket, periods)
+    bucket_col = _bucket_column(db.get_bind().dialect.name, bucket).label("bucket")
+    value, active = _metric(metric)
+    columns = [bucket_col]
+    if group_by == "category":
+        columns.append(DailyRollup.category_id)
+    elif group_by == "account":
+        columns.append(DailyRollup.account_id)
+    stmt = select(*columns, value).where(
+        DailyRollup.user_id == user_id, DailyRollup.date >= starts[0], DailyRollup.date <= end_date
+    ).group_by(*columns)
+    if active is not None:
+        stmt = stmt.where(active)
+
+    position = {start: i for i, start in enumerate(starts)}
+    lines: dict = defaultdict(lambda: [0.0] * len(starts))
+    for row in db.execute(stmt):
+        key = row[1] if group_by else None
+        lines[key][position[bucket_start(_as_date(row[0]), bucket)]] += float(row[-1] or 0)
+
+    totals = [0.0] * len(starts)
+    for values in lines.values():
+        for i, v in enumerate(values):
+            totals[i] += v
+    result = []
+    if group_by:
+        names = _names(db, user_id, group_by, set(lines))
+        result = sorted(
+            (SeriesLine(
+                id=key or None, name=names.get(key, "Other"),
+                total=round(sum(values), 2), values=[round(v, 2) for v in values],
+            ) for key, values in lines.items()),
+            key=lambda line: abs(line.total), reverse=True,
+        )
+    return TimeSeries(
+        bucket=bucket, metric=metric, group_by=group_by,
+        start_date=starts[0], end_date=end_date, buckets=starts,
+        totals=[round(v, 2) for v in totals], series=result,
+    )
@@ -0,0 +1,78 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Float, case, func, literal
+from sqlalchemy.orm import Session
+from app.analytics.kernel import column, make_summary, summarize
+from app.models.transaction import Transaction
+from app.schemas.insight import MathematicalCalculations
+
+# Dialects whose aggregate/ordering support the pushdown path relies on.
+PUSHDOWN_DIALECTS = {"sqlite", "postgresql"}
+
+def transaction_filters(user_id: int, start_date: date, end_date: date, account_id: Optional[int] = None):
+    filters = [
+        Transaction.user_id == user_id,
+        Transaction.date >= start_date,
+        Transaction.date <= end_date,
+    ]
+    if account_id is not None:
+        filters.append(Transaction.account_id == account_id)
+    return filters
+
+def summarize_transactions(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    account_id: Optional[int] = None,
+) -> MathematicalCalculations:
+    """MathematicalCalculations over a user's transactions, aggregated by the database.
+
+    Count, sum, min, max, mean and income/expense totals come back as one
+    aggregate row, with PostgreSQL's var_samp and percentile_cont. SQLite
+    has neither: a second aggregate sums the deviations from that mean (a
+    corrected two-pass variance, which unlike the raw sum of squares does not
+    cancel away for large amounts) and the median is an ordered-offset query
+    reading at most two rows. Dialects outside PUSHDOWN_DIALECTS stream the
+    amount column through the Python kernel instead.
+    """
+    filters = transaction_filters(user_id, start_date, end_date, account_id)
+    dialect = db.get_bind().dialect.name
+    if dialect not in PUSHDOWN_DIALECTS:
+        return summarize(column(a for (a,) in db.query(Transaction.amount).filter(*filters)))
+
+    amt = Transaction.amount
+    aggregates = [
+        func.count(amt),
+        func.min(amt),
+        func.max(amt),
+        func.avg(amt),
+        func.coalesce(func.sum(case((amt > 0, amt), else_=0)), 0),
+        func.coalesce(func.sum(case((amt < 0, -amt), else_=0)), 0),
+    ]
+    if dialect == "postgresql":
+        aggregates += [func.var_samp(amt), func.percentile_cont(0.5).within_group(amt)]
+    row = db.query(*aggregates).filter(*filters).one()
+
+    n = row[0] or 0
+    if n == 0:
+        return make_summary(0, 0.0, 0.0, 0, 0, 0, 0, 0, 0)
+    mean = float(row[3])
+    if dialect == "postgresql":
+        variance = float(row[6] or 0)
+        median = float(row[7])
+    else:
+        variance = _variance(db, filters, n, mean)
+        middle = db.query(amt).filter(*filters).order_by(amt).offset((n - 1) // 2).limit(2 - n % 2).all()
+        median = sum(float(m) for (m,) in middle) / len(middle)
+    return make_summary(
+        n, float(row[4]), float(row[5]), n, mean, variance, median, float(row[1]), float(row[2])
+    )
+
+def _variance(db: Session, filters: list, n: int, mean: float) -> float:
+    """Sample variance from the deviations about `mean`; the sum of the deviations corrects its rounding."""
+    if n < 2:
+        return 0.0
+    deviation = Transaction.amount - literal(mean, Float)
+    sum_sq, sum_dev = db.query(func.sum(deviation * deviation), func.sum(deviation)).filter(*filters).one()
+    return max(float(sum_sq) - float(sum_dev) ** 2 / n, 0.0) / (n - 1)
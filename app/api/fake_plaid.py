@@ -1,28 +1,60 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from typing import Optional
+from app.core.conditional import conditional
+from app.core.pagination import InvalidCursor
+from app.core.responses import fast_json
+from app.db.session import Database
+from app.core.principals import Principal
 from app.deps import get_db, get_current_user
-from app.schemas.plaid_fake import PlaidTransactionsGetResponse
-from app.services.fake_plaid import plaidish_transactions_get
+from app.schemas.plaid_fake import PlaidTransactionsGetResponse, PlaidTransactionsSyncResponse
+from app.services.fake_plaid import plaidish_transactions_get, plaidish_transactions_sync
 
 router = APIRouter(prefix="/fake/plaid", tags=["fake-plaid"])
 
 @router.get("/transactions", response_model=PlaidTransactionsGetResponse)
-def transactions_get(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+async def transactions_get(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    user: Principal = Depends(get_current_user),
     account_id: str = Query("12345"),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    include_total: Optional[bool] = Query(None, description="Force (true) or skip (false) an exact count"),
 ):
-    return plaidish_transactions_get(
-        db=db,
-        user_id=user.id,
-        account_id_label=account_id,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        page = await conditional(request, response, db, user.id, lambda: db.run(
+            plaidish_transactions_get,
+            user_id=user.id,
+            account_id_label=account_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+        ))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fast_json(page, response)
+
+@router.get("/transactions/sync", response_model=PlaidTransactionsSyncResponse)
+async def transactions_sync(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous call; omit for a full initial sync"),
+    count: int = Query(100, ge=1, le=500),
+):
+    """Added, modified and removed transactions since `cursor`; call again while has_more is true."""
+    try:
+        page = await conditional(request, response, db, user.id, lambda: db.run(
+            plaidish_transactions_sync, user.id, cursor=cursor, count=count
+        ))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return fast_json(page, response)
@@ -0,0 +1,145 @@
+import argparse
+import os
+import time
+from datetime import date
+from app.config import settings
+from app.core.security import hash_password
+from app.db.init_db import init_db
+from app.db.session import SessionLocal
+from app.services import balances, ledger, rollups, scores, seeding
+
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    """Recompute daily rollups from raw transactions (backfill for existing databases)."""
+    init_db()
+    db = SessionLocal()
+    try:
+        written = rollups.rebuild(db, user_id=args.user_id)
+        if args.user_id is not None:
+            ledger.bump(db, args.user_id)
+        else:
+            ledger.bump_all(db)
+        db.commit()
+        scope = f"user {args.user_id}" if args.user_id is not None else "all users"
+        print(f"Rebuilt {written} daily rollup rows for {scope}")
+    finally:
+        db.close()
+
+def reconcile_balances(args: argparse.Namespace) -> None:
+    """Check stored account balances against their transactions and repair any drift."""
+    init_db()
+    db = SessionLocal()
+    try:
+        report = balances.reconcile(db, user_id=args.user_id, batch_size=args.batch_size, repair=not args.dry_run)
+        for d in report["drift"]:
+            print(f"account {d['account_id']} (user {d['user_id']}): stored {d['stored']}, transactions sum to {d['actual']}")
+        print(f"Checked {report['checked']} accounts, {report['drifted']} drifted, {report['repaired']} repaired")
+    finally:
+        db.close()
+
+def refresh_scores(args: argparse.Namespace) -> None:
+    """Recompute stale stored Pluto scores (or all of them)."""
+    init_db()
+    db = SessionLocal()
+    try:
+        report = scores.refresh(db, batch_size=args.batch_size, everyone=args.all)
+        print(f"Refreshed {report['refreshed']} Pluto scores in {report['batches']} batches")
+    finally:
+        db.close()
+
+def migrate(args: argparse.Namespace) -> None:
+    """Create missing tables and apply pending schema migrations."""
+    ran = init_db()
+    print(f"Applied migrations: {', '.join(map(str, ran))}" if ran else "Schema is up to date")
+
+def seed(args: argparse.Namespace) -> None:
+    """Generate a large deterministic dataset: N users x M accounts x K months, with the API stopped."""
+    engine = seeding.make_engine(args.database_url)
+    try:
+        init_db(engine)
+        plan = seeding.plan_seed(
+            engine, args.users, args.accounts, args.months, args.seed,
+            args.as_of, hash_password(args.password),
+        )
+    finally:
+        engine.dispose()
+    t0 = time.perf_counter()
+    stats = seeding.seed_database(args.database_url, plan, workers=args.workers, batch_users=args.batch_users)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"Seeded {stats.users} users, {stats.accounts} accounts, {stats.transactions} transactions "
+        f"({stats.rollups} rollup rows) in {elapsed:.1f}s; "
+        f"user ids {plan.first_user_id}..{plan.first_user_id + stats.users - 1}, password '{args.password}'"
+    )
+
+def llm_stub(args: argparse.Namespace) -> None:
+    """Serve a fake LLM with injected latency and failures (use with LLM_PROVIDER=http)."""
+    import uvicorn
+    from app.ai.providers import StubBehavior
+    from app.ai.stub_server import create_app
+
+    behavior = StubBehavior(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds,
+    )
+    uvicorn.run(create_app(behavior, seed=args.seed), host=args.host, port=args.port)
+
+def _add_seed_arguments(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--users", type=int, default=100, help="Number of users (N)")
+    p.add_argument("--accounts", type=int, default=3, help="Accounts per user (M)")
+    p.add_argument("--months", type=int, default=12, help="Months of history per account (K)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed; same seed and --as-of give the same data")
+    p.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="Anchor date (YYYY-MM-DD)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes")
+    p.add_argument("--batch-users", type=int, default=50, help="Users per insert transaction")
+    p.add_argument("--password", default="pluto-seed", help="Password set on every seeded user")
+    p.add_argument("--database-url", default=settings.DATABASE_URL, help="Target database")
+    p.set_defaults(func=seed)
+
+def seed_main(argv: list[str] | None = None) -> None:
+    """Entry point for the standalone `pluto-seed` script."""
+    parser = argparse.ArgumentParser(prog="pluto-seed", description=seed.__doc__)
+    _add_seed_arguments(parser)
+    args = parser.parse_args(argv)
+    args.func(args)
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="pluto", description="Pluto maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate", help="Create tables and apply pending schema migrations")
+    p.set_defaults(func=migrate)
+
+    p = sub.add_parser("rebuild-rollups", help="Recompute the daily_rollups table")
+    p.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    p.set_defaults(func=rebuild_rollups)
+
+    p = sub.add_parser("reconcile-balances", help="Verify and repair materialized account balances")
+    p.add_argument("--user-id", type=int, default=None, help="Only check this user's accounts")
+    p.add_argument("--batch-size", type=int, default=settings.BALANCE_RECONCILE_BATCH, help="Accounts per query")
+    p.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    p.set_defaults(func=reconcile_balances)
+
+    p = sub.add_parser("refresh-scores", help="Recompute stored Pluto scores for users whose data or window changed")
+    p.add_argument("--batch-size", type=int, default=settings.PLUTO_SCORE_BATCH, help="Users per query")
+    p.add_argument("--all", action="store_true", help="Recompute every user's score, stale or not")
+    p.set_defaults(func=refresh_scores)
+
+    p = sub.add_parser("seed", help="Generate a large synthetic dataset for load testing")
+    _add_seed_arguments(p)
+
+    p = sub.add_parser("llm-stub", help="Serve a fake LLM with injected latency and failures")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8090)
+    p.add_argument("--latency", type=float, default=settings.LLM_STUB_LATENCY_SECONDS, help="Base seconds per call")
+    p.add_argument("--jitter", type=float, default=settings.LLM_STUB_JITTER_SECONDS, help="Extra random seconds, 0..jitter")
+    p.add_argument("--failure-rate", type=float, default=settings.LLM_STUB_FAILURE_RATE, help="Share of calls answered 503")
+    p.add_argument("--hang-rate", type=float, default=settings.LLM_STUB_HANG_RATE, help="Share of calls that never answer")
+    p.add_argument("--hang-seconds", type=float, default=300.0)
+    p.add_argument("--seed", type=int, default=None)
+    p.set_defaults(func=llm_stub)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -9,5 +9,43 @@ class Settings:
     JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRES_SECONDS = int(os.getenv("JWT_EXPIRES_SECONDS", "3600"))
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # gemini | stub | http
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+    LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+    LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+    LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+    LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "60"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_STUB_URL = os.getenv("LLM_STUB_URL", "http://127.0.0.1:8090")
+    LLM_STUB_LATENCY_SECONDS = float(os.getenv("LLM_STUB_LATENCY_SECONDS", "0.5"))
+    LLM_STUB_JITTER_SECONDS = float(os.getenv("LLM_STUB_JITTER_SECONDS", "0"))
+    LLM_STUB_FAILURE_RATE = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+    LLM_STUB_HANG_RATE = float(os.getenv("LLM_STUB_HANG_RATE", "0"))
+    GEMINI_PROMPT_TOKEN_BUDGET = int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", "1500"))
+    GEMINI_SUMMARY_MONTHS = int(os.getenv("GEMINI_SUMMARY_MONTHS", "6"))
+    GEMINI_INSIGHTS_KEEP = int(os.getenv("GEMINI_INSIGHTS_KEEP", "3"))
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+    HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "5"))
+    JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "600"))
+    IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "2000"))
+    IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+    IMPORT_SPOOL_BYTES = int(os.getenv("IMPORT_SPOOL_BYTES", str(8 << 20)))
+    EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+    BALANCE_RECONCILE_SECONDS = float(os.getenv("BALANCE_RECONCILE_SECONDS", "3600"))  # 0 disables the sweep
+    BALANCE_RECONCILE_BATCH = int(os.getenv("BALANCE_RECONCILE_BATCH", "500"))
+    PLUTO_SCORE_REFRESH_SECONDS = float(os.getenv("PLUTO_SCORE_REFRESH_SECONDS", "900"))  # 0 disables the sweep
+    PLUTO_SCORE_BATCH = int(os.getenv("PLUTO_SCORE_BATCH", "1000"))
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+    COLUMN_CACHE_MB = float(os.getenv("COLUMN_CACHE_MB", "64"))  # 0 serves /insights from SQL and the rollups
 
 settings = Settings()
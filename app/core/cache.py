@@ -0,0 +1,99 @@
+"""
+Small in-process caches.
+
+`TTLCache` is a bounded LRU map whose entries also expire. Every instance
+created through `register` shows up in `GET /debug/caches` with its hit,
+miss and eviction counters. Caches are per process: with several workers
+each keeps its own copy, so anything cached must be safe to serve until its
+TTL runs out.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+class TTLCache:
+    """Bounded LRU mapping with per-entry expiry; safe to share across threads."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            deadline, value = entry
+            if deadline <= self.clock():
+                del self._data[key]
+                self._evict(key, value)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self.clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                self._evict(old_key, old_value)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+            self._evict(key, entry[1])
+            return entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            for key, (_, value) in self._data.items():
+                self._evict(key, value)
+            self._data.clear()
+
+    def _evict(self, key: Hashable, value: Any) -> None:
+        """Hook for subclasses that index entries; called with the lock held."""
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+CACHES: dict[str, Any] = {}
+
+def register(name: str, cache: Any) -> Any:
+    """Expose a cache's stats() under `name` in GET /debug/caches."""
+    CACHES[name] = cache
+    return cache
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in CACHES.items()}
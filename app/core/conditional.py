@@ -0,0 +1,62 @@
+"""
+Conditional GETs and a response cache driven by the per-user data version.
+
+`conditional` reads the caller's version (one primary-key lookup), derives
+an ETag from it plus the route, query string and date, and answers a
+matching If-None-Match with 304 before any of the route's queries run.
+Otherwise the result is served from a cache keyed on the same inputs, or
+computed and stored there. Writes bump the version, which changes both the
+ETag and the cache key, so nothing is invalidated explicitly; stale entries
+age out of the LRU.
+
+The date is part of the key because several routes compute windows ending
+today, so their output changes at midnight with no write.
+"""
+import hashlib
+from datetime import date
+from typing import Any, Awaitable, Callable
+from fastapi import HTTPException, Request, Response
+from app.config import settings
+from app.core.cache import TTLCache, register
+from app.db.session import Database
+from app.services import ledger
+
+response_cache = register("responses", TTLCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+))
+
+CACHE_CONTROL = "private, no-cache"
+
+def cache_key(request: Request, user_id: int, version: int) -> tuple:
+    query = tuple(sorted(request.query_params.multi_items()))
+    return (user_id, request.url.path, query, version, date.today().isoformat())
+
+def make_etag(key: tuple) -> str:
+    user_id, path, query, version, day = key
+    digest = hashlib.sha256(repr((user_id, path, query, day)).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (a list of tags, or *)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+async def conditional(request: Request, response: Response, db: Database, user_id: int,
+                      compute: Callable[[], Awaitable[Any]]) -> Any:
+    """`await compute()`, skipped on a matching ETag or a cache hit."""
+    version = await db.run(ledger.current, user_id)
+    key = cache_key(request, user_id, version)
+    etag = make_etag(key)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+    result = response_cache.get(key)
+    if result is None:
+        result = await compute()
+        response_cache.set(key, result)
+    return result
@@ -0,0 +1,92 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+from sqlalchemy import and_, or_
+
+NEXT = "next"
+PREV = "prev"
+
+class InvalidCursor(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a (date DESC, id DESC) ordering, plus an optional carried total."""
+    date: date
+    id: int
+    direction: str = NEXT
+    total: Optional[int] = None
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = {"d": cursor.date.isoformat(), "i": cursor.id, "p": 1 if cursor.direction == PREV else 0}
+    if cursor.total is not None:
+        payload["t"] = cursor.total
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        return Cursor(
+            date=date.fromisoformat(payload["d"]),
+            id=int(payload["i"]),
+            direction=PREV if payload.get("p") else NEXT,
+            total=payload.get("t"),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token!r}") from e
+
+@dataclass
+class Page:
+    rows: list
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+def _cursor_for(row: Any, direction: str, total: Optional[int]) -> str:
+    return encode_cursor(Cursor(date=row.date, id=row.id, direction=direction, total=total))
+
+def keyset_page(query, date_col, id_col, limit: int, cursor: Optional[Cursor] = None,
+                total: Optional[int] = None) -> Page:
+    """Fetch one page of `query` ordered by (date DESC, id DESC) after/before `cursor`.
+
+    Reads limit + 1 rows to learn whether another page exists; never counts
+    or skips rows, so deep pages cost the same as the first one. `total` is
+    carried inside the emitted cursors so later pages need not recount.
+    """
+    if cursor is not None and cursor.direction == PREV:
+        query = query.filter(or_(date_col > cursor.date, and_(date_col == cursor.date, id_col > cursor.id)))
+        rows = query.order_by(date_col.asc(), id_col.asc()).limit(limit + 1).all()
+        has_prev = len(rows) > limit
+        rows = rows[:limit][::-1]
+        has_next = True
+    else:
+        if cursor is not None:
+            query = query.filter(or_(date_col < cursor.date, and_(date_col == cursor.date, id_col < cursor.id)))
+        rows = query.order_by(date_col.desc(), id_col.desc()).limit(limit + 1).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        has_prev = cursor is not None
+    return Page(
+        rows=rows,
+        next_cursor=_cursor_for(rows[-1], NEXT, total) if rows and has_next else None,
+        prev_cursor=_cursor_for(rows[0], PREV, total) if rows and has_prev else None,
+    )
+
+def offset_page(query, date_col, id_col, limit: int, offset: int, total: Optional[int] = None) -> Page:
+    """Legacy LIMIT/OFFSET page with a stable (date, id) tie-break.
+
+    Also emits keyset cursors from its first/last rows so offset clients can
+    switch to cursors at any point.
+    """
+    rows = query.order_by(date_col.desc(), id_col.desc()).offset(offset).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    return Page(
+        rows=rows,
+        next_cursor=_cursor_for(rows[-1], NEXT, total) if rows and has_next else None,
+        prev_cursor=_cursor_for(rows[0], PREV, total) if rows and offset > 0 else None,
+    )
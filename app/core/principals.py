@@ -0,0 +1,76 @@
+"""
+Authenticated-principal cache.
+
+Maps a verified bearer token to a lightweight `Principal` so that routes
+which only need the caller's id skip both JWT decoding and the users lookup.
+An entry never outlives its token's `exp`. It is dropped as soon as the
+user is updated or deleted through the ORM; other processes notice within
+PRINCIPAL_CACHE_TTL_SECONDS.
+"""
+import time
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.cache import TTLCache, register
+from app.models.user import User
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    full_name: Optional[str]
+
+class PrincipalCache(TTLCache):
+    """Token -> Principal, indexed by user id so a user's tokens can be dropped together."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._tokens: dict[int, set[str]] = {}
+        # Bumped on every invalidation; a lookup that started before one must not be cached
+        self.epoch = 0
+
+    def put(self, token: str, principal: Principal, expires_at: Optional[float], epoch: int) -> None:
+        ttl = None if expires_at is None else expires_at - time.time()
+        with self._lock:
+            if epoch != self.epoch:
+                return
+        self.set(token, principal, ttl)
+        with self._lock:
+            if token in self._data:
+                self._tokens.setdefault(principal.id, set()).add(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self.epoch += 1
+            for token in self._tokens.pop(user_id, ()):
+                self._data.pop(token, None)
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self.epoch += 1
+        self.clear()
+
+    def _evict(self, key, value) -> None:
+        tokens = self._tokens.get(value.id)
+        if tokens is not None:
+            tokens.discard(key)
+            if not tokens:
+                del self._tokens[value.id]
+
+principal_cache = register("principals", PrincipalCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS
+))
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_user_write(state) -> None:
+    # query(User).update()/delete() and update(User) statements bypass the mapper events
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is User:
+        principal_cache.invalidate_all()
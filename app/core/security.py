@@ -1,9 +1,16 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from passlib.context import CryptContext
 from jose import jwt
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Changing BCRYPT_ROUNDS makes existing hashes "deprecated"; they are upgraded at the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,6 +18,90 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def verify_and_update(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """(matches, replacement hash when the stored one uses outdated settings)"""
+    return pwd_context.verify_and_update(plain, hashed)
+
+class HashingBusy(Exception):
+    """The hashing queue is full; the caller should answer 503 with Retry-After."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing is at capacity")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """bcrypt off the request threadpool, on a dedicated process pool with a bounded queue.
+
+    At most `workers + queue_limit` operations are admitted at once; more
+    raise HashingBusy instead of queueing without limit. With workers=0 the
+    work runs on the shared threadpool with no admission control (the old
+    behaviour, useful where subprocesses are unavailable).
+    """
+
+    def __init__(self, workers: int, queue_limit: int, retry_after: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            # spawn: never fork a server process that holds threads, sockets and DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self.workers and self.pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HashingBusy(self.retry_after)
+            self.pending += 1
+        if not self.workers:
+            try:
+                return await run_in_threadpool(fn, *args)
+            finally:
+                self._release()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+        return await self._submit(verify_and_update, plain, hashed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+hasher = PasswordHasher(settings.HASH_WORKERS, settings.HASH_QUEUE_LIMIT, settings.HASH_RETRY_AFTER_SECONDS)
+
 def create_access_token(sub: str) -> str:
     exp = datetime.now(tz=timezone.utc) + timedelta(seconds=settings.JWT_EXPIRES_SECONDS)
     payload = {"sub": sub, "exp": exp}
@@ -1,6 +1,10 @@
 from app.db.session import engine
 from app.db.base import Base
-from app.models import user, account, transaction  # noqa: F401
+from app.db.migrations import migrate
+from app.models import (  # noqa: F401
+    user, account, category, merchant, transaction, transaction_change, daily_rollup, data_version, gemini_insight, job, pluto_score,
+)
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=engine):
+    Base.metadata.create_all(bind=bind)
+    return migrate(bind)
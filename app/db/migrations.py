@@ -0,0 +1,142 @@
+"""
+Versioned schema migrations.
+
+`create_all` only adds missing tables, so changes to existing tables (new
+indexes, columns, backfills) are shipped here as numbered steps. Each step
+runs once, in its own transaction, and is recorded in `schema_migrations`.
+Steps must be idempotent: on a fresh database `create_all` has already built
+the current schema and the steps run against it.
+"""
+import datetime
+from typing import Callable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.datetime.utcnow),
+)
+
+def _backfill_daily_rollups(conn: Connection) -> None:
+    from app.models.daily_rollup import DailyRollup
+    from app.models.transaction import Transaction
+    from app.services import rollups
+
+    if "category_id" not in {c["name"] for c in inspect(conn).get_columns("transactions")}:
+        return  # Rollups are keyed by category id; step 5 rebuilds them after encoding the transactions
+    has_rollups = conn.execute(select(func.count()).select_from(DailyRollup)).scalar()
+    has_transactions = conn.execute(select(func.count()).select_from(Transaction)).scalar()
+    if has_transactions and not has_rollups:
+        rollups.rebuild(Session(bind=conn))
+
+def _composite_indexes(conn: Connection) -> None:
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    for table in (Transaction.__table__, Account.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    # Superseded by the composite indexes above, which lead with user_id
+    conn.execute(text("DROP INDEX IF EXISTS ix_transactions_user_id"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_accounts_user_id"))
+
+def _gemini_insight_fingerprints(conn: Connection) -> None:
+    from app.models.gemini_insight import GeminiInsight
+
+    table = GeminiInsight.__table__
+    if not inspect(conn).has_table(table.name):
+        return
+    if "fingerprint" not in {c["name"] for c in inspect(conn).get_columns(table.name)}:
+        conn.execute(text("ALTER TABLE gemini_insights ADD COLUMN fingerprint VARCHAR(64)"))
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+def _reconcile_account_balances(conn: Connection) -> None:
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.services import ledger
+
+    # Transactions created through the API used to leave accounts.balance untouched
+    total = select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+        Transaction.account_id == Account.id
+    ).scalar_subquery()
+    conn.execute(Account.__table__.update().values(balance=total))
+    ledger.bump_all(Session(bind=conn))
+
+def _dictionary_encode_transactions(conn: Connection) -> None:
+    from app.models.daily_rollup import DailyRollup
+    from app.services import ledger, lookups, rollups
+
+    if "category_id" in {c["name"] for c in inspect(conn).get_columns("transactions")}:
+        return
+    db = Session(bind=conn)
+    conn.execute(text("ALTER TABLE transactions ADD COLUMN category_id INTEGER REFERENCES categories (id)"))
+    conn.execute(text("ALTER TABLE transactions ADD COLUMN merchant_id INTEGER REFERENCES merchants (id)"))
+    # Few distinct categories, and each needs its Plaid mapping; merchants are copied set-based
+    lookups.category_ids(db, conn.execute(text(
+        "SELECT DISTINCT category FROM transactions WHERE category IS NOT NULL"
+    )).scalars().all())
+    conn.execute(text(
+        "INSERT INTO merchants (name) SELECT DISTINCT description FROM transactions "
+        "WHERE description IS NOT NULL AND description NOT IN (SELECT name FROM merchants)"
+    ))
+    conn.execute(text(
+        "UPDATE transactions SET "
+        "category_id = (SELECT id FROM categories WHERE categories.name = transactions.category), "
+        "merchant_id = (SELECT id FROM merchants WHERE merchants.name = transactions.description)"
+    ))
+    conn.execute(text("ALTER TABLE transactions DROP COLUMN category"))
+    conn.execute(text("ALTER TABLE transactions DROP COLUMN description"))
+    # Rollup buckets were keyed by category name
+    DailyRollup.__table__.drop(conn, checkfirst=True)
+    DailyRollup.__table__.create(conn)
+    rollups.rebuild(db)
+    ledger.bump_all(db)
+
+def _transaction_change_versions(conn: Connection) -> None:
+    from app.models.transaction_change import TransactionChange
+
+    table = TransactionChange.__table__
+    if not inspect(conn).has_table(table.name):
+        return
+    if "version" not in {c["name"] for c in inspect(conn).get_columns(table.name)}:
+        # Existing entries sort before every new one, in seq order, so old cursors stay valid
+        conn.execute(text("ALTER TABLE transaction_changes ADD COLUMN version BIGINT NOT NULL DEFAULT 0"))
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+    conn.execute(text("DROP INDEX IF EXISTS ix_transaction_changes_user_seq"))
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "backfill daily_rollups", _backfill_daily_rollups),
+    (2, "composite user/date and user/mask indexes", _composite_indexes),
+    (3, "gemini_insights.fingerprint", _gemini_insight_fingerprints),
+    (4, "reconcile account balances", _reconcile_account_balances),
+    (5, "categories and merchants lookup tables", _dictionary_encode_transactions),
+    (6, "transaction_changes.version", _transaction_change_versions),
+]
+
+def applied_versions(engine: Engine) -> set[int]:
+    migration_metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+def migrate(engine: Engine) -> list[int]:
+    """Apply pending migrations in order; returns the versions that ran."""
+    done = applied_versions(engine)
+    ran = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.datetime.utcnow()
+            ))
+        ran.append(version)
+    return ran
@@ -1,7 +1,135 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Iterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from app.config import settings
 
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+# DATABASE_URL schemes that select the async stack, and their blocking equivalents
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg2",
+}
+
+def is_async_url(url: str) -> bool:
+    return make_url(url).drivername in ASYNC_DRIVERS
+
+def sync_url(url: str) -> str:
+    """Blocking-driver form of DATABASE_URL, for the CLI, migrations and other sync callers."""
+    u = make_url(url)
+    return u.set(drivername=ASYNC_DRIVERS.get(u.drivername, u.drivername)).render_as_string(hide_password=False)
+
+SYNC_DATABASE_URL = sync_url(settings.DATABASE_URL)
+connect_args = {"check_same_thread": False} if SYNC_DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(SYNC_DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+async_engine = create_async_engine(settings.DATABASE_URL) if is_async_url(settings.DATABASE_URL) else None
+
+class Database(ABC):
+    """Request-scoped handle the routers use for all database work.
+
+    Route logic stays in plain functions that take a Session. `run` calls one
+    on the request's session; `gather` runs independent ones concurrently,
+    each on a session of its own; `stream` iterates a generator function on
+    a session of its own that outlives the request, for streamed responses.
+    """
+
+    @abstractmethod
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call `fn(session, *args, **kwargs)` on the request's session."""
+
+    @abstractmethod
+    async def gather(self, *calls: tuple) -> list:
+        """Run `(fn, *args)` calls concurrently; results come back in call order."""
+
+    @abstractmethod
+    def stream(self, fn: Callable[..., Iterator], *args) -> AsyncIterator:
+        """Yield the items of `fn(session, *args)`; the session closes when the iterator ends."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release the request's session."""
+
+class AsyncDatabase(Database):
+    """Async driver (aiosqlite, asyncpg): functions run through AsyncSession.run_sync."""
+
+    def __init__(self, sessions: async_sessionmaker):
+        self.sessions = sessions
+        self.session = sessions()
+
+    async def run(self, fn, *args, **kwargs):
+        return await self.session.run_sync(fn, *args, **kwargs)
+
+    async def gather(self, *calls):
+        async def _one(fn, *args):
+            async with self.sessions() as s:
+                return await s.run_sync(fn, *args)
+        return list(await asyncio.gather(*(_one(*call) for call in calls)))
+
+    async def stream(self, fn, *args):
+        # A generator cannot yield across run_sync, so each item is pulled by a run_sync of its own
+        items = None
+
+        def _next(s):
+            nonlocal items
+            if items is None:
+                items = fn(s, *args)
+            return next(items, None)
+
+        async with self.sessions() as s:
+            try:
+                while (item := await s.run_sync(_next)) is not None:
+                    yield item
+            finally:
+                if items is not None:
+                    await s.run_sync(lambda _: items.close())
+
+    async def close(self):
+        await self.session.close()
+
+class ThreadedDatabase(Database):
+    """Sync driver: functions run in Starlette's threadpool, like the old sync routes."""
+
+    def __init__(self, sessions: sessionmaker):
+        self.sessions = sessions
+        self.session = sessions()
+
+    async def run(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def gather(self, *calls):
+        def _one(fn, *args):
+            with self.sessions() as s:
+                return fn(s, *args)
+        return list(await asyncio.gather(*(run_in_threadpool(_one, *call) for call in calls)))
+
+    async def stream(self, fn, *args):
+        session = self.sessions()
+        items = fn(session, *args)
+        try:
+            async for item in iterate_in_threadpool(items):
+                yield item
+        finally:
+            await run_in_threadpool(lambda: (items.close(), session.close()))
+
+    async def close(self):
+        # A session that never began a transaction has no connection to release
+        if self.session.in_transaction():
+            await run_in_threadpool(self.session.close)
+        else:
+            self.session.close()
+
+def database_factory(bind) -> Callable[[], Database]:
+    """Constructor for per-request Database handles on a sync or async engine."""
+    if isinstance(bind, AsyncEngine):
+        # Nothing may lazy-load outside run_sync, so committed objects must stay usable
+        sessions = async_sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)
+        return lambda: AsyncDatabase(sessions)
+    sessions = sessionmaker(bind=bind, autocommit=False, autoflush=False, expire_on_commit=False)
+    return lambda: ThreadedDatabase(sessions)
+
+open_database = database_factory(async_engine or engine)
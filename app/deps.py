@@ -2,20 +2,30 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from app.db.session import SessionLocal
+from app.db.session import Database, open_database
 from app.config import settings
+from app.core.principals import Principal, principal_cache
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_db():
-    db = SessionLocal()
+async def get_db():
+    db = open_database()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _load_principal(db: Session, user_id: int) -> Principal | None:
+    row = db.query(User.id, User.email, User.full_name).filter(User.id == user_id).first()
+    return Principal(*row) if row else None
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Database = Depends(get_db)) -> Principal:
+    # A cached token was already verified; no decode, no query
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    epoch = principal_cache.epoch
     exc = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
@@ -24,7 +34,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise exc
     except JWTError:
         raise exc
-    user = db.query(User).filter(User.id == int(sub)).first()
-    if not user:
+    principal = await db.run(_load_principal, int(sub))
+    if not principal:
         raise exc
-    return user
+    principal_cache.put(token, principal, payload.get("exp"), epoch)
+    return principal
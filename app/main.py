@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.ai.insights import shutdown_llm
 from app.config import settings
+from app.core.cache import cache_stats
+from app.core.security import hasher
 from app.db.init_db import init_db
-from app.routers import auth, users, accounts, transactions, insights
+from app.db.session import SessionLocal
+from app.routers import auth, users, accounts, transactions, insights, jobs
+from app.services import balances, jobs as job_service, scores
 from app.api import fake_plaid
 
 app = FastAPI(title="Pluto API")
@@ -21,12 +26,29 @@ app.include_router(users.router)
 app.include_router(accounts.router)
 app.include_router(transactions.router)
 app.include_router(insights.router)
+app.include_router(jobs.router)
 app.include_router(fake_plaid.router)
 
 @app.on_event("startup")
 def _startup():
     init_db()
+    job_service.start(SessionLocal, settings.JOB_WORKERS, settings.JOB_POLL_SECONDS, settings.JOB_STALE_SECONDS)
+    balances.start(SessionLocal, settings.BALANCE_RECONCILE_SECONDS, settings.BALANCE_RECONCILE_BATCH)
+    scores.start(SessionLocal, settings.PLUTO_SCORE_REFRESH_SECONDS, settings.PLUTO_SCORE_BATCH)
+
+@app.on_event("shutdown")
+def _shutdown():
+    job_service.stop()
+    balances.stop()
+    scores.stop()
+    shutdown_llm()
+    hasher.shutdown()
 
 @app.get("/healthz")
 def healthz():
     return {"status": "ok"}
+
+@app.get("/debug/caches")
+def debug_caches():
+    """Size and hit/miss counters of the in-process caches"""
+    return cache_stats()
@@ -1,11 +1,11 @@
-from sqlalchemy import String, Integer, ForeignKey, Numeric
+from sqlalchemy import String, Integer, ForeignKey, Numeric, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 class Account(Base):
     __tablename__ = "accounts"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     nickname: Mapped[str | None] = mapped_column(String(255), nullable=True)
     currency: Mapped[str] = mapped_column(String(8), default="USD")
@@ -15,3 +15,8 @@ class Account(Base):
 
     owner = relationship("User", back_populates="accounts")
     transactions = relationship("Transaction", back_populates="account", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Serves lookups by (user_id), (user_id, mask) and (user_id, mask, type)
+        Index("ix_accounts_user_mask_type", "user_id", "mask", "type"),
+    )
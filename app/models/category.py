@@ -0,0 +1,14 @@
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class Category(Base):
+    """One row per distinct transaction category, referenced by `transactions.category_id`.
+
+    `pfc_primary` is the Plaid personal finance category the name maps to,
+    filled in when the row is created.
+    """
+    __tablename__ = "categories"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    pfc_primary: Mapped[str] = mapped_column(String(64), nullable=False)
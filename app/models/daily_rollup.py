@@ -0,0 +1,28 @@
+from sqlalchemy import Integer, ForeignKey, Numeric, Date, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class DailyRollup(Base):
+    """Per (user, account, day, category) aggregates of transactions.
+
+    Expense figures are stored as positive magnitudes. Buckets are keyed by
+    category id; transactions without a category are bucketed under 0.
+    """
+    __tablename__ = "daily_rollups"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True)
+    date: Mapped[Date] = mapped_column(Date, primary_key=True)
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    txn_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    income_total: Mapped[Numeric] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    income_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    income_min: Mapped[Numeric | None] = mapped_column(Numeric(12, 2), nullable=True)
+    income_max: Mapped[Numeric | None] = mapped_column(Numeric(12, 2), nullable=True)
+    expense_total: Mapped[Numeric] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    expense_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    expense_min: Mapped[Numeric | None] = mapped_column(Numeric(12, 2), nullable=True)
+    expense_max: Mapped[Numeric | None] = mapped_column(Numeric(12, 2), nullable=True)
+
+    __table_args__ = (
+        Index("ix_daily_rollups_user_date", "user_id", "date"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class DataVersion(Base):
+    """Per-user counter bumped by every write to the user's accounts or transactions.
+
+    Users who never wrote have no row and are at version 0.
+    """
+    __tablename__ = "data_versions"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
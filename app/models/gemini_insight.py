@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 import datetime
@@ -9,5 +9,11 @@ class GeminiInsight(Base):
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.utcnow)
     insights_json: Mapped[str] = mapped_column(Text, nullable=False)
+    # features.fingerprint of the data the insight was generated from
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     user = relationship("User", backref="gemini_insights")
+
+    __table_args__ = (
+        Index("ix_gemini_insights_user_fingerprint", "user_id", "fingerprint"),
+    )
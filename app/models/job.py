@@ -0,0 +1,32 @@
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+import datetime
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class Job(Base):
+    """Background work item, run by app.services.jobs.
+
+    status moves queued -> running -> succeeded | failed. Results are written
+    by the handler to its own tables; `error` holds the failure message.
+    """
+    __tablename__ = "jobs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime, default=datetime.datetime.utcnow)
+    started_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(DateTime, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        # At most one queued or running job per (kind, user): concurrent submits collapse onto it
+        Index(
+            "ux_jobs_active", "kind", "user_id", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_jobs_status_id", "status", "id"),
+    )
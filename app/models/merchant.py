@@ -0,0 +1,9 @@
+from sqlalchemy import String, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class Merchant(Base):
+    """One row per distinct transaction description, referenced by `transactions.merchant_id`."""
+    __tablename__ = "merchants"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(512), unique=True, nullable=False)
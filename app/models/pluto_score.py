@@ -0,0 +1,23 @@
+import datetime
+from sqlalchemy import BigInteger, Date, DateTime, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+class StoredPlutoScore(Base):
+    """A user's Pluto score as computed by the batch refresh (app.services.scores).
+
+    `as_of` is the day the 30-day window ended on and `version` the user's
+    data version the score was computed from; a row is current while both
+    still match.
+    """
+    __tablename__ = "pluto_scores"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    window_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    income_30d: Mapped[float] = mapped_column(Float, nullable=False)
+    spend_30d: Mapped[float] = mapped_column(Float, nullable=False)
+    savings_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    category_diversity: Mapped[int] = mapped_column(Integer, nullable=False)
+    as_of: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    computed_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False, default=datetime.datetime.utcnow)
@@ -1,16 +1,47 @@
-from sqlalchemy import String, Integer, ForeignKey, Numeric, Date
+from sqlalchemy import Integer, ForeignKey, Numeric, Date, Index, select
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
+from app.models.category import Category
+from app.models.merchant import Merchant
 
 class Transaction(Base):
     __tablename__ = "transactions"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id", ondelete="CASCADE"), index=True)
     date: Mapped[Date] = mapped_column(Date, nullable=False)
     amount: Mapped[Numeric] = mapped_column(Numeric(12, 2), nullable=False)  # +income, -spend
-    category: Mapped[str | None] = mapped_column(String(64), nullable=True)
-    description: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    # Dictionary-encoded: names live once in categories / merchants (see app.services.lookups)
+    category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id"), nullable=True)
+    merchant_id: Mapped[int | None] = mapped_column(ForeignKey("merchants.id"), nullable=True)
 
     owner = relationship("User", back_populates="transactions")
     account = relationship("Account", back_populates="transactions")
+    category_entry = relationship(Category, lazy="joined")
+    merchant = relationship(Merchant, lazy="joined")
+
+    @hybrid_property
+    def category(self) -> str | None:
+        return self.category_entry.name if self.category_entry else None
+
+    @category.inplace.expression
+    @classmethod
+    def _category_expression(cls):
+        return select(Category.name).where(Category.id == cls.category_id).scalar_subquery()
+
+    @hybrid_property
+    def description(self) -> str | None:
+        return self.merchant.name if self.merchant else None
+
+    @description.inplace.expression
+    @classmethod
+    def _description_expression(cls):
+        return select(Merchant.name).where(Merchant.id == cls.merchant_id).scalar_subquery()
+
+    __table_args__ = (
+        # Every hot query filters on user_id plus a date range; the trailing id
+        # serves the (date, id) keyset ordering used for pagination.
+        Index("ix_transactions_user_date", "user_id", "date", "id"),
+        Index("ix_transactions_user_account_date", "user_id", "account_id", "date", "id"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import BigInteger, String, Integer, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+CHANGE_KINDS = ("added", "modified", "removed")
+
+class TransactionChange(Base):
+    """Append-only log of transaction writes, read by the Plaid-style sync feed.
+
+    `version` is the user's data version taken when the change was logged
+    (app.services.changes.record). Versions are handed out under the user's
+    ledger row lock, so they follow commit order, which `seq` alone does
+    not: a sequence value is drawn at insert time and can become visible
+    after a later one. Sync cursors are (version, seq) pairs; `seq` (which
+    AUTOINCREMENT on SQLite keeps from being reused) orders the entries of
+    one version, which all come from the same transaction. The transaction
+    and account ids are not foreign keys: removals outlive the rows they
+    describe. `account_label` is the Plaid-style account id (the mask) at
+    the time of the change, for the same reason.
+    """
+    __tablename__ = "transaction_changes"
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    account_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    account_label: Mapped[str] = mapped_column(String(8), nullable=False)
+    transaction_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    kind: Mapped[str] = mapped_column(String(8), nullable=False)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_transaction_changes_user_version", "user_id", "version", "seq"),
+        {"sqlite_autoincrement": True},
+    )
@@ -1,117 +1,135 @@
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from app.core.conditional import conditional
+from app.core.pagination import InvalidCursor
+from app.core.responses import fast_json
+from app.db.session import Database
+from app.core.principals import Principal
 from app.deps import get_db, get_current_user
 from app.schemas.account import AccountCreate, AccountRead, AccountLinkRequest
 from app.models.account import Account
-from app.models.user import User
-from app.services.fake_plaid import link_fake_account
+from app.services.fake_plaid import link_fake_account, plaidish_transactions_get
+from app.models.transaction import Transaction
+from app.services import changes, ledger, rollups
 from app.schemas.plaid_fake import PlaidTransactionsGetResponse
 
 router = APIRouter(prefix="/accounts", tags=["accounts"])
 
+def _account_read(a: Account) -> AccountRead:
+    return AccountRead(
+        id=a.id,
+        name=a.name,
+        nickname=a.nickname,
+        currency=a.currency,
+        type=a.type,
+        mask=a.mask,
+        balance=a.balance
+    )
+
+def _link_account(db: Session, user_id: int, payload: AccountLinkRequest) -> AccountRead:
+    account = link_fake_account(
+        db=db,
+        user_id=user_id,
+        username=payload.username,
+        account_type=payload.account_type,
+        nickname=payload.nickname
+    )
+    return _account_read(account)
+
 @router.post("/link", response_model=AccountRead)
-def link_account(
+async def link_account(
     payload: AccountLinkRequest,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: Database = Depends(get_db),
+    user: Principal = Depends(get_current_user)
 ):
     """
     Fake Plaid: Link a new account for the user with username/password and seed with fake transactions.
     """
     try:
-        account = link_fake_account(
-            db=db,
-            user_id=user.id,
-            username=payload.username,
-            account_type=payload.account_type,
-            nickname=payload.nickname
-        )
-        
-        return AccountRead(
-            id=account.id,
-            name=account.name,
-            nickname=account.nickname,
-            currency=account.currency,
-            type=account.type,
-            mask=account.mask,
-            balance=account.balance
-        )
+        return fast_json(await db.run(_link_account, user.id, payload))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to link account: {str(e)}")
 
 @router.post("/plaid/transactions/get", response_model=PlaidTransactionsGetResponse)
-def plaid_transactions_get(
+async def plaid_transactions_get(
     account_id: str,
     start_date: str = None,
     end_date: str = None,
     count: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    cursor: str = None,
+    include_total: bool = None,
+    db: Database = Depends(get_db),
+    user: Principal = Depends(get_current_user)
 ):
-    from app.services.fake_plaid import plaidish_transactions_get
-    return plaidish_transactions_get(db, user.id, account_id_label=account_id, start_date=start_date, end_date=end_date, limit=count, offset=offset)
+    try:
+        return fast_json(await db.run(
+            plaidish_transactions_get, user.id, account_id_label=account_id, start_date=start_date,
+            end_date=end_date, limit=count, offset=offset, cursor=cursor, include_total=include_total
+        ))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("", response_model=AccountRead, status_code=201)
-def create_account(payload: AccountCreate, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def _create_account(db: Session, user_id: int, payload: AccountCreate) -> AccountRead:
     a = Account(
-        user_id=current.id, 
-        name=payload.name, 
+        user_id=user_id,
+        name=payload.name,
         nickname=payload.nickname,
-        currency=payload.currency, 
-        type=payload.type, 
+        currency=payload.currency,
+        type=payload.type,
         mask=payload.mask
     )
     db.add(a)
+    ledger.bump(db, user_id)
     db.commit()
     db.refresh(a)
-    return AccountRead(
-        id=a.id, 
-        name=a.name, 
-        nickname=a.nickname,
-        currency=a.currency, 
-        type=a.type, 
-        mask=a.mask,
-        balance=a.balance
-    )
+    return _account_read(a)
 
-@router.get("", response_model=list[AccountRead])
-def list_accounts(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    rows = db.query(Account).filter(Account.user_id == current.id).all()
-    return [
-        AccountRead(
-            id=r.id, 
-            name=r.name, 
-            nickname=r.nickname,
-            currency=r.currency, 
-            type=r.type, 
-            mask=r.mask,
-            balance=r.balance
-        ) for r in rows
-    ]
+@router.post("", response_model=AccountRead, status_code=201)
+async def create_account(payload: AccountCreate, db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    return fast_json(await db.run(_create_account, current.id, payload), status_code=201)
 
-@router.delete("/{account_id}")
-def delete_account(
-    account_id: int,
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+def _list_accounts(db: Session, user_id: int) -> list[AccountRead]:
+    rows = db.query(Account).filter(Account.user_id == user_id).all()
+    return [_account_read(r) for r in rows]
+
+@router.get("", response_model=list[AccountRead])
+async def list_accounts(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user)
 ):
-    """Delete an account for the current user"""
+    accounts = await conditional(request, response, db, current.id, lambda: db.run(_list_accounts, current.id))
+    return fast_json(accounts, response)
+
+def _delete_account(db: Session, user_id: int, account_id: int) -> dict:
     # Find the account and verify ownership
     account = db.query(Account).filter(
         Account.id == account_id,
-        Account.user_id == current.id
+        Account.user_id == user_id
     ).first()
-    
+
     if not account:
         raise HTTPException(status_code=404, detail="Account not found or access denied")
-    
+
     try:
-        # Delete the account
+        # Delete the account along with its rollups
+        rollups.remove_account(db, user_id, account.id)
+        ledger.bump(db, user_id)
+        changes.record(db, user_id, "removed", Transaction.account_id == account.id)
         db.delete(account)
         db.commit()
         return {"message": "Account deleted successfully"}
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to delete account: {str(e)}")
+
+@router.delete("/{account_id}")
+async def delete_account(
+    account_id: int,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user)
+):
+    """Delete an account for the current user"""
+    return await db.run(_delete_account, current.id, account_id)
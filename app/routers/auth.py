@@ -3,22 +3,65 @@ from sqlalchemy.orm import Session
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse
 from app.schemas.user import UserRead
 from app.models.user import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import HashingBusy, create_access_token, hasher
+from app.db.session import Database
 from app.deps import get_db
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/signup", response_model=UserRead, status_code=201)
-def signup(payload: SignupRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == payload.email).first():
+def _busy(e: HashingBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, retry shortly",
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+def _find_user(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+def _credentials(db: Session, email: str) -> tuple[int, str] | None:
+    row = db.query(User.id, User.hashed_password).filter(User.email == email).first()
+    # Hand the connection back to the pool before the slow hash
+    db.rollback()
+    return tuple(row) if row else None
+
+def _create_user(db: Session, payload: SignupRequest, hashed_password: str) -> UserRead:
+    if _find_user(db, payload.email):
         raise HTTPException(status_code=409, detail="Email already registered")
-    user = User(email=payload.email, hashed_password=hash_password(payload.password), full_name=payload.full_name)
+    user = User(email=payload.email, hashed_password=hashed_password, full_name=payload.full_name)
     db.add(user); db.commit(); db.refresh(user)
     return UserRead(id=user.id, email=user.email, full_name=user.full_name)
 
+def _update_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    user = db.get(User, user_id)
+    if user is not None:
+        user.hashed_password = hashed_password
+        db.commit()
+
+@router.post("/signup", response_model=UserRead, status_code=201)
+async def signup(payload: SignupRequest, db: Database = Depends(get_db)):
+    if await db.run(_credentials, payload.email):
+        raise HTTPException(status_code=409, detail="Email already registered")
+    # bcrypt is CPU-bound; it runs on the hashing pool, not the request threadpool
+    try:
+        hashed = await hasher.hash(payload.password)
+    except HashingBusy as e:
+        raise _busy(e)
+    return await db.run(_create_user, payload, hashed)
+
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: LoginRequest, db: Database = Depends(get_db)):
+    credentials = await db.run(_credentials, payload.email)
+    if not credentials:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user_id, hashed_password = credentials
+    try:
+        ok, new_hash = await hasher.verify(payload.password, hashed_password)
+    except HashingBusy as e:
+        raise _busy(e)
+    if not ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    return TokenResponse(access_token=create_access_token(str(user.id)), token_type="bearer")
+    if new_hash:
+        # Stored with an outdated bcrypt cost; upgrade it while we have the plaintext
+        await db.run(_update_hash, user_id, new_hash)
+    return TokenResponse(access_token=create_access_token(str(user_id)), token_type="bearer")
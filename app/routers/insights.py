@@ -1,149 +1,105 @@
 from fastapi.responses import JSONResponse
-from app.ai.insights import get_financial_insights
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+from app.ai.insights import REFRESH_JOB, cached_insight, data_fingerprint, insight_stats, latest_insight
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import date, datetime, timedelta
-from typing import List, Optional
-from decimal import Decimal
-import statistics
+from sqlalchemy import and_
+from datetime import date, timedelta
+from typing import Literal, Optional
+from app.db.session import Database
+from app.core.conditional import conditional
+from app.core.principals import Principal
 from app.deps import get_db, get_current_user
 from app.models.transaction import Transaction
 from app.models.account import Account
-from app.models.user import User
+from app.models.gemini_insight import GeminiInsight
+from app.routers.jobs import job_read
+from app.schemas.job import JobRead
+from app.services import jobs
+from app.services import rollups, scores
+from app.analytics import reports, series
+from app.analytics.columns import TransactionColumns, column_cache
+from app.analytics.kernel import column, empty_summary, summarize
+from app.analytics.sql import summarize_transactions
 from app.schemas.insight import (
     SpendingInsight, 
-    CategoryBreakdown, 
     TrendAnalysis,
     FinancialSummary,
     MathematicalCalculations,
-    PlutoScore
+    PlutoScore,
+    DashboardInsights,
+    TimeSeries,
+    DASHBOARD_SECTIONS
 )
 
 router = APIRouter(prefix="/insights", tags=["insights"])
 
-@router.get("/spending", response_model=SpendingInsight)
-def get_spending_insights(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
-    days: int = Query(30, description="Number of days to analyze")
-):
-    """Get spending insights with mathematical calculations"""
+def _spending_from(cols: TransactionColumns, days: int, today: date) -> SpendingInsight:
+    w = cols.window(today - timedelta(days=days), today)
+    return reports.spending_insight(
+        days, today,
+        txn_count=len(w),
+        income_total=w.income_and_spend()[0],
+        expense_stats=w.summary(basis="expense"),
+        category_totals=w.category_spend(),
+        daily=w.daily_spend(),
+    )
+
+def _summary_from(cols: TransactionColumns, balances: list, today: date) -> FinancialSummary:
+    math_summary = cols.window(today - timedelta(days=reports.SUMMARY_WINDOW_DAYS), today).summary()
+    return reports.financial_summary(balances, cols.summary(), math_summary)
+
+def _trend_from(cols: TransactionColumns, days: int, today: date) -> TrendAnalysis:
+    w = cols.window(today - timedelta(days=days), today)
+    return reports.trend_analysis([total for _, total, _ in w.daily_spend()])
+
+def _score_from(cols: TransactionColumns, today: date) -> PlutoScore:
+    w = cols.window(today - timedelta(days=reports.SCORE_WINDOW_DAYS))
+    income, spend = w.income_and_spend()
+    return reports.pluto_score(income, spend, w.distinct_categories())
+
+def _spending_insights(db: Session, user_id: int, days: int) -> SpendingInsight:
+    if column_cache.enabled:
+        return _spending_from(column_cache.columns(db, user_id), days, date.today())
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    # Get all transactions for the user in the date range
-    transactions = db.query(Transaction).filter(
-        and_(
-            Transaction.user_id == current.id,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date
-        )
-    ).all()
-    
-    # Mathematical calculations with validation
-    expenses = []
-    income = []
-    for t in transactions:
-        try:
-            amount = float(t.amount)
-            if not (amount == float('inf') or amount == float('-inf') or amount != amount):
-                if amount < 0:
-                    expenses.append(abs(amount))
-                elif amount > 0:
-                    income.append(amount)
-        except (ValueError, TypeError):
-            continue
-    
-    if not expenses:
-        return SpendingInsight(
-            total_spending=0,
-            average_daily=0,
-            top_category="",
-            spending_trend="stable",
-            category_breakdown=[],
-            mathematical_insights=MathematicalCalculations(
-                mean=0,
-                median=0,
-                standard_deviation=0,
-                variance=0,
-                min_value=0,
-                max_value=0,
-                total_transactions=0,
-                income_total=sum(income) if income else 0,
-                expense_total=0,
-                net_flow=sum(income) if income else 0
-            )
-        )
-    
-    # Calculate mathematical statistics
-    mean_expense = statistics.mean(expenses)
-    median_expense = statistics.median(expenses)
-    std_dev = statistics.stdev(expenses) if len(expenses) > 1 else 0
-    variance = statistics.variance(expenses) if len(expenses) > 1 else 0
-    
-    # Category breakdown with calculations
-    category_totals = {}
-    for t in transactions:
-        if t.amount < 0:
-            category = t.category
-            amount = abs(t.amount)
-            if category not in category_totals:
-                category_totals[category] = 0
-            category_totals[category] += amount
-    
-    category_breakdown = [
-        CategoryBreakdown(
-            category=cat,
-            total=total,
-            percentage=round((total / sum(category_totals.values())) * 100, 2)
-        )
-        for cat, total in sorted(category_totals.items(), key=lambda x: x[1], reverse=True)
-    ]
-    
-    # Determine spending trend
-    if len(expenses) >= 2:
-        recent_expenses = expenses[:len(expenses)//2]
-        older_expenses = expenses[len(expenses)//2:]
-        recent_avg = statistics.mean(recent_expenses)
-        older_avg = statistics.mean(older_expenses)
-        
-        if recent_avg > older_avg * 1.1:
-            trend = "increasing"
-        elif recent_avg < older_avg * 0.9:
-            trend = "decreasing"
-        else:
-            trend = "stable"
+    # Window totals and per-category spend come from the daily rollups
+    totals = rollups.window_totals(db, user_id, start_date, end_date)
+    if not totals.expense_count:
+        expense_stats = empty_summary()
     else:
-        trend = "stable"
-    
-    return SpendingInsight(
-        total_spending=sum(category_totals.values()),
-        average_daily=round(sum(category_totals.values()) / days, 2),
-        top_category=category_breakdown[0].category if category_breakdown else "",
-        spending_trend=trend,
-        category_breakdown=category_breakdown,
-        mathematical_insights=MathematicalCalculations(
-            mean=round(mean_expense, 2),
-            median=round(median_expense, 2),
-            standard_deviation=round(std_dev, 2),
-            variance=round(variance, 2),
-            min_value=round(min(expenses), 2),
-            max_value=round(max(expenses), 2),
-            total_transactions=len(transactions),
-            income_total=round(sum(income), 2) if income else 0,
-            expense_total=round(sum(expenses), 2),
-            net_flow=round(sum(income) - sum(expenses), 2) if income else -sum(expenses)
-        )
+        # Median and dispersion need the individual expenses; fetch only that column
+        expense_stats = summarize(column(
+            amount for (amount,) in db.query(Transaction.amount).filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= start_date,
+                Transaction.date <= end_date,
+                Transaction.amount < 0
+            )
+        ), basis="expense")
+    
+    return reports.spending_insight(
+        days, end_date,
+        txn_count=totals.txn_count,
+        income_total=float(totals.income_total),
+        expense_stats=expense_stats,
+        category_totals=rollups.category_spend(db, user_id, start_date, end_date),
+        daily=rollups.daily_spend(db, user_id, start_date, end_date),
     )
 
-@router.get("/mathematical-summary", response_model=MathematicalCalculations)
-def get_mathematical_summary(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
-    account_id: Optional[str] = Query(None, description="Specific account ID"),
+@router.get("/spending", response_model=SpendingInsight)
+async def get_spending_insights(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
     days: int = Query(30, description="Number of days to analyze")
 ):
+    """Get spending insights with mathematical calculations"""
+    return await conditional(request, response, db, current.id, lambda: db.run(_spending_insights, current.id, days))
+
+def _mathematical_summary(db: Session, user_id: int, account_id: Optional[str], days: int) -> MathematicalCalculations:
     # Validate account_id if provided
     if account_id is not None and account_id != "None":
         try:
@@ -153,7 +109,7 @@ def get_mathematical_summary(
                 account = db.query(Account).filter(
                     and_(
                         Account.id == account_id_int,
-                        Account.user_id == current.id
+                        Account.user_id == user_id
                     )
                 ).first()
                 if not account:
@@ -164,233 +120,93 @@ def get_mathematical_summary(
                 pass
         except (ValueError, TypeError):
             raise HTTPException(status_code=400, detail="Invalid account_id parameter")
-    """Get comprehensive mathematical calculations for financial data"""
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    # Build query
-    query = db.query(Transaction).filter(
-        and_(
-            Transaction.user_id == current.id,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date
-        )
-    )
-    
+    account_filter = None
     if account_id is not None and account_id != "None":
         try:
-            account_id_int = int(account_id)
-            query = query.filter(Transaction.account_id == account_id_int)
+            account_filter = int(account_id)
         except (ValueError, TypeError):
             # If account_id is invalid, just continue without filtering
             pass
     
-    transactions = query.all()
-    
-    if not transactions:
-        return MathematicalCalculations(
-            mean=0, median=0, standard_deviation=0, variance=0,
-            min_value=0, max_value=0, total_transactions=0,
-            income_total=0, expense_total=0, net_flow=0
-        )
-    
-    # Ensure we have valid numeric data
-    valid_amounts = []
-    for t in transactions:
-        try:
-            amount = float(t.amount)
-            if not (amount == float('inf') or amount == float('-inf') or amount != amount):  # Check for inf, -inf, NaN
-                valid_amounts.append(amount)
-        except (ValueError, TypeError):
-            continue
-    
-    if not valid_amounts:
-        return MathematicalCalculations(
-            mean=0, median=0, standard_deviation=0, variance=0,
-            min_value=0, max_value=0, total_transactions=0,
-            income_total=0, expense_total=0, net_flow=0
-        )
-    
-    # Separate income and expenses
-    amounts = valid_amounts
-    income = [amt for amt in amounts if amt > 0]
-    expenses = [abs(amt) for amt in amounts if amt < 0]
-    
-    # Calculate statistics
-    mean_amount = statistics.mean(amounts)
-    median_amount = statistics.median(amounts)
-    std_dev = statistics.stdev(amounts) if len(amounts) > 1 else 0
-    variance = statistics.variance(amounts) if len(amounts) > 1 else 0
-    
-    return MathematicalCalculations(
-        mean=round(mean_amount, 2),
-        median=round(median_amount, 2),
-        standard_deviation=round(std_dev, 2),
-        variance=round(variance, 2),
-        min_value=round(min(amounts), 2),
-        max_value=round(max(amounts), 2),
-        total_transactions=len(transactions),
-        income_total=round(sum(income), 2) if income else 0,
-        expense_total=round(sum(expenses), 2) if expenses else 0,
-        net_flow=round(sum(income) - sum(expenses), 2) if income and expenses else (sum(income) if income else -sum(expenses))
-    )
+    if column_cache.enabled:
+        cols = column_cache.columns(db, user_id).window(start_date, end_date)
+        return (cols if account_filter is None else cols.for_account(account_filter)).summary()
+    # Aggregated in the database; no ORM rows are loaded
+    return summarize_transactions(db, user_id, start_date, end_date, account_filter)
 
-@router.get("/trend-analysis", response_model=TrendAnalysis)
-def get_trend_analysis(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
-    days: int = Query(90, description="Number of days to analyze")
+@router.get("/mathematical-summary", response_model=MathematicalCalculations)
+async def get_mathematical_summary(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    account_id: Optional[str] = Query(None, description="Specific account ID"),
+    days: int = Query(30, description="Number of days to analyze")
 ):
-    """Get trend analysis with mathematical calculations"""
+    """Get comprehensive mathematical calculations for financial data"""
+    return await conditional(request, response, db, current.id, lambda: db.run(_mathematical_summary, current.id, account_id, days))
+
+def _trend_analysis(db: Session, user_id: int, days: int) -> TrendAnalysis:
+    if column_cache.enabled:
+        return _trend_from(column_cache.columns(db, user_id), days, date.today())
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
     # Get daily spending data
-    daily_data = db.query(
-        Transaction.date,
-        func.sum(func.abs(Transaction.amount)).label('daily_total')
-    ).filter(
-        and_(
-            Transaction.user_id == current.id,
-            Transaction.date >= start_date,
-            Transaction.date <= end_date,
-            Transaction.amount < 0
-        )
-    ).group_by(Transaction.date).order_by(Transaction.date).all()
-    
-    if not daily_data:
-        return TrendAnalysis(
-            trend_direction="stable",
-            trend_strength=0,
-            volatility=0,
-            prediction_next_week=0,
-            mathematical_analysis="Insufficient data for analysis"
-        )
-    
-    daily_totals = []
-    for d in daily_data:
-        try:
-            total = float(d.daily_total)
-            if not (total == float('inf') or total == float('-inf') or total != total):
-                daily_totals.append(total)
-        except (ValueError, TypeError):
-            continue
-    
-    # Calculate trend using linear regression
-    n = len(daily_totals)
-    if n >= 2:
-        x_values = list(range(n))
-        y_values = daily_totals
-        
-        # Simple linear regression
-        x_mean = statistics.mean(x_values)
-        y_mean = statistics.mean(y_values)
-        
-        numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values))
-        denominator = sum((x - x_mean) ** 2 for x in x_values)
-        
-        if denominator != 0:
-            slope = numerator / denominator
-            trend_direction = "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable"
-            trend_strength = abs(slope)
-        else:
-            trend_direction = "stable"
-            trend_strength = 0
-    else:
-        trend_direction = "stable"
-        trend_strength = 0
-    
-    # Calculate volatility (standard deviation)
-    volatility = statistics.stdev(daily_totals) if len(daily_totals) > 1 else 0
-    
-    # Simple prediction for next week
-    if daily_totals:
-        recent_avg = statistics.mean(daily_totals[-7:]) if len(daily_totals) >= 7 else statistics.mean(daily_totals)
-        prediction_next_week = round(recent_avg * 7, 2)
-    else:
-        prediction_next_week = 0
-    
-    # Mathematical analysis summary
-    if n >= 10:
-        analysis = f"Based on {n} days of data. Trend: {trend_direction}, Volatility: {volatility:.2f}, Prediction: ${prediction_next_week:.2f}"
-    elif n >= 5:
-        analysis = f"Limited data ({n} days). Trend: {trend_direction}, Volatility: {volatility:.2f}"
-    else:
-        analysis = f"Insufficient data ({n} days) for reliable analysis"
-    
-    return TrendAnalysis(
-        trend_direction=trend_direction,
-        trend_strength=round(trend_strength, 4),
-        volatility=round(volatility, 2),
-        prediction_next_week=prediction_next_week,
-        mathematical_analysis=analysis
-    )
+    daily_data = rollups.daily_spend(db, user_id, start_date, end_date)
+    return reports.trend_analysis([float(d.daily_total) for d in daily_data])
+
+@router.get("/trend-analysis", response_model=TrendAnalysis)
+async def get_trend_analysis(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    days: int = Query(90, description="Number of days to analyze")
+):
+    """Get trend analysis with mathematical calculations"""
+    return await conditional(request, response, db, current.id, lambda: db.run(_trend_analysis, current.id, days))
+
+def _balances(db: Session, user_id: int) -> list:
+    return [balance for (balance,) in db.query(Account.balance).filter(Account.user_id == user_id)]
+
+def _all_time_totals(db: Session, user_id: int):
+    return summarize(column(
+        amount for (amount,) in db.query(Transaction.amount).filter(Transaction.user_id == user_id)
+    ))
+
+def _cached_financial_summary(db: Session, user_id: int) -> FinancialSummary:
+    return _summary_from(column_cache.columns(db, user_id), _balances(db, user_id), date.today())
 
 @router.get("/financial-summary", response_model=FinancialSummary)
-def get_financial_summary(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+async def get_financial_summary(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user)
 ):
     """Get comprehensive financial summary with all mathematical calculations"""
-    # Get all user accounts
-    accounts = db.query(Account).filter(Account.user_id == current.id).all()
-    
-    # Get all transactions
-    transactions = db.query(Transaction).filter(Transaction.user_id == current.id).all()
-    
-    if not transactions:
-        return FinancialSummary(
-            total_balance=0,
-            total_income=0,
-            total_expenses=0,
-            net_worth=0,
-            account_count=len(accounts),
-            mathematical_summary=MathematicalCalculations(
-                mean=0, median=0, standard_deviation=0, variance=0,
-                min_value=0, max_value=0, total_transactions=0,
-                income_total=0, expense_total=0, net_flow=0
-            )
+    async def compute() -> FinancialSummary:
+        if column_cache.enabled:
+            return await db.run(_cached_financial_summary, current.id)
+        # Balances, all-time totals and the windowed summary are independent; run them concurrently
+        balances, totals, math_summary = await db.gather(
+            (_balances, current.id),
+            (_all_time_totals, current.id),
+            (_mathematical_summary, current.id, None, reports.SUMMARY_WINDOW_DAYS),
         )
-    
-    # Calculate totals with validation
-    total_balance = 0
-    for acc in accounts:
-        try:
-            balance = float(acc.balance)
-            if not (balance == float('inf') or balance == float('-inf') or balance != balance):
-                total_balance += balance
-        except (ValueError, TypeError):
-            continue
-    
-    amounts = []
-    for t in transactions:
-        try:
-            amount = float(t.amount)
-            if not (amount == float('inf') or amount == float('-inf') or amount != amount):
-                amounts.append(amount)
-        except (ValueError, TypeError):
-            continue
-    
-    total_income = sum(amt for amt in amounts if amt > 0)
-    total_expenses = sum(abs(amt) for amt in amounts if amt < 0)
-    net_worth = total_income - total_expenses
-    
-    # Get mathematical summary
-    math_summary = get_mathematical_summary(db, current, None, 365)
-    
-    return FinancialSummary(
-        total_balance=round(total_balance, 2),
-        total_income=round(total_income, 2),
-        total_expenses=round(total_expenses, 2),
-        net_worth=round(net_worth, 2),
-        account_count=len(accounts),
-        mathematical_summary=math_summary
-    )
+        if not totals.total_transactions:
+            return reports.financial_summary(balances, totals, empty_summary())
+        return reports.financial_summary(balances, totals, math_summary)
+
+    return await conditional(request, response, db, current.id, compute)
 
 @router.get("/debug-params")
-def debug_parameters(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
+async def debug_parameters(
+    current: Principal = Depends(get_current_user),
     account_id: Optional[str] = Query(None, description="Debug account ID parameter")
 ):
     """Debug endpoint to check parameter handling"""
@@ -403,47 +219,121 @@ def debug_parameters(
     }
 
 @router.get("/pluto-score", response_model=PlutoScore)
-def pluto_score(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    """Calculate Pluto financial health score with mathematical analysis"""
-    since = date.today() - timedelta(days=30)
-    # Get income and spending with validation
-    income_result = db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-        Transaction.user_id == current.id, Transaction.date >= since, Transaction.amount > 0
-    ).scalar() or 0
-    
-    spend_result = db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-        Transaction.user_id == current.id, Transaction.date >= since, Transaction.amount < 0
-    ).scalar() or 0
-    
-    try:
-        income = float(income_result)
-        spend = abs(float(spend_result))
-        
-        # Validate the values
-        if income == float('inf') or income == float('-inf') or income != income:
-            income = 0
-        if spend == float('inf') or spend == float('-inf') or spend != spend:
-            spend = 0
-    except (ValueError, TypeError):
-        income = 0
-        spend = 0
-    savings_rate = (income - spend) / income if income > 0 else 0.0
-    distinct_cats = db.query(Transaction.category).filter(
-        Transaction.user_id == current.id, Transaction.date >= since, Transaction.category.isnot(None)
-    ).distinct().count()
-    diversity = min(distinct_cats, 6) / 6.0
-    score = max(0, min(100, round((0.7 * savings_rate + 0.3 * diversity) * 100, 2)))
-    return PlutoScore(
-        score=score,
-        window_days=30,
-        income_30d=round(income, 2),
-        spend_30d=round(spend, 2),
-        savings_rate=round(savings_rate, 3),
-        category_diversity=distinct_cats,
+async def pluto_score(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    live: bool = Query(False, description="Recompute now instead of serving the stored score"),
+):
+    """Pluto financial health score, served from the precomputed pluto_scores table"""
+    if live:
+        # Skips the response cache too
+        return await db.run(scores.score, current.id, True)
+    return await conditional(request, response, db, current.id, lambda: db.run(scores.score, current.id))
+
+def _dashboard(db: Session, user_id: int, wanted: set, spending_days: int, trend_days: int) -> DashboardInsights:
+    today = date.today()
+    if column_cache.enabled:
+        cols = column_cache.columns(db, user_id)
+    else:
+        # The all-time totals in the summary need full history; otherwise load only the widest window
+        if "summary" in wanted:
+            load_from = None
+        else:
+            widest = max(
+                spending_days if "spending" in wanted else 0,
+                trend_days if "trend" in wanted else 0,
+                reports.SCORE_WINDOW_DAYS if "score" in wanted else 0,
+            )
+            load_from = today - timedelta(days=widest)
+        cols = TransactionColumns.load(db, user_id, load_from)
+    result = DashboardInsights()
+    
+    if "spending" in wanted:
+        result.spending = _spending_from(cols, spending_days, today)
+    if "summary" in wanted:
+        result.summary = _summary_from(cols, _balances(db, user_id), today)
+    if "trend" in wanted:
+        result.trend = _trend_from(cols, trend_days, today)
+    if "score" in wanted:
+        result.score = _score_from(cols, today)
+    return result
+
+@router.get("/dashboard", response_model=DashboardInsights, response_model_exclude_none=True)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated sections to include: {', '.join(DASHBOARD_SECTIONS)}"
+    ),
+    spending_days: int = Query(30, description="Window for the spending section"),
+    trend_days: int = Query(90, description="Window for the trend section"),
+):
+    """Spending, summary, trend and score for one dashboard load, computed from a single scan"""
+    if fields:
+        wanted = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = wanted - set(DASHBOARD_SECTIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown dashboard fields: {', '.join(sorted(unknown))}")
+    else:
+        wanted = set(DASHBOARD_SECTIONS)
+    return await conditional(request, response, db, current.id, lambda: db.run(_dashboard, current.id, wanted, spending_days, trend_days))
+
+@router.get("/series", response_model=TimeSeries)
+async def get_series(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    bucket: Literal["day", "week", "month"] = Query("month", description="Bucket width; weeks start on Monday"),
+    metric: Literal["spend", "income", "net"] = Query("spend", description="Value summed per bucket"),
+    group_by: Optional[Literal["category", "account"]] = Query(None, description="Split into one series per group"),
+    periods: int = Query(12, ge=1, le=series.MAX_PERIODS, description="Number of buckets"),
+    end_date: Optional[date] = Query(None, description="Last day covered; defaults to today"),
+):
+    """Zero-filled totals per day, week or month for charting, aggregated in SQL from the daily rollups"""
+    return await conditional(
+        request, response, db, current.id,
+        lambda: db.run(series.series, current.id, bucket, metric, group_by, periods, end_date),
     )
 
+def _gemini_insights(db: Session, user_id: int) -> tuple[GeminiInsight | None, JobRead | None]:
+    hit = cached_insight(db, user_id, data_fingerprint(db, user_id))
+    if hit is not None:
+        insight_stats.count(hits=1, llm_calls_avoided=1)
+        return hit, None
+    insight_stats.count(misses=1)
+    return latest_insight(db, user_id), job_read(jobs.submit(db, REFRESH_JOB, user_id))
+
+def _refresh_gemini_insights(db: Session, user_id: int) -> JobRead:
+    return job_read(jobs.submit(db, REFRESH_JOB, user_id))
+
+def _job_accepted(job: JobRead) -> JSONResponse:
+    return JSONResponse(status_code=202, content={"job": job.model_dump(mode="json")},
+                        headers={"Location": job.status_url})
+
 @router.get("/gemini-insights", response_class=JSONResponse)
-def gemini_financial_insights():
-    """Get financial insights and recommendations from Gemini Pro 2.5"""
-    result = get_financial_insights()
-    return JSONResponse(content=result)
\ No newline at end of file
+async def gemini_financial_insights(db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    """Get financial insights and recommendations from Gemini Pro 2.5
+
+    Insights are stored per user under a fingerprint of the data they were
+    generated from, and one matching the current data is served as is. When
+    the data has changed, the last good insight is served while a background
+    job regenerates it (`refresh` holds the job); with nothing to serve yet
+    the response is 202 with the job's status URL.
+    """
+    latest, job = await db.run(_gemini_insights, current.id)
+    if latest is None:
+        return _job_accepted(job)
+    content = json.loads(latest.insights_json)
+    content["generated_at"] = latest.created_at.isoformat()
+    content["refresh"] = job.model_dump(mode="json") if job else None
+    return JSONResponse(content=content)
+
+@router.post("/gemini-insights/refresh", status_code=202, response_model=JobRead)
+async def refresh_gemini_insights(db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    """Regenerate the user's insights if their data changed, or join the refresh already running"""
+    return _job_accepted(await db.run(_refresh_gemini_insights, current.id))
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.core.principals import Principal
+from app.db.session import Database
+from app.deps import get_db, get_current_user
+from app.models.job import Job
+from app.schemas.job import JobRead
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+def job_read(job: Job) -> JobRead:
+    return JobRead(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        status_url=f"/jobs/{job.id}"
+    )
+
+def _get_job(db: Session, user_id: int, job_id: int) -> JobRead:
+    job = db.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_read(job)
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(job_id: int, db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    """Poll a background job started by another endpoint"""
+    return await db.run(_get_job, current.id, job_id)
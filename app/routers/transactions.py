@@ -1,47 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from datetime import date
+from typing import Literal
+from app.config import settings
+from app.core.conditional import conditional
+from app.core.responses import accepts_gzip, fast_json
+from app.core.pagination import InvalidCursor, decode_cursor, keyset_page, offset_page
+from app.db.session import Database
+from app.core.principals import Principal
 from app.deps import get_db, get_current_user
-from app.schemas.transaction import TransactionCreate, TransactionRead
+from app.schemas.transaction import BulkImportResult, TransactionCreate, TransactionRead
 from app.models.transaction import Transaction
 from app.models.account import Account
-from app.models.user import User
+from app.services import balances, changes, export, importer, ledger, lookups, rollups
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
-@router.post("", response_model=TransactionRead, status_code=201)
-def create_txn(payload: TransactionCreate, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    acct = db.query(Account).filter(and_(Account.id == payload.account_id, Account.user_id == current.id)).first()
+def _create_txn(db: Session, user_id: int, payload: TransactionCreate) -> TransactionRead:
+    acct = db.query(Account).filter(and_(Account.id == payload.account_id, Account.user_id == user_id)).first()
     if not acct:
         raise HTTPException(status_code=404, detail="Account not found")
+    category = payload.category or "Other"
     t = Transaction(
-        user_id=current.id, account_id=payload.account_id, date=payload.date,
-        amount=payload.amount, category=payload.category or "Other", description=payload.description
+        user_id=user_id, account_id=payload.account_id, date=payload.date, amount=payload.amount,
+        **lookups.encode(db, [{"category": category, "description": payload.description}])[0],
     )
-    db.add(t); db.commit(); db.refresh(t)
-    return TransactionRead(id=t.id, account_id=t.account_id, date=t.date, amount=t.amount, category=t.category, description=t.description)
+    db.add(t)
+    rollups.apply_transactions(db, [t])
+    balances.adjust(db, {t.account_id: t.amount})
+    ledger.bump(db, user_id)
+    changes.record(db, user_id, "added", Transaction.id == t.id)
+    db.commit(); db.refresh(t)
+    return TransactionRead(id=t.id, account_id=t.account_id, date=t.date, amount=t.amount, category=category, description=payload.description)
+
+@router.post("", response_model=TransactionRead, status_code=201)
+async def create_txn(payload: TransactionCreate, db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    return fast_json(await db.run(_create_txn, current.id, payload), status_code=201)
+
+def _delete_txn(db: Session, user_id: int, transaction_id: int) -> dict:
+    t = db.query(Transaction).filter(Transaction.id == transaction_id, Transaction.user_id == user_id).first()
+    if not t:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    ledger.bump(db, user_id)
+    changes.record(db, user_id, "removed", Transaction.id == t.id)
+    account_id, day, amount = t.account_id, t.date, t.amount
+    db.delete(t)
+    db.flush()
+    balances.adjust(db, {account_id: -amount})
+    rollups.rebuild(db, user_id, account_id, day, day)
+    db.commit()
+    return {"message": "Transaction deleted successfully"}
+
+@router.delete("/{transaction_id}")
+async def delete_txn(transaction_id: int, db: Database = Depends(get_db), current: Principal = Depends(get_current_user)):
+    return await db.run(_delete_txn, current.id, transaction_id)
+
+def _criteria(user_id: int, account_id, category, from_date, to_date) -> list:
+    criteria = [Transaction.user_id == user_id]
+    if account_id: criteria.append(Transaction.account_id == account_id)
+    if category: criteria.append(lookups.has_category(category))
+    if from_date: criteria.append(Transaction.date >= from_date)
+    if to_date: criteria.append(Transaction.date <= to_date)
+    return criteria
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import_txns(
+    request: Request,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] | None = Query(None, description="Defaults to the Content-Type (text/csv or NDJSON)"),
+):
+    """Insert NDJSON or CSV rows streamed in the body as one transaction; bad rows are reported, not fatal."""
+    upload = importer.BulkImport(
+        current.id, format or importer.format_for(request.headers.get("content-type")),
+        settings.IMPORT_BATCH_ROWS, settings.IMPORT_MAX_ERRORS, settings.IMPORT_SPOOL_BYTES,
+    )
+    # The body is spooled before any database work, so no transaction waits on the client
+    async for chunk in request.stream():
+        upload.feed(chunk)
+    return await db.run(upload.finish)
+
+def _list_txns(
+    db: Session, user_id: int, account_id, category, from_date, to_date, limit, offset, cursor, include_total
+) -> tuple[list[TransactionRead], dict]:
+    headers = {}
+    q = db.query(Transaction).filter(*_criteria(user_id, account_id, category, from_date, to_date))
+    if include_total:
+        headers["X-Total-Count"] = str(q.count())
+    if cursor:
+        try:
+            page = keyset_page(q, Transaction.date, Transaction.id, limit, decode_cursor(cursor))
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        page = offset_page(q, Transaction.date, Transaction.id, limit, offset)
+    if page.next_cursor: headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor: headers["X-Prev-Cursor"] = page.prev_cursor
+    return [
+        TransactionRead(
+            id=t.id, account_id=t.account_id, date=t.date,
+            amount=t.amount, category=t.category, description=t.description
+        ) for t in page.rows
+    ], headers
 
 @router.get("", response_model=list[TransactionRead])
-def list_txns(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
+async def list_txns(
+    request: Request,
+    response: Response,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
     account_id: int | None = None,
     category: str | None = None,
     from_date: date | None = Query(None, alias="from"),
     to_date: date | None = Query(None, alias="to"),
     limit: int = 50,
     offset: int = 0,
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor / X-Prev-Cursor; replaces offset"),
+    include_total: bool = Query(False, description="Count matching rows and return it in X-Total-Count"),
 ):
-    q = db.query(Transaction).filter(Transaction.user_id == current.id)
-    if account_id: q = q.filter(Transaction.account_id == account_id)
-    if category: q = q.filter(Transaction.category == category)
-    if from_date: q = q.filter(Transaction.date >= from_date)
-    if to_date: q = q.filter(Transaction.date <= to_date)
-    items = q.order_by(Transaction.date.desc()).offset(offset).limit(limit).all()
-    return [
-        TransactionRead(
-            id=t.id, account_id=t.account_id, date=t.date,
-            amount=t.amount, category=t.category, description=t.description
-        ) for t in items
-    ]
+    rows, headers = await conditional(request, response, db, current.id, lambda: db.run(
+        _list_txns, current.id, account_id, category, from_date, to_date, limit, offset, cursor, include_total
+    ))
+    response.headers.update(headers)
+    return fast_json(rows, response)
+
+def _export_chunks(db: Session, criteria: list, fmt: str, gzip: bool):
+    chunks = export.transaction_chunks(db, criteria, fmt, settings.EXPORT_BATCH_ROWS)
+    return export.gzip_chunks(chunks) if gzip else chunks
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_txns(
+    request: Request,
+    db: Database = Depends(get_db),
+    current: Principal = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    account_id: int | None = None,
+    category: str | None = None,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+):
+    """Every matching transaction, streamed in (date, id) order; gzip-encoded when the client accepts it."""
+    gzip = accepts_gzip(request)
+    headers = {"Content-Disposition": f'attachment; filename="transactions.{format}"', "Vary": "Accept-Encoding"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    criteria = _criteria(current.id, account_id, category, from_date, to_date)
+    return StreamingResponse(
+        db.stream(_export_chunks, criteria, format, gzip), media_type=export.MEDIA_TYPES[format], headers=headers
+    )
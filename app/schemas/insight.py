@@ -59,6 +59,33 @@ class PlutoScore(BaseModel):
     savings_rate: float
     category_diversity: int
 
+class SeriesLine(BaseModel):
+    """One category's or account's values, aligned with TimeSeries.buckets"""
+    id: Optional[int]  # None for uncategorized
+    name: str
+    total: float
+    values: List[float]
+
+class TimeSeries(BaseModel):
+    """Dense, bucketed totals for charting"""
+    bucket: str  # "day", "week", "month"
+    metric: str  # "spend", "income", "net"
+    group_by: Optional[str]
+    start_date: datetime.date
+    end_date: datetime.date
+    buckets: List[datetime.date]  # start of each bucket, oldest first
+    totals: List[float]
+    series: List[SeriesLine]  # empty unless grouped
+
+DASHBOARD_SECTIONS = ("spending", "summary", "trend", "score")
+
+class DashboardInsights(BaseModel):
+    """Dashboard sections computed together; sections not requested are omitted"""
+    spending: Optional[SpendingInsight] = None
+    summary: Optional[FinancialSummary] = None
+    trend: Optional[TrendAnalysis] = None
+    score: Optional[PlutoScore] = None
+
 class GeminiInsightOut(BaseModel):
     id: int
     user_id: int
@@ -0,0 +1,12 @@
+import datetime
+from pydantic import BaseModel
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: str  # queued | running | succeeded | failed
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    error: str | None = None
+    status_url: str
@@ -30,6 +30,21 @@ class PlaidTransaction(BaseModel):
 class PlaidTransactionsGetResponse(BaseModel):
     accounts: List[PlaidAccount]
     transactions: List[PlaidTransaction]
-    total_transactions: int
+    total_transactions: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
     item: Dict[str, str] = {"item_id": "fake_item_001", "institution_id": "ins_fake_001"}
     request_id: str = "req_fake_0001"
+
+class PlaidRemovedTransaction(BaseModel):
+    transaction_id: str
+    account_id: str
+
+class PlaidTransactionsSyncResponse(BaseModel):
+    added: List[PlaidTransaction]
+    modified: List[PlaidTransaction]
+    removed: List[PlaidRemovedTransaction]
+    next_cursor: str
+    has_more: bool
+    request_id: str = "req_fake_sync"
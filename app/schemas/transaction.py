@@ -16,3 +16,12 @@ class TransactionRead(BaseModel):
     amount: Decimal
     category: str | None = None
     description: str | None = None
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[ImportRowError]
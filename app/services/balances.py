@@ -0,0 +1,182 @@
+"""
+Materialized account balances.
+
+`accounts.balance` is a running total of the account's transactions. Every
+write that inserts or deletes transactions calls `adjust` in the same unit
+of work; it issues `balance = balance + delta` in SQL, so concurrent writers
+never overwrite each other's changes. Readers (`/accounts`, the Plaid
+`balances` field, the reports) use the stored value and never sum
+transactions.
+
+`reconcile` verifies the totals in batches of accounts, one aggregate query
+per batch, and repairs drift with a correlated UPDATE. Each repaired row
+must still hold the balance that was checked, so a write that lands between
+check and repair is never clobbered; that account is looked at again on
+the next sweep. `BalanceReconciler` runs a sweep on a background thread
+every BALANCE_RECONCILE_SECONDS; `pluto reconcile-balances` runs one from
+the CLI.
+"""
+import datetime
+import logging
+import threading
+from decimal import Decimal
+from typing import Mapping, Optional
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import register
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services import ledger
+
+log = logging.getLogger(__name__)
+
+CENTS = Decimal("0.01")
+HALF_CENT = Decimal("0.005")
+# Drifted accounts listed in a reconcile report; all of them are counted
+DRIFT_SAMPLE = 100
+
+def adjust(db: Session, deltas: Mapping[int, Decimal]) -> None:
+    """Add each delta to its account's stored balance; nothing is committed."""
+    accounts = Account.__table__
+    params = [{"account_id": a, "delta": d} for a, d in deltas.items() if d]
+    if params:
+        db.execute(
+            update(accounts).where(accounts.c.id == bindparam("account_id"))
+            .values(balance=accounts.c.balance + bindparam("delta")),
+            params,
+        )
+
+def _actual_balance(account_id_col):
+    return select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+        Transaction.account_id == account_id_col
+    ).scalar_subquery()
+
+def check(db: Session, after_id: int, limit: int, user_id: Optional[int] = None) -> list[tuple]:
+    """(account id, user id, stored, actual) for the next `limit` accounts after `after_id`."""
+    stmt = (
+        select(Account.id, Account.user_id, Account.balance, func.coalesce(func.sum(Transaction.amount), 0))
+        .outerjoin(Transaction, Transaction.account_id == Account.id)
+        .where(Account.id > after_id)
+        .group_by(Account.id, Account.user_id, Account.balance)
+        .order_by(Account.id)
+        .limit(limit)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Account.user_id == user_id)
+    return db.execute(stmt).all()
+
+def _money(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+def reconcile(db: Session, user_id: Optional[int] = None, batch_size: int = 500, repair: bool = True) -> dict:
+    """Verify every account (or one user's) and, unless `repair` is False, fix drifted balances.
+
+    Commits after each batch. Returns counts and the first DRIFT_SAMPLE drifted accounts.
+    """
+    accounts = Account.__table__
+    report = {"checked": 0, "drifted": 0, "repaired": 0, "drift": []}
+    after_id = 0
+    while True:
+        rows = check(db, after_id, batch_size, user_id)
+        if not rows:
+            break
+        after_id = rows[-1][0]
+        report["checked"] += len(rows)
+        drifted = [(a, u, stored, actual) for a, u, stored, actual in rows if _money(stored) != _money(actual)]
+        report["drifted"] += len(drifted)
+        report["drift"] += [
+            {"account_id": a, "user_id": u, "stored": str(_money(stored)), "actual": str(_money(actual))}
+            for a, u, stored, actual in drifted[:DRIFT_SAMPLE - len(report["drift"])]
+        ]
+        if repair and drifted:
+            # SQLite keeps NUMERIC as REAL, so "unchanged since the check" is compared to the cent
+            repaired = db.execute(
+                update(accounts)
+                .where(accounts.c.id == bindparam("account_id"),
+                       func.abs(accounts.c.balance - bindparam("stored")) < HALF_CENT)
+                .values(balance=_actual_balance(accounts.c.id)),
+                [{"account_id": a, "stored": stored} for a, _, stored, _ in drifted],
+            ).rowcount
+            for owner in {u for _, u, _, _ in drifted}:
+                ledger.bump(db, owner)
+            report["repaired"] += max(repaired, 0)
+        db.commit()
+    return report
+
+class ReconcileStats:
+    """Counters for GET /debug/caches: balances are a cache of the transaction sums."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.checked = 0
+        self.drifted = 0
+        self.repaired = 0
+        self.last_run_at: Optional[str] = None
+
+    def record(self, report: dict) -> None:
+        with self._lock:
+            self.runs += 1
+            self.checked += report["checked"]
+            self.drifted += report["drifted"]
+            self.repaired += report["repaired"]
+            self.last_run_at = datetime.datetime.utcnow().isoformat()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"runs": self.runs, "checked": self.checked, "drifted": self.drifted,
+                    "repaired": self.repaired, "last_run_at": self.last_run_at}
+
+reconcile_stats = register("account_balances", ReconcileStats())
+
+class BalanceReconciler:
+    """Background thread that reconciles every account each `interval` seconds."""
+
+    def __init__(self, sessions: sessionmaker, interval: float, batch_size: int = 500):
+        self.sessions = sessions
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> dict:
+        with self.sessions() as db:
+            report = reconcile(db, batch_size=self.batch_size)
+        reconcile_stats.record(report)
+        if report["drifted"]:
+            log.warning("Repaired %d of %d drifted account balances", report["repaired"], report["drifted"])
+        return report
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="pluto-balances", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("Balance reconciliation failed")
+
+_reconciler: BalanceReconciler | None = None
+
+def start(sessions: sessionmaker, interval: float, batch_size: int) -> BalanceReconciler | None:
+    global _reconciler
+    if interval <= 0:
+        return None
+    _reconciler = BalanceReconciler(sessions, interval, batch_size)
+    _reconciler.start()
+    return _reconciler
+
+def stop() -> None:
+    global _reconciler
+    if _reconciler is not None:
+        _reconciler.stop()
+        _reconciler = None
@@ -0,0 +1,92 @@
+"""
+Transaction change log behind `/fake/plaid/transactions/sync`.
+
+Write paths call `record` in the same unit of work as the rows they touch,
+so a change is logged exactly when its write commits. `record` is set-based:
+one INSERT ... SELECT per call, whatever the number of transactions, and it
+must run while the transactions still exist (before a delete, after an
+insert is flushed).
+
+A log position is a (version, seq) pair. `seq` alone would not do: on
+PostgreSQL a sequence value is drawn at insert time but becomes visible at
+commit, so a client could read seq 11 while seq 10 is still in flight and
+skip 10 for good. Entries are therefore stamped with the user's data
+version, and `record` must run after the write path's `ledger.bump`. The
+bump holds the user's ledger row lock until commit, so a concurrent writer for the same user waits and then gets
+a higher version: versions follow commit order, and an entry that becomes
+visible later always sorts after everything a client has already read.
+
+A sync cursor is the last position the client has seen. Clients that start
+without one first receive a snapshot of the live transactions, paged by id,
+with the log position taken when the snapshot began; anything written while
+they page is then replayed from the log. A transaction can therefore be
+reported as added twice, so clients apply changes by transaction id.
+
+Only `added` and `removed` are logged: transactions have no update path, so
+the feed's `modified` list stays empty. `modified` is kept in the response
+shape (and in CHANGE_KINDS) for Plaid compatibility and for a future edit
+endpoint, which would call `record(db, user_id, "modified", ...)`.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import insert, literal, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.pagination import InvalidCursor
+from app.models.account import Account
+from app.models.data_version import DataVersion
+from app.models.transaction import Transaction
+from app.models.transaction_change import TransactionChange
+
+def record(db: Session, user_id: int, kind: str, *criteria) -> None:
+    """Log `kind` (added, modified or removed) for every one of the user's transactions matching `criteria`.
+
+    Call after `ledger.bump` in the same transaction: the entries take the bumped version.
+    """
+    version = select(DataVersion.version).where(DataVersion.user_id == user_id).scalar_subquery()
+    source = select(
+        Transaction.user_id, Transaction.account_id, Account.mask, Transaction.id, literal(kind), version
+    ).join(Account, Account.id == Transaction.account_id).where(Transaction.user_id == user_id, *criteria)
+    db.execute(insert(TransactionChange).from_select(
+        ["user_id", "account_id", "account_label", "transaction_id", "kind", "version"], source
+    ))
+
+@dataclass(frozen=True)
+class SyncCursor:
+    """Log position; while `after_id` is set the client is still paging the initial snapshot."""
+    version: int
+    seq: int
+    after_id: Optional[int] = None
+
+def head(db: Session, user_id: int) -> SyncCursor:
+    """The user's latest log position ((0, 0) before any change)."""
+    last = db.execute(
+        select(TransactionChange.version, TransactionChange.seq).where(TransactionChange.user_id == user_id)
+        .order_by(TransactionChange.version.desc(), TransactionChange.seq.desc()).limit(1)
+    ).first()
+    return SyncCursor(*last) if last else SyncCursor(0, 0)
+
+def after(cursor: SyncCursor):
+    """Filter for the log entries past `cursor`."""
+    return tuple_(TransactionChange.version, TransactionChange.seq) > tuple_(cursor.version, cursor.seq)
+
+def encode_sync_cursor(cursor: SyncCursor) -> str:
+    payload = {"v": cursor.version, "s": cursor.seq}
+    if cursor.after_id is not None:
+        payload["a"] = cursor.after_id
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_sync_cursor(token: str) -> SyncCursor:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        after_id = payload.get("a")
+        # Cursors issued before entries carried versions hold only a seq; those entries are at version 0
+        return SyncCursor(
+            version=int(payload.get("v", 0)), seq=int(payload["s"]),
+            after_id=None if after_id is None else int(after_id),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token!r}") from e
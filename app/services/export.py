@@ -0,0 +1,62 @@
+"""
+Streamed transaction exports.
+
+`transaction_chunks` reads the matching rows as plain tuples with
+`yield_per` (a server-side cursor where the driver has one), with category
+and description names joined in from their lookup tables, so neither a
+result list nor ORM objects are ever built, and encodes them a batch at a
+time into byte chunks for a StreamingResponse. Memory stays at one batch
+regardless of how many rows are exported. Rows have the same shape and
+encoding (Decimal amounts as strings, ISO dates) as `GET /transactions`,
+but oldest first by (date, id) where the listing pages newest first.
+"""
+import csv
+import io
+import zlib
+from typing import Iterable, Iterator
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.category import Category
+from app.models.merchant import Merchant
+from app.models.transaction import Transaction
+
+FIELDS = ("id", "account_id", "date", "amount", "category", "description")
+COLUMNS = (Transaction.id, Transaction.account_id, Transaction.date, Transaction.amount, Category.name, Merchant.name)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+def _ndjson(batch: list) -> bytes:
+    return b"".join(to_json(dict(zip(FIELDS, row))) + b"\n" for row in batch)
+
+def _csv(rows: Iterable) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+def transaction_chunks(db: Session, criteria: list, fmt: str, batch_rows: int) -> Iterator[bytes]:
+    """Encoded rows matching `criteria`, in (date, id) order, one chunk per `batch_rows` rows."""
+    encode = _ndjson if fmt == "ndjson" else _csv
+    if fmt == "csv":
+        yield _csv([FIELDS])
+    stmt = (
+        select(*COLUMNS)
+        .outerjoin(Category, Category.id == Transaction.category_id)
+        .outerjoin(Merchant, Merchant.id == Transaction.merchant_id)
+        .where(*criteria).order_by(Transaction.date, Transaction.id)
+    )
+    result = db.execute(stmt.execution_options(yield_per=batch_rows))
+    try:
+        for batch in result.partitions():
+            yield encode(batch)
+    finally:
+        result.close()
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a chunk stream incrementally, as one gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
@@ -2,196 +2,163 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 import random
 from typing import Optional
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, keyset_page, offset_page
 from app.models.account import Account
 from app.models.transaction import Transaction
-from app.schemas.plaid_fake import PlaidAccount, PlaidTransaction, PlaidTransactionsGetResponse
+from app.models.transaction_change import TransactionChange
+from app.schemas.plaid_fake import (
+    PlaidAccount, PlaidRemovedTransaction, PlaidTransaction, PlaidTransactionsGetResponse,
+    PlaidTransactionsSyncResponse,
+)
+from app.services import changes, ledger, lookups, rollups
 
 RNG = random.Random(123)
 
-def generate_realistic_transactions(db: Session, user_id: int, account_id: int, account_type: str, mask: str):
-    """Generate realistic transactions based on account type"""
-    today = date.today()
-    balance = Decimal('0.00')
-    
-    if account_type == "checking":
-        balance = generate_checking_transactions(db, user_id, account_id, today)
-    elif account_type == "savings":
-        balance = generate_savings_transactions(db, user_id, account_id, today)
-    elif account_type == "trading":
-        balance = generate_trading_transactions(db, user_id, account_id, today)
-    else:
-        balance = generate_checking_transactions(db, user_id, account_id, today)
-    
-    # Update account balance
-    account = db.query(Account).filter(Account.id == account_id).first()
-    if account:
-        account.balance = balance
-        db.commit()
+def _month_starts(today: date, months: int) -> list[date]:
+    """First day of the current month and the `months - 1` before it, newest first."""
+    first = today.replace(day=1)
+    starts = []
+    for _ in range(months):
+        starts.append(first)
+        first = (first - timedelta(days=1)).replace(day=1)
+    return starts
+
+def _money(rng: random.Random, low: float, high: float) -> Decimal:
+    """Random amount in [low, high] with two decimal places, built from integer cents."""
+    return Decimal(round(rng.uniform(low, high) * 100)).scaleb(-2)
+
+def _row(user_id: int, account_id: int, d: date, amount: Decimal, category: str, description: str) -> dict:
+    return {
+        "user_id": user_id, "account_id": account_id, "date": d,
+        "amount": amount, "category": category, "description": description,
+    }
+
+def insert_transactions(db: Session, rows: list[dict]) -> Decimal:
+    """Encode generated rows, insert them with one executemany and fold them into the rollups.
+
+    Returns the sum of the inserted amounts. Nothing is committed.
+    """
+    if rows:
+        db.execute(insert(Transaction), lookups.encode(db, rows))
+        rollups.apply_transactions(db, rows)
+    return sum((r["amount"] for r in rows), Decimal("0.00"))
+
+def generate_transaction_rows(
+    user_id: int, account_id: int, account_type: str, today: Optional[date] = None,
+    months: int = 3, rng: random.Random = RNG,
+) -> list[dict]:
+    """Plain row mappings for `months` of realistic activity on one account."""
+    today = today or date.today()
+    generator = {
+        "checking": generate_checking_transactions,
+        "savings": generate_savings_transactions,
+        "trading": generate_trading_transactions,
+    }.get(account_type, generate_checking_transactions)
+    return generator(user_id, account_id, today, months=months, rng=rng)
 
-def generate_checking_transactions(db: Session, user_id: int, account_id: int, today: date) -> Decimal:
+def generate_realistic_transactions(db: Session, account: Account, months: int = 3) -> Decimal:
+    """Generate realistic transactions based on account type and set the account balance"""
+    rows = generate_transaction_rows(account.user_id, account.id, account.type, months=months)
+    account.balance = insert_transactions(db, rows)
+    return account.balance
+
+def generate_checking_transactions(
+    user_id: int, account_id: int, today: date, months: int = 3, rng: random.Random = RNG
+) -> list[dict]:
     """Generate realistic checking account transactions"""
-    balance = Decimal('0.00')
-    
-    # Generate 3 months of transactions
-    for month_offset in range(3):
-        month_date = today.replace(day=1) - timedelta(days=30 * month_offset)
-        
+    rows = []
+    for month_date in _month_starts(today, months):
         # Salary (1st of month)
-        salary_amount = Decimal('3500.00')
-        db.add(Transaction(
-            user_id=user_id, account_id=account_id, date=month_date.replace(day=1),
-            amount=salary_amount, category="salary", description="Monthly salary from Employer Inc"
-        ))
-        balance += salary_amount
+        rows.append(_row(user_id, account_id, month_date.replace(day=1),
+                         Decimal('3500.00'), "salary", "Monthly salary from Employer Inc"))
         
         # Rent (3rd of month)
-        rent_amount = Decimal('-1100.00')
-        db.add(Transaction(
-            user_id=user_id, account_id=account_id, date=month_date.replace(day=3),
-            amount=rent_amount, category="rent", description="Monthly rent to My Landlord LLC"
-        ))
-        balance += rent_amount
+        rows.append(_row(user_id, account_id, month_date.replace(day=3),
+                         Decimal('-1100.00'), "rent", "Monthly rent to My Landlord LLC"))
         
         # Utilities (15th of month)
-        utilities_amount = Decimal(f"-{round(RNG.uniform(90, 140), 2)}")
-        db.add(Transaction(
-            user_id=user_id, account_id=account_id, date=month_date.replace(day=15),
-            amount=utilities_amount, category="utilities", description="City Utilities"
-        ))
-        balance += utilities_amount
+        rows.append(_row(user_id, account_id, month_date.replace(day=15),
+                         -_money(rng, 90, 140), "utilities", "City Utilities"))
         
         # Subscriptions (10th of month)
-        subscriptions = ["Netflix", "Spotify", "iCloud", "Amazon Prime"]
-        for subscription in subscriptions:
-            sub_amount = Decimal(f"-{round(RNG.uniform(5, 20), 2)}")
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=10),
-                amount=sub_amount, category="subscriptions", description=f"{subscription} subscription"
-            ))
-            balance += sub_amount
+        for subscription in ["Netflix", "Spotify", "iCloud", "Amazon Prime"]:
+            rows.append(_row(user_id, account_id, month_date.replace(day=10),
+                             -_money(rng, 5, 20), "subscriptions", f"{subscription} subscription"))
         
         # Groceries (weekly)
         for week in [5, 12, 19, 26]:
-            grocery_amount = Decimal(f"-{round(RNG.uniform(40, 120), 2)}")
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=week),
-                amount=grocery_amount, category="groceries", description="SuperMart groceries"
-            ))
-            balance += grocery_amount
+            rows.append(_row(user_id, account_id, month_date.replace(day=week),
+                             -_money(rng, 40, 120), "groceries", "SuperMart groceries"))
         
         # Dining (random days)
-        for _ in range(RNG.randint(2, 5)):
-            day = RNG.choice([4, 8, 11, 13, 17, 20, 23, 27])
-            dining_amount = Decimal(f"-{round(RNG.uniform(12, 40), 2)}")
-            restaurant = RNG.choice(["PastaPlace", "BurgerHub", "SushiGo", "TacoBell", "McDonalds"])
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                amount=dining_amount, category="dining", description=restaurant
-            ))
-            balance += dining_amount
+        for _ in range(rng.randint(2, 5)):
+            day = rng.choice([4, 8, 11, 13, 17, 20, 23, 27])
+            amount = -_money(rng, 12, 40)
+            restaurant = rng.choice(["PastaPlace", "BurgerHub", "SushiGo", "TacoBell", "McDonalds"])
+            rows.append(_row(user_id, account_id, month_date.replace(day=day), amount, "dining", restaurant))
         
         # Transportation
         for _ in range(6):
-            day = RNG.choice([2, 6, 9, 14, 16, 18, 21, 24, 28])
-            transport_amount = Decimal(f"-{round(RNG.uniform(8, 25), 2)}")
-            service = RNG.choice(["Uber", "Lyft", "MetroCard", "Shell", "Exxon"])
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                amount=transport_amount, category="transport", description=service
-            ))
-            balance += transport_amount
+            day = rng.choice([2, 6, 9, 14, 16, 18, 21, 24, 28])
+            amount = -_money(rng, 8, 25)
+            service = rng.choice(["Uber", "Lyft", "MetroCard", "Shell", "Exxon"])
+            rows.append(_row(user_id, account_id, month_date.replace(day=day), amount, "transport", service))
     
-    db.commit()
-    return balance
+    return rows
 
-def generate_savings_transactions(db: Session, user_id: int, account_id: int, today: date) -> Decimal:
+def generate_savings_transactions(
+    user_id: int, account_id: int, today: date, months: int = 3, rng: random.Random = RNG
+) -> list[dict]:
     """Generate realistic savings account transactions"""
-    balance = Decimal('0.00')
-    
-    # Generate 3 months of transactions
-    for month_offset in range(3):
-        month_date = today.replace(day=1) - timedelta(days=30 * month_offset)
-        
+    rows = []
+    for month_date in _month_starts(today, months):
         # Monthly deposit (1st of month)
-        deposit_amount = Decimal(f"{round(RNG.uniform(500, 1000), 2)}")
-        db.add(Transaction(
-            user_id=user_id, account_id=account_id, date=month_date.replace(day=1),
-            amount=deposit_amount, category="savings", description="Monthly savings deposit"
-        ))
-        balance += deposit_amount
+        rows.append(_row(user_id, account_id, month_date.replace(day=1),
+                         _money(rng, 500, 1000), "savings", "Monthly savings deposit"))
         
         # Interest (15th of month)
-        interest_amount = Decimal(f"{round(RNG.uniform(5, 15), 2)}")
-        db.add(Transaction(
-            user_id=user_id, account_id=account_id, date=month_date.replace(day=15),
-            amount=interest_amount, category="interest", description="Monthly interest earned"
-        ))
-        balance += interest_amount
+        rows.append(_row(user_id, account_id, month_date.replace(day=15),
+                         _money(rng, 5, 15), "interest", "Monthly interest earned"))
         
         # Occasional withdrawals
-        if RNG.random() < 0.3:  # 30% chance of withdrawal
-            day = RNG.randint(10, 25)
-            withdrawal_amount = Decimal(f"-{round(RNG.uniform(100, 300), 2)}")
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                amount=withdrawal_amount, category="withdrawal", description="Savings withdrawal"
-            ))
-            balance += withdrawal_amount
+        if rng.random() < 0.3:  # 30% chance of withdrawal
+            day = rng.randint(10, 25)
+            rows.append(_row(user_id, account_id, month_date.replace(day=day),
+                             -_money(rng, 100, 300), "withdrawal", "Savings withdrawal"))
     
-    db.commit()
-    return balance
+    return rows
 
-def generate_trading_transactions(db: Session, user_id: int, account_id: int, today: date) -> Decimal:
+STOCKS = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NVDA", "META"]
+
+def generate_trading_transactions(
+    user_id: int, account_id: int, today: date, months: int = 3, rng: random.Random = RNG
+) -> list[dict]:
     """Generate realistic trading account transactions"""
-    balance = Decimal('0.00')
-    
     # Initial deposit
-    initial_deposit = Decimal('10000.00')
-    db.add(Transaction(
-        user_id=user_id, account_id=account_id, date=today - timedelta(days=90),
-        amount=initial_deposit, category="deposit", description="Initial trading account deposit"
-    ))
-    balance += initial_deposit
+    rows = [_row(user_id, account_id, today - timedelta(days=30 * months),
+                 Decimal('10000.00'), "deposit", "Initial trading account deposit")]
     
-    # Generate 3 months of trading activity
-    for month_offset in range(3):
-        month_date = today.replace(day=1) - timedelta(days=30 * month_offset)
-        
+    for month_date in _month_starts(today, months):
         # Stock purchases/sales
-        for _ in range(RNG.randint(3, 8)):
-            day = RNG.randint(1, 28)
-            if RNG.random() < 0.6:  # 60% chance of purchase
-                amount = Decimal(f"-{round(RNG.uniform(100, 500), 2)}")
-                stocks = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NVDA", "META"]
-                stock = RNG.choice(stocks)
-                db.add(Transaction(
-                    user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                    amount=amount, category="investment", description=f"Purchase {stock} shares"
-                ))
-                balance += amount
+        for _ in range(rng.randint(3, 8)):
+            day = rng.randint(1, 28)
+            if rng.random() < 0.6:  # 60% chance of purchase
+                amount = -_money(rng, 100, 500)
+                description = f"Purchase {rng.choice(STOCKS)} shares"
             else:  # 40% chance of sale
-                amount = Decimal(f"{round(RNG.uniform(100, 500), 2)}")
-                stocks = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "NVDA", "META"]
-                stock = RNG.choice(stocks)
-                db.add(Transaction(
-                    user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                    amount=amount, category="investment", description=f"Sell {stock} shares"
-                ))
-                balance += amount
+                amount = _money(rng, 100, 500)
+                description = f"Sell {rng.choice(STOCKS)} shares"
+            rows.append(_row(user_id, account_id, month_date.replace(day=day), amount, "investment", description))
         
         # Dividends
-        if RNG.random() < 0.4:  # 40% chance of dividends
-            day = RNG.randint(10, 20)
-            dividend_amount = Decimal(f"{round(RNG.uniform(10, 50), 2)}")
-            db.add(Transaction(
-                user_id=user_id, account_id=account_id, date=month_date.replace(day=day),
-                amount=dividend_amount, category="dividend", description="Stock dividend payment"
-            ))
-            balance += dividend_amount
+        if rng.random() < 0.4:  # 40% chance of dividends
+            day = rng.randint(10, 20)
+            rows.append(_row(user_id, account_id, month_date.replace(day=day),
+                             _money(rng, 10, 50), "dividend", "Stock dividend payment"))
     
-    db.commit()
-    return balance
+    return rows
 
 def link_fake_account(db: Session, user_id: int, username: str, account_type: str, nickname: str = None) -> Account:
     """Link a fake account and generate transactions"""
@@ -230,40 +197,25 @@ def link_fake_account(db: Session, user_id: int, username: str, account_type: st
     )
     
     db.add(account)
-    db.commit()
-    db.refresh(account)
+    db.flush()
     
-    # Generate realistic transactions
-    generate_realistic_transactions(db, user_id, account.id, account_type, mask)
+    # Generate realistic transactions; commits together with the account
+    generate_realistic_transactions(db, account)
+    ledger.bump(db, user_id)
+    changes.record(db, user_id, "added", Transaction.account_id == account.id)
+    db.commit()
     
     return account
 
 def get_account_balance(db: Session, account_id: int) -> float:
-    """Calculate account balance from transactions"""
-    transactions = db.query(Transaction).filter(Transaction.account_id == account_id).all()
-    total = sum(float(t.amount) for t in transactions)
-    return total
+    """Stored account balance, kept current by every transaction write"""
+    return float(db.scalar(select(Account.balance).where(Account.id == account_id)) or 0)
 
 def _map_local_to_plaidish(t: Transaction, account_id_label: str) -> PlaidTransaction:
     """Map local transaction to Plaid-like format"""
     amt = float(t.amount)
     name = t.description or t.category
-    
-    pfc_primary = {
-        "salary": "INCOME_SALARY",
-        "rent": "RENT_AND_UTILITIES",
-        "utilities": "RENT_AND_UTILITIES",
-        "subscriptions": "SUBSCRIPTIONS",
-        "groceries": "FOOD_AND_DRINK",
-        "dining": "FOOD_AND_DRINK",
-        "transport": "TRANSPORTATION",
-        "savings": "TRANSFER_IN",
-        "interest": "INCOME_INTEREST",
-        "withdrawal": "TRANSFER_OUT",
-        "investment": "GENERAL_MERCHANDISE",
-        "dividend": "INCOME_DIVIDEND",
-        "deposit": "TRANSFER_IN"
-    }.get(t.category, "GENERAL_MERCHANDISE")
+    category = t.category_entry
     
     return PlaidTransaction(
         account_id=account_id_label,
@@ -277,7 +229,7 @@ def _map_local_to_plaidish(t: Transaction, account_id_label: str) -> PlaidTransa
         pending=False,
         payment_channel="online",
         transaction_type="special",
-        personal_finance_category={"primary": pfc_primary},
+        personal_finance_category={"primary": category.pfc_primary if category else lookups.DEFAULT_PFC},
         location={"city": None, "region": None, "country": "US"},
         payment_meta={"reference_number": None},
     )
@@ -289,9 +241,17 @@ def plaidish_transactions_get(
     start_date: str = None, 
     end_date: str = None, 
     limit: int = 100, 
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
 ) -> PlaidTransactionsGetResponse:
-    """Get transactions in Plaid-like format"""
+    """Get transactions in Plaid-like format.
+
+    With `cursor` the page is read by keyset and the total is the estimate
+    carried in the cursor from the first page; pass include_total=True to
+    recount. Without it the legacy offset page is returned and counted
+    unless include_total=False.
+    """
     # Find account by mask
     account = db.query(Account).filter(
         Account.user_id == user_id, 
@@ -312,11 +272,17 @@ def plaidish_transactions_get(
     if end_date:
         q = q.filter(Transaction.date <= datetime.fromisoformat(end_date).date())
     
-    q = q.order_by(Transaction.date.desc())
-    total = q.count()
-    rows = q.offset(offset).limit(limit).all()
+    if cursor:
+        position = decode_cursor(cursor)
+        total = q.count() if include_total else position.total
+        total_is_estimate = not include_total and total is not None
+        page = keyset_page(q, Transaction.date, Transaction.id, limit, position, total=total)
+    else:
+        total = q.count() if include_total is not False else None
+        total_is_estimate = False
+        page = offset_page(q, Transaction.date, Transaction.id, limit, offset, total=total)
     
-    txns = [_map_local_to_plaidish(t, account_id_label) for t in rows]
+    txns = [_map_local_to_plaidish(t, account_id_label) for t in page.rows]
     
     accounts = [PlaidAccount(
         account_id=account_id_label, 
@@ -329,6 +295,82 @@ def plaidish_transactions_get(
         accounts=accounts,
         transactions=txns,
         total_transactions=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=page.next_cursor,
+        prev_cursor=page.prev_cursor,
         item={"item_id": f"fake_item_{account_id_label}", "institution_id": "ins_fake_demo"},
         request_id=f"req_fake_{account_id_label}"
     )
+
+def plaidish_transactions_sync(
+    db: Session, user_id: int, cursor: Optional[str] = None, count: int = 100
+) -> PlaidTransactionsSyncResponse:
+    """Plaid-style /transactions/sync: what changed since `cursor`, across all of the user's accounts.
+
+    Without a cursor the user's live transactions are returned as `added`,
+    `count` at a time, before the feed switches to the change log. Within a
+    page, several changes to one transaction collapse into one entry
+    carrying its current state; removals are always reported. `modified`
+    is always empty: transactions cannot be edited (see app.services.changes).
+    """
+    if cursor:
+        position = changes.decode_sync_cursor(cursor)
+    else:
+        start = changes.head(db, user_id)
+        position = changes.SyncCursor(start.version, start.seq, after_id=0)
+    added, modified, removed = [], [], []
+
+    if position.after_id is not None:
+        rows = db.execute(
+            select(Transaction, Account.mask).join(Account, Account.id == Transaction.account_id)
+            .where(Transaction.user_id == user_id, Transaction.id > position.after_id)
+            .order_by(Transaction.id).limit(count + 1)
+        ).all()
+        has_more = len(rows) > count
+        rows = rows[:count]
+        added = [_map_local_to_plaidish(t, mask) for t, mask in rows]
+        if has_more:
+            next_position = changes.SyncCursor(position.version, position.seq, rows[-1][0].id)
+        else:
+            # Snapshot finished: continue from the log position it was taken at
+            next_position = changes.SyncCursor(position.version, position.seq)
+            has_more = changes.head(db, user_id) != next_position
+    else:
+        log = db.scalars(
+            select(TransactionChange)
+            .where(TransactionChange.user_id == user_id, changes.after(position))
+            .order_by(TransactionChange.version, TransactionChange.seq).limit(count + 1)
+        ).all()
+        has_more = len(log) > count
+        log = log[:count]
+        # transaction id -> (first kind seen in this page, latest change)
+        collapsed: dict[int, tuple[str, TransactionChange]] = {}
+        for change in log:
+            first = collapsed[change.transaction_id][0] if change.transaction_id in collapsed else change.kind
+            collapsed[change.transaction_id] = (first, change)
+        live_ids = [tid for tid, (_, change) in collapsed.items() if change.kind != "removed"]
+        live = {
+            t.id: t for t in db.scalars(
+                select(Transaction).where(Transaction.user_id == user_id, Transaction.id.in_(live_ids))
+            )
+        } if live_ids else {}
+        for tid, (first, change) in collapsed.items():
+            if change.kind == "removed":
+                removed.append(PlaidRemovedTransaction(
+                    transaction_id=f"tx_{change.account_label}_{tid}", account_id=change.account_label
+                ))
+            elif tid in live:
+                # Not live means a removal later in the log; that page will report it
+                (added if first == "added" else modified).append(
+                    _map_local_to_plaidish(live[tid], change.account_label)
+                )
+        next_position = changes.SyncCursor(log[-1].version, log[-1].seq) if log else position
+
+    return PlaidTransactionsSyncResponse(
+        added=added,
+        modified=modified,
+        removed=removed,
+        next_cursor=changes.encode_sync_cursor(next_position),
+        has_more=has_more,
+        request_id=f"req_fake_sync_{user_id}",
+    )
@@ -0,0 +1,186 @@
+"""
+Streamed bulk transaction import.
+
+A `BulkImport` is fed the request body chunk by chunk. `feed` only spools
+it to a SpooledTemporaryFile (in memory up to IMPORT_SPOOL_BYTES, then on
+disk), so no database transaction is open while the client is still
+uploading. `finish` then reads the spool back and, in one transaction,
+splits it into records and flushes them a batch at a time: `flush` parses
+and validates the pending records against TransactionCreate, checks
+ownership of every account id not seen before with one query, encodes the
+batch's categories and descriptions into lookup keys, and inserts the
+valid rows with a single executemany. After the last batch, `finish`
+applies every account's balance change in one aggregated UPDATE,
+recomputes the daily rollups of each account's imported date range with
+one grouped INSERT ... SELECT (folding batch after batch into the same
+buckets row by row costs far more), and commits once, so the whole import
+lands or none of it does. An upload that fails part way commits nothing.
+Bad rows are reported with their line number and skipped; they never
+abort the import.
+"""
+import csv
+import json
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from tempfile import SpooledTemporaryFile
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.schemas.transaction import TransactionCreate
+from app.services import balances, changes, ledger, lookups, rollups
+
+# Bytes read back from the spool at a time
+READ_BYTES = 1 << 16
+
+FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson",
+           "application/json": "ndjson"}
+
+def format_for(content_type: Optional[str]) -> str:
+    """Import format from a Content-Type header; NDJSON unless it says CSV."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return FORMATS.get(media_type, "ndjson")
+
+def _error_message(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+class BulkImport:
+    def __init__(self, user_id: int, fmt: str, batch_rows: int, max_errors: int, spool_bytes: int = 8 << 20):
+        self.user_id = user_id
+        self.body = SpooledTemporaryFile(max_size=spool_bytes)
+        self.fmt = fmt
+        self.batch_rows = batch_rows
+        self.max_errors = max_errors
+        self.buffer = b""
+        self.record = ""
+        self.record_line = 0
+        self.line = 0
+        self.header: Optional[list[str]] = None
+        self.pending: list[tuple[int, str]] = []
+        self.owned: dict[int, bool] = {}
+        self.balance_deltas: dict[int, Decimal] = defaultdict(Decimal)
+        self.date_ranges: dict[int, tuple[date, date]] = {}
+        self.inserted = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def _error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def _take_line(self, text: str) -> None:
+        self.line += 1
+        if not self.record:
+            if not text.strip():
+                return
+            self.record_line = self.line
+            self.record = text
+        else:
+            self.record += "\n" + text
+        # A CSV record continues onto the next line while a quoted field is open
+        if self.fmt == "csv" and self.record.count('"') % 2:
+            return
+        self.pending.append((self.record_line, self.record))
+        self.record = ""
+
+    def feed(self, chunk: bytes) -> None:
+        """Spool a body chunk; nothing touches the database before `finish`."""
+        self.body.write(chunk)
+
+    def _split(self, chunk: bytes) -> None:
+        """Split a spooled chunk into pending records."""
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split(b"\n")
+        for raw in lines:
+            try:
+                self._take_line(raw.rstrip(b"\r").decode("utf-8"))
+            except UnicodeDecodeError:
+                self.line += 1
+                self._error(self.line, "line is not valid UTF-8")
+
+    def _parse(self, text: str) -> Optional[dict]:
+        if self.fmt == "ndjson":
+            row = json.loads(text)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            return row
+        fields = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [name.strip() for name in fields]
+            return None
+        if len(fields) != len(self.header):
+            raise ValueError(f"expected {len(self.header)} fields, got {len(fields)}")
+        # Empty CSV cells mean "not given", like a missing JSON key
+        return {name: value for name, value in zip(self.header, fields) if value != ""}
+
+    def _check_accounts(self, db: Session, account_ids: set[int]) -> None:
+        unseen = account_ids - self.owned.keys()
+        if not unseen:
+            return
+        owned = set(db.scalars(select(Account.id).where(Account.user_id == self.user_id, Account.id.in_(unseen))))
+        self.owned.update((account_id, account_id in owned) for account_id in unseen)
+
+    def flush(self, db: Session) -> None:
+        """Validate and insert the next batch of pending records; nothing is committed."""
+        batch, self.pending = self.pending[:self.batch_rows], self.pending[self.batch_rows:]
+        valid: list[tuple[int, TransactionCreate]] = []
+        for line, text in batch:
+            try:
+                row = self._parse(text)
+                if row is not None:
+                    valid.append((line, TransactionCreate.model_validate(row)))
+            except (ValueError, csv.Error) as e:
+                self._error(line, _error_message(e))
+        self._check_accounts(db, {payload.account_id for _, payload in valid})
+        rows = []
+        for line, payload in valid:
+            if not self.owned[payload.account_id]:
+                self._error(line, "Account not found")
+                continue
+            rows.append({
+                "user_id": self.user_id, "account_id": payload.account_id, "date": payload.date,
+                "amount": payload.amount, "category": payload.category or "Other",
+                "description": payload.description,
+            })
+            self.balance_deltas[payload.account_id] += payload.amount
+            low, high = self.date_ranges.get(payload.account_id, (payload.date, payload.date))
+            self.date_ranges[payload.account_id] = (min(low, payload.date), max(high, payload.date))
+        if rows:
+            if not self.inserted:
+                # Once per import, before the first change is logged (see app.services.changes)
+                ledger.bump(db, self.user_id)
+            ids = db.scalars(insert(Transaction).returning(Transaction.id), lookups.encode(db, rows)).all()
+            changes.record(db, self.user_id, "added", Transaction.id.in_(ids))
+            self.inserted += len(rows)
+
+    def finish(self, db: Session) -> dict:
+        """Import the spooled body batch by batch, apply balance changes and commit it all at once."""
+        try:
+            self.body.seek(0)
+            while chunk := self.body.read(READ_BYTES):
+                self._split(chunk)
+                while len(self.pending) >= self.batch_rows:
+                    self.flush(db)
+            if self.buffer:
+                self._split(b"\n")
+            if self.record:
+                self._error(self.record_line, "unterminated quoted field")
+            while self.pending:
+                self.flush(db)
+            if self.inserted:
+                balances.adjust(db, self.balance_deltas)
+                for account_id, (start, end) in self.date_ranges.items():
+                    rollups.rebuild(db, self.user_id, account_id, start, end)
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            self.body.close()
+        return {"inserted": self.inserted, "failed": self.failed, "errors": self.errors}
@@ -0,0 +1,176 @@
+"""
+Local background jobs: the `jobs` table plus worker threads in the API process.
+
+Handlers are registered per job kind and called as `fn(db, user_id)`.
+`submit` returns the job already queued or running for the same (kind, user)
+if there is one, so concurrent requests share a single run; a partial unique
+index enforces this across processes. Workers claim jobs with a conditional
+UPDATE, so several API processes can serve the same table. A job left
+`running` for longer than `stale_after` (its process died) is claimed again.
+"""
+import datetime
+import logging
+import threading
+from typing import Callable
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from app.models.job import ACTIVE_STATUSES, Job
+
+log = logging.getLogger(__name__)
+
+HANDLERS: dict[str, Callable[[Session, int], None]] = {}
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job with a message and no traceback."""
+
+def handler(kind: str):
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+def active_job(db: Session, kind: str, user_id: int) -> Job | None:
+    return db.query(Job).filter(
+        Job.kind == kind, Job.user_id == user_id, Job.status.in_(ACTIVE_STATUSES)
+    ).first()
+
+def submit(db: Session, kind: str, user_id: int) -> Job:
+    """Queue a job, or return the one already in flight for this kind and user."""
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler for job kind {kind!r}")
+    job = active_job(db, kind, user_id)
+    if job is not None:
+        return job
+    job = Job(kind=kind, user_id=user_id, status="queued", created_at=datetime.datetime.utcnow())
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request queued it between our check and insert
+        db.rollback()
+        return active_job(db, kind, user_id)
+    wake()
+    return job
+
+def claim(db: Session, stale_after: float) -> int | None:
+    """Mark the oldest runnable job as running; returns its id, or None if there is none."""
+    now = datetime.datetime.utcnow()
+    runnable = or_(
+        Job.status == "queued",
+        and_(Job.status == "running", Job.started_at < now - datetime.timedelta(seconds=stale_after)),
+    )
+    while True:
+        row = db.execute(
+            select(Job.id, Job.status, Job.started_at).where(runnable).order_by(Job.id).limit(1)
+        ).first()
+        if row is None:
+            db.rollback()
+            return None
+        job_id, status, started_at = row
+        # Only one worker wins the update; the others see rowcount 0 and look again
+        won = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == status,
+                   Job.started_at.is_(None) if started_at is None else Job.started_at == started_at)
+            .values(status="running", started_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if won:
+            return job_id
+
+def run(db: Session, job_id: int) -> None:
+    kind, user_id = db.execute(select(Job.kind, Job.user_id).where(Job.id == job_id)).one()
+    status, error = "succeeded", None
+    try:
+        HANDLERS[kind](db, user_id)
+    except JobFailed as e:
+        status, error = "failed", str(e)
+    except Exception as e:
+        log.exception("Job %s (%s) failed", job_id, kind)
+        status, error = "failed", f"{type(e).__name__}: {e}"
+    db.rollback()
+    db.execute(
+        update(Job).where(Job.id == job_id)
+        .values(status=status, error=error, finished_at=datetime.datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+class JobWorker:
+    """Threads that claim and run jobs until stopped.
+
+    `run_once` and `drain` process jobs on the calling thread, for tests and
+    the CLI.
+    """
+
+    def __init__(self, sessions: sessionmaker, threads: int = 1, poll_interval: float = 5.0,
+                 stale_after: float = 600.0):
+        self.sessions = sessions
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def run_once(self) -> bool:
+        with self.sessions() as db:
+            job_id = claim(db, self.stale_after)
+            if job_id is None:
+                return False
+            run(db, job_id)
+            return True
+
+    def drain(self) -> int:
+        count = 0
+        while self.run_once():
+            count += 1
+        return count
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._stopped.clear()
+        for i in range(self.threads):
+            t = threading.Thread(target=self._loop, name=f"pluto-jobs-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads.clear()
+
+    def _loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                while not self._stopped.is_set() and self.run_once():
+                    pass
+            except Exception:
+                log.exception("Job worker error")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+_worker: JobWorker | None = None
+
+def start(sessions: sessionmaker, threads: int, poll_interval: float, stale_after: float) -> JobWorker:
+    global _worker
+    _worker = JobWorker(sessions, threads, poll_interval, stale_after)
+    _worker.start()
+    return _worker
+
+def stop() -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
+
+def wake() -> None:
+    """Nudge this process's workers; other processes pick the job up on their next poll."""
+    if _worker is not None:
+        _worker.wake()
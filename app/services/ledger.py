@@ -0,0 +1,51 @@
+"""
+Per-user data versions.
+
+Every write path that changes what a user's read endpoints return (accounts,
+transactions, balances) calls `bump` inside its transaction, so the new
+version commits or rolls back with the data. Readers compare versions
+instead of re-running queries: ETags, response caches and other derived
+state keyed on (user, version) never need explicit invalidation, and the
+counter lives in the database so every process sees the same value.
+"""
+from sqlalchemy import insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.models.data_version import DataVersion
+
+# Dialects with INSERT .. ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {"sqlite", "postgresql"}
+
+def bump(db: Session, user_id: int) -> None:
+    """Increment the user's version as part of the current transaction."""
+    dialect = db.get_bind().dialect.name
+    if dialect in UPSERT_DIALECTS:
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        stmt = upsert(DataVersion).values(user_id=user_id, version=1)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[DataVersion.user_id], set_={"version": DataVersion.version + 1}
+        ))
+        return
+    bumped = db.execute(
+        update(DataVersion).where(DataVersion.user_id == user_id)
+        .values(version=DataVersion.version + 1).execution_options(synchronize_session=False)
+    ).rowcount
+    if not bumped:
+        db.add(DataVersion(user_id=user_id, version=1))
+        db.flush()
+
+def bump_all(db: Session) -> None:
+    """Increment every user's version, after bulk rewrites such as a rollup rebuild."""
+    from app.models.user import User
+
+    missing = select(User.id, literal(0)).where(User.id.not_in(select(DataVersion.user_id)))
+    db.execute(insert(DataVersion).from_select(["user_id", "version"], missing))
+    db.execute(
+        update(DataVersion).values(version=DataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def current(db: Session, user_id: int) -> int:
+    return db.execute(select(DataVersion.version).where(DataVersion.user_id == user_id)).scalar() or 0
@@ -0,0 +1,92 @@
+"""
+Dictionary-encoded transaction attributes.
+
+Category names and descriptions repeat on nearly every transaction, so each
+distinct value is stored once in `categories` or `merchants` and
+transactions point at it with a small integer key. Writers turn a batch of
+row mappings into keys with `encode`: one lookup per table for all the
+batch's distinct names, plus one insert for those not seen before. Readers
+group and filter on the keys and join the names back in (or map the few
+aggregated ids with `category_names`). Each category row carries its Plaid
+personal finance category, so mapping a transaction to Plaid's shape reads
+a column instead of consulting a table per row.
+"""
+from typing import Callable, Iterable, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.category import Category
+from app.models.merchant import Merchant
+from app.models.transaction import Transaction
+
+PFC_PRIMARY = {
+    "salary": "INCOME_SALARY",
+    "rent": "RENT_AND_UTILITIES",
+    "utilities": "RENT_AND_UTILITIES",
+    "subscriptions": "SUBSCRIPTIONS",
+    "groceries": "FOOD_AND_DRINK",
+    "dining": "FOOD_AND_DRINK",
+    "transport": "TRANSPORTATION",
+    "savings": "TRANSFER_IN",
+    "interest": "INCOME_INTEREST",
+    "withdrawal": "TRANSFER_OUT",
+    "investment": "GENERAL_MERCHANDISE",
+    "dividend": "INCOME_DIVIDEND",
+    "deposit": "TRANSFER_IN",
+}
+DEFAULT_PFC = "GENERAL_MERCHANDISE"
+
+def pfc_primary(category: str) -> str:
+    return PFC_PRIMARY.get(category, DEFAULT_PFC)
+
+def _insert_missing(db: Session, model):
+    """INSERT that skips names another writer added since we looked, where the dialect allows it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        return insert(model)
+    return upsert(model).on_conflict_do_nothing(index_elements=[model.name])
+
+def _ids(db: Session, model, names: Iterable[Optional[str]], extra: Callable[[str], dict] = lambda name: {}) -> dict[str, int]:
+    wanted = {name for name in names if name}
+    if not wanted:
+        return {}
+    found = dict(db.execute(select(model.name, model.id).where(model.name.in_(wanted))).all())
+    missing = sorted(wanted - found.keys())
+    if missing:
+        db.execute(_insert_missing(db, model), [{"name": name, **extra(name)} for name in missing])
+        found.update(db.execute(select(model.name, model.id).where(model.name.in_(missing))).all())
+    return found
+
+def category_ids(db: Session, names: Iterable[Optional[str]]) -> dict[str, int]:
+    """Ids of the named categories, creating the missing ones; nothing is committed."""
+    return _ids(db, Category, names, lambda name: {"pfc_primary": pfc_primary(name)})
+
+def merchant_ids(db: Session, names: Iterable[Optional[str]]) -> dict[str, int]:
+    """Ids of the named merchants, creating the missing ones; nothing is committed."""
+    return _ids(db, Merchant, names)
+
+def encode(db: Session, rows: list[dict]) -> list[dict]:
+    """Replace the `category` and `description` of each row mapping with `category_id` and `merchant_id`.
+
+    Rows are changed in place and returned.
+    """
+    categories = category_ids(db, (row.get("category") for row in rows))
+    merchants = merchant_ids(db, (row.get("description") for row in rows))
+    for row in rows:
+        row["category_id"] = categories.get(row.pop("category", None))
+        row["merchant_id"] = merchants.get(row.pop("description", None))
+    return rows
+
+def category_names(db: Session, ids: Iterable[int]) -> dict[int, str]:
+    """Names of the given category ids (missing and uncategorized ids are left out)."""
+    wanted = {i for i in ids if i}
+    if not wanted:
+        return {}
+    return dict(db.execute(select(Category.id, Category.name).where(Category.id.in_(wanted))).all())
+
+def has_category(name: str):
+    """Filter on a category name that compares integer keys: the name is resolved once, not per row."""
+    return Transaction.category_id == select(Category.id).where(Category.name == name).scalar_subquery()
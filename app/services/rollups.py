@@ -0,0 +1,247 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Iterable, Mapping, Optional
+from sqlalchemy import and_, case, func, insert, select
+from sqlalchemy.orm import Session
+from app.models.category import Category
+from app.models.daily_rollup import DailyRollup
+from app.models.transaction import Transaction
+
+# Bucket key of transactions without a category
+UNCATEGORIZED = 0
+
+def _field(row: Any, name: str) -> Any:
+    if isinstance(row, Mapping):
+        return row.get(name)
+    return getattr(row, name)
+
+def _merge_min(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+def _merge_max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+def _empty_bucket() -> dict:
+    return {
+        "txn_count": 0,
+        "income_total": Decimal("0.00"), "income_count": 0, "income_min": None, "income_max": None,
+        "expense_total": Decimal("0.00"), "expense_count": 0, "expense_min": None, "expense_max": None,
+    }
+
+def _lower(current, new):
+    """SQL min of two nullable extremes (NULL means no value yet)."""
+    return case((current.is_(None), new), (new.is_(None), current), (new < current, new), else_=current)
+
+def _higher(current, new):
+    return case((current.is_(None), new), (new.is_(None), current), (new > current, new), else_=current)
+
+def _upsert(db: Session):
+    """INSERT .. ON CONFLICT DO UPDATE that adds each delta to its bucket in SQL, or None if the dialect lacks it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        return None
+    table = DailyRollup.__table__
+    stmt = upsert(table)
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.account_id, table.c.date, table.c.category_id],
+        set_={
+            "txn_count": table.c.txn_count + new.txn_count,
+            "income_total": table.c.income_total + new.income_total,
+            "income_count": table.c.income_count + new.income_count,
+            "income_min": _lower(table.c.income_min, new.income_min),
+            "income_max": _higher(table.c.income_max, new.income_max),
+            "expense_total": table.c.expense_total + new.expense_total,
+            "expense_count": table.c.expense_count + new.expense_count,
+            "expense_min": _lower(table.c.expense_min, new.expense_min),
+            "expense_max": _higher(table.c.expense_max, new.expense_max),
+        },
+    )
+
+def apply_transactions(db: Session, rows: Iterable[Any]) -> None:
+    """Fold newly inserted transactions into their daily rollup buckets.
+
+    `rows` may be Transaction objects or plain mappings with the same field
+    names, with categories already encoded as `category_id`. Each touched
+    bucket gets one upsert that adds the batch's deltas in SQL, like
+    `balances.adjust`, so concurrent writers to the same bucket never
+    overwrite each other. The session is flushed but never committed; the
+    caller's unit of work owns the commit.
+    """
+    deltas: dict[tuple, dict] = defaultdict(_empty_bucket)
+    for r in rows:
+        amount = Decimal(str(_field(r, "amount")))
+        key = (_field(r, "user_id"), _field(r, "account_id"), _field(r, "date"),
+               _field(r, "category_id") or UNCATEGORIZED)
+        b = deltas[key]
+        b["txn_count"] += 1
+        if amount > 0:
+            b["income_total"] += amount
+            b["income_count"] += 1
+            b["income_min"] = _merge_min(b["income_min"], amount)
+            b["income_max"] = _merge_max(b["income_max"], amount)
+        elif amount < 0:
+            b["expense_total"] += -amount
+            b["expense_count"] += 1
+            b["expense_min"] = _merge_min(b["expense_min"], -amount)
+            b["expense_max"] = _merge_max(b["expense_max"], -amount)
+    if not deltas:
+        return
+
+    # Sorted so concurrent batches lock shared buckets in the same order
+    params = [
+        dict(zip(("user_id", "account_id", "date", "category_id"), key), **deltas[key])
+        for key in sorted(deltas)
+    ]
+    db.flush()
+    stmt = _upsert(db)
+    if stmt is not None:
+        db.execute(stmt, params)
+        return
+    _apply_in_python(db, params)
+
+def _apply_in_python(db: Session, params: list[dict]) -> None:
+    """Read-modify-write fallback for dialects without an upsert; not safe under concurrent writers."""
+    by_account: dict[tuple, list[date]] = defaultdict(list)
+    for p in params:
+        by_account[(p["user_id"], p["account_id"])].append(p["date"])
+    existing: dict[tuple, DailyRollup] = {}
+    for (user_id, account_id), dates in by_account.items():
+        for r in db.query(DailyRollup).filter(
+            DailyRollup.user_id == user_id,
+            DailyRollup.account_id == account_id,
+            DailyRollup.date >= min(dates),
+            DailyRollup.date <= max(dates),
+        ):
+            existing[(r.user_id, r.account_id, r.date, r.category_id)] = r
+
+    created = []
+    for p in params:
+        r = existing.get((p["user_id"], p["account_id"], p["date"], p["category_id"]))
+        if r is None:
+            created.append(p)
+            continue
+        r.txn_count += p["txn_count"]
+        r.income_total = Decimal(r.income_total) + p["income_total"]
+        r.income_count += p["income_count"]
+        r.income_min = _merge_min(r.income_min, p["income_min"])
+        r.income_max = _merge_max(r.income_max, p["income_max"])
+        r.expense_total = Decimal(r.expense_total) + p["expense_total"]
+        r.expense_count += p["expense_count"]
+        r.expense_min = _merge_min(r.expense_min, p["expense_min"])
+        r.expense_max = _merge_max(r.expense_max, p["expense_max"])
+    if created:
+        db.execute(insert(DailyRollup), created)
+    db.flush()
+
+def remove_account(db: Session, user_id: int, account_id: int) -> None:
+    """Drop the rollups of an account that is being deleted."""
+    db.query(DailyRollup).filter(
+        DailyRollup.user_id == user_id, DailyRollup.account_id == account_id
+    ).delete(synchronize_session=False)
+
+def rebuild(
+    db: Session, user_id: Optional[int] = None, account_id: Optional[int] = None,
+    start_date: Optional[date] = None, end_date: Optional[date] = None,
+) -> int:
+    """Recompute rollups from raw transactions with one grouped INSERT ... SELECT.
+
+    Rebuilds everything, or only the buckets matching the given user,
+    account and inclusive date range. Returns the number of buckets
+    written. Nothing is committed.
+    """
+    income = Transaction.amount > 0
+    expense = Transaction.amount < 0
+    category = func.coalesce(Transaction.category_id, UNCATEGORIZED)
+    source = select(
+        Transaction.user_id,
+        Transaction.account_id,
+        Transaction.date,
+        category,
+        func.count(),
+        func.coalesce(func.sum(case((income, Transaction.amount), else_=0)), 0),
+        func.count(case((income, 1))),
+        func.min(case((income, Transaction.amount))),
+        func.max(case((income, Transaction.amount))),
+        func.coalesce(func.sum(case((expense, -Transaction.amount), else_=0)), 0),
+        func.count(case((expense, 1))),
+        func.min(case((expense, -Transaction.amount))),
+        func.max(case((expense, -Transaction.amount))),
+    ).group_by(Transaction.user_id, Transaction.account_id, Transaction.date, category)
+
+    clear = db.query(DailyRollup)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+        clear = clear.filter(DailyRollup.user_id == user_id)
+    if account_id is not None:
+        source = source.where(Transaction.account_id == account_id)
+        clear = clear.filter(DailyRollup.account_id == account_id)
+    if start_date is not None:
+        source = source.where(Transaction.date >= start_date)
+        clear = clear.filter(DailyRollup.date >= start_date)
+    if end_date is not None:
+        source = source.where(Transaction.date <= end_date)
+        clear = clear.filter(DailyRollup.date <= end_date)
+    clear.delete(synchronize_session=False)
+
+    result = db.execute(insert(DailyRollup).from_select([
+        "user_id", "account_id", "date", "category_id", "txn_count",
+        "income_total", "income_count", "income_min", "income_max",
+        "expense_total", "expense_count", "expense_min", "expense_max",
+    ], source))
+    return result.rowcount
+
+def _window(user_id: int, start_date: date, end_date: Optional[date]):
+    conds = [DailyRollup.user_id == user_id, DailyRollup.date >= start_date]
+    if end_date is not None:
+        conds.append(DailyRollup.date <= end_date)
+    return and_(*conds)
+
+def window_totals(db: Session, user_id: int, start_date: date, end_date: Optional[date] = None):
+    """Counts and income/expense sums for a user over a date window."""
+    return db.query(
+        func.coalesce(func.sum(DailyRollup.txn_count), 0).label("txn_count"),
+        func.coalesce(func.sum(DailyRollup.income_total), 0).label("income_total"),
+        func.coalesce(func.sum(DailyRollup.income_count), 0).label("income_count"),
+        func.coalesce(func.sum(DailyRollup.expense_total), 0).label("expense_total"),
+        func.coalesce(func.sum(DailyRollup.expense_count), 0).label("expense_count"),
+        func.min(DailyRollup.expense_min).label("expense_min"),
+        func.max(DailyRollup.expense_max).label("expense_max"),
+    ).filter(_window(user_id, start_date, end_date)).one()
+
+def category_spend(db: Session, user_id: int, start_date: date, end_date: Optional[date] = None):
+    """(category name, expense_total) pairs for a window, largest first; None names uncategorized spend."""
+    spend = select(
+        DailyRollup.category_id, func.sum(DailyRollup.expense_total).label("total")
+    ).where(
+        _window(user_id, start_date, end_date), DailyRollup.expense_count > 0
+    ).group_by(DailyRollup.category_id).subquery()
+    # Grouped on the integer key; names are joined onto the handful of result rows
+    return db.execute(
+        select(Category.name, spend.c.total).select_from(spend)
+        .outerjoin(Category, Category.id == spend.c.category_id)
+        .order_by(spend.c.total.desc())
+    ).all()
+
+def daily_spend(db: Session, user_id: int, start_date: date, end_date: Optional[date] = None):
+    """(date, expense_total, expense_count) per day with any spending, oldest first."""
+    return db.query(
+        DailyRollup.date,
+        func.sum(DailyRollup.expense_total).label("daily_total"),
+        func.sum(DailyRollup.expense_count).label("daily_count"),
+    ).filter(
+        _window(user_id, start_date, end_date), DailyRollup.expense_count > 0
+    ).group_by(DailyRollup.date).order_by(DailyRollup.date).all()
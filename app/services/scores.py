@@ -0,0 +1,239 @@
+"""
+Precomputed Pluto scores.
+
+`refresh` recomputes scores in batches of users: one grouped query over the
+daily rollups in the 30-day window returns every user's income, spend and
+category count at once, and the rows are upserted with one executemany.
+By default only stale users are refreshed: no stored score yet, a score
+for an earlier day (the window has moved), or a data version other than
+the one it was computed from (they wrote since). `ScoreRefresher` runs
+that sweep every PLUTO_SCORE_REFRESH_SECONDS; `pluto refresh-scores` runs
+it from the CLI, with `--all` to recompute everyone.
+
+`score` serves GET /insights/pluto-score from the table. A user whose
+stored score is stale, or who asks for `live`, is recomputed on the spot
+through the same grouped query. Every write is an upsert on user_id, so
+concurrent requests and sweeps for one user never collide on the key.
+"""
+import datetime
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, or_, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from app.analytics import reports
+from app.core.cache import register
+from app.models.daily_rollup import DailyRollup
+from app.models.data_version import DataVersion
+from app.models.pluto_score import StoredPlutoScore
+from app.models.user import User
+from app.schemas.insight import PlutoScore
+from app.services import ledger
+from app.services.rollups import UNCATEGORIZED
+
+log = logging.getLogger(__name__)
+
+def _version():
+    return func.coalesce(DataVersion.version, 0)
+
+def stale_users(db: Session, today: date, after_id: int, limit: int, everyone: bool = False) -> list[tuple]:
+    """(user id, data version) for the next `limit` users after `after_id` whose stored score is stale."""
+    stmt = (
+        select(User.id, _version())
+        .outerjoin(DataVersion, DataVersion.user_id == User.id)
+        .outerjoin(StoredPlutoScore, StoredPlutoScore.user_id == User.id)
+        .where(User.id > after_id)
+        .order_by(User.id)
+        .limit(limit)
+    )
+    if not everyone:
+        stmt = stmt.where(or_(
+            StoredPlutoScore.user_id.is_(None),
+            StoredPlutoScore.as_of != today,
+            StoredPlutoScore.version != _version(),
+        ))
+    return db.execute(stmt).all()
+
+def compute(db: Session, versions: dict[int, int], today: date, store: bool = True) -> dict[int, PlutoScore]:
+    """Score the given users (id -> data version read beforehand) and upsert their rows; nothing is committed.
+
+    The version must be read before the rollups: a write landing in between
+    leaves the older version on the row, so the user is refreshed again.
+    """
+    since = today - timedelta(days=reports.SCORE_WINDOW_DAYS)
+    totals = {
+        user_id: (float(income), float(spend), categories)
+        for user_id, income, spend, categories in db.execute(
+            select(
+                DailyRollup.user_id,
+                func.coalesce(func.sum(DailyRollup.income_total), 0),
+                func.coalesce(func.sum(DailyRollup.expense_total), 0),
+                func.count(func.distinct(case((DailyRollup.category_id != UNCATEGORIZED, DailyRollup.category_id)))),
+            ).where(
+                DailyRollup.user_id.in_(versions), DailyRollup.date >= since
+            ).group_by(DailyRollup.user_id)
+        )
+    }
+    scores = {user_id: reports.pluto_score(*totals.get(user_id, (0.0, 0.0, 0))) for user_id in versions}
+    if not store:
+        return scores
+    _write(db, scores, versions, today)
+    return scores
+
+def _write(db: Session, scores: dict[int, PlutoScore], versions: dict[int, int], today: date) -> None:
+    """Insert or replace score rows; an upsert, so concurrent writers of one user's row never collide."""
+    now = datetime.datetime.utcnow()
+    rows = [
+        {**s.model_dump(), "user_id": user_id, "as_of": today, "version": versions[user_id], "computed_at": now}
+        for user_id, s in sorted(scores.items())
+    ]
+    table = StoredPlutoScore.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect not in ledger.UPSERT_DIALECTS:
+        db.execute(delete(table).where(table.c.user_id.in_([r["user_id"] for r in rows])))
+        db.execute(insert(table), rows)
+        return
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    stmt = upsert(table)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={c.name: stmt.excluded[c.name] for c in table.columns if c.name != "user_id"},
+    ), rows)
+
+def refresh(db: Session, today: Optional[date] = None, batch_size: int = 1000, everyone: bool = False) -> dict:
+    """Recompute stale scores (every score with `everyone`), committing after each batch."""
+    today = today or date.today()
+    report = {"refreshed": 0, "batches": 0}
+    after_id = 0
+    while True:
+        rows = stale_users(db, today, after_id, batch_size, everyone)
+        if not rows:
+            break
+        after_id = rows[-1][0]
+        compute(db, dict(rows), today)
+        db.commit()
+        report["refreshed"] += len(rows)
+        report["batches"] += 1
+    return report
+
+def stored(db: Session, user_id: int, today: date) -> Optional[PlutoScore]:
+    """The stored score if it is for `today` and the user's current data version."""
+    current = select(DataVersion.version).where(DataVersion.user_id == user_id).scalar_subquery()
+    row = db.execute(select(StoredPlutoScore).where(
+        StoredPlutoScore.user_id == user_id,
+        StoredPlutoScore.as_of == today,
+        StoredPlutoScore.version == func.coalesce(current, 0),
+    )).scalar_one_or_none()
+    if row is None:
+        return None
+    return PlutoScore(
+        score=row.score, window_days=row.window_days, income_30d=row.income_30d, spend_30d=row.spend_30d,
+        savings_rate=row.savings_rate, category_diversity=row.category_diversity,
+    )
+
+def score(db: Session, user_id: int, live: bool = False) -> PlutoScore:
+    today = date.today()
+    if not live:
+        hit = stored(db, user_id, today)
+        if hit is not None:
+            score_stats.count(stored=1)
+            return hit
+    score_stats.count(live=1)
+    versions = {user_id: ledger.current(db, user_id)}
+    result = compute(db, versions, today, store=False)
+    # Storing is best effort: the upsert cannot collide with another request
+    # for the same user, but SQLite may refuse the write lock while one is
+    # busy, and then the next sweep stores the score instead
+    try:
+        _write(db, result, versions, today)
+        db.commit()
+    except OperationalError:
+        db.rollback()
+        log.warning("Could not store the Pluto score of user %d", user_id, exc_info=True)
+    return result[user_id]
+
+class ScoreStats:
+    """Counters for GET /debug/caches: the table is a cache of the scores."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stored = 0
+        self.live = 0
+        self.runs = 0
+        self.refreshed = 0
+        self.last_run_at: Optional[str] = None
+
+    def count(self, stored: int = 0, live: int = 0) -> None:
+        with self._lock:
+            self.stored += stored
+            self.live += live
+
+    def record(self, report: dict) -> None:
+        with self._lock:
+            self.runs += 1
+            self.refreshed += report["refreshed"]
+            self.last_run_at = datetime.datetime.utcnow().isoformat()
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.stored + self.live
+            return {"stored": self.stored, "live": self.live,
+                    "stored_ratio": round(self.stored / served, 4) if served else None,
+                    "runs": self.runs, "refreshed": self.refreshed, "last_run_at": self.last_run_at}
+
+score_stats = register("pluto_scores", ScoreStats())
+
+class ScoreRefresher:
+    """Background thread that refreshes stale scores each `interval` seconds."""
+
+    def __init__(self, sessions: sessionmaker, interval: float, batch_size: int = 1000):
+        self.sessions = sessions
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> dict:
+        with self.sessions() as db:
+            report = refresh(db, batch_size=self.batch_size)
+        score_stats.record(report)
+        return report
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, name="pluto-scores", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("Pluto score refresh failed")
+
+_refresher: ScoreRefresher | None = None
+
+def start(sessions: sessionmaker, interval: float, batch_size: int) -> ScoreRefresher | None:
+    global _refresher
+    if interval <= 0:
+        return None
+    _refresher = ScoreRefresher(sessions, interval, batch_size)
+    _refresher.start()
+    return _refresher
+
+def stop() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None
@@ -0,0 +1,159 @@
+"""
+Large-scale synthetic data for load testing.
+
+Seeds N users x M accounts x K months of fake Plaid activity. Every user's
+data comes from its own `random.Random(f"{seed}:{index}")`, so the same seed
+and as-of date produce the same users, accounts and transactions no matter
+how many worker processes split the work. User and account ids are assigned
+up front above the current maxima; on PostgreSQL the ranges are taken from
+the id sequences, which are moved past them so later signups and new
+accounts do not collide with the explicit ids. Transaction ids follow
+commit order. Seed a quiescent database: rows created by the app while
+`plan_seed` reserves the ranges can still take ids inside them.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.db.session import sync_url
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import lookups, rollups
+from app.services.fake_plaid import generate_transaction_rows
+
+ACCOUNT_TYPES = ("checking", "savings", "trading")
+INSTITUTIONS = {
+    "checking": ["Chase Bank", "Bank of America", "Wells Fargo", "Citibank"],
+    "savings": ["Ally Bank", "Marcus by Goldman Sachs", "Discover Bank", "Capital One"],
+    "trading": ["Robinhood", "TD Ameritrade", "E*TRADE", "Charles Schwab"],
+}
+FIRST_NAMES = ["Avery", "Jordan", "Riley", "Casey", "Morgan", "Quinn", "Devon", "Harper", "Rowan", "Sage"]
+LAST_NAMES = ["Nguyen", "Garcia", "Okafor", "Smith", "Kowalski", "Haddad", "Ito", "Moreau", "Silva", "Patel"]
+
+@dataclass(frozen=True)
+class SeedPlan:
+    users: int
+    accounts_per_user: int
+    months: int
+    seed: int
+    as_of: date
+    password_hash: str
+    first_user_id: int
+    first_account_id: int
+
+@dataclass
+class SeedStats:
+    users: int = 0
+    accounts: int = 0
+    transactions: int = 0
+    rollups: int = 0
+
+def make_engine(url: str) -> Engine:
+    # Seeding is blocking work: an async DATABASE_URL is swapped for its sync driver
+    url = sync_url(url)
+    # Worker processes share one SQLite file; wait for the write lock instead of failing
+    connect_args = {"check_same_thread": False, "timeout": 60} if url.startswith("sqlite") else {}
+    return create_engine(url, connect_args=connect_args)
+
+def _reserve_ids(conn: Connection, model, count: int) -> int:
+    """First of `count` consecutive ids above the table's current maximum."""
+    first = conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+    if conn.dialect.name != "postgresql" or count <= 0:
+        return first
+    # Explicit ids do not advance a SERIAL/IDENTITY sequence: take the range
+    # from the sequence and leave it pointing past the end
+    last = conn.execute(text(
+        "SELECT setval(CAST(pg_get_serial_sequence(:table, 'id') AS regclass), "
+        "GREATEST(nextval(CAST(pg_get_serial_sequence(:table, 'id') AS regclass)), :first) + :count - 1)"
+    ), {"table": model.__tablename__, "first": first, "count": count}).scalar()
+    return last - count + 1
+
+def plan_seed(engine: Engine, users: int, accounts_per_user: int, months: int, seed: int,
+              as_of: date, password_hash: str) -> SeedPlan:
+    """Reserve user and account id ranges above whatever is already in the database."""
+    with engine.begin() as conn:
+        first_user = _reserve_ids(conn, User, users)
+        first_account = _reserve_ids(conn, Account, users * accounts_per_user)
+    return SeedPlan(users, accounts_per_user, months, seed, as_of, password_hash, first_user, first_account)
+
+def build_user(plan: SeedPlan, index: int) -> tuple[dict, list[dict], list[dict]]:
+    """The user row, its account rows and their transaction rows, all derived from (seed, index)."""
+    rng = random.Random(f"{plan.seed}:{index}")
+    user_id = plan.first_user_id + index
+    user = {
+        "id": user_id,
+        "email": f"seed{plan.seed}-{index}@example.com",
+        "hashed_password": plan.password_hash,
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+    }
+    accounts, transactions = [], []
+    for j in range(plan.accounts_per_user):
+        account_id = plan.first_account_id + index * plan.accounts_per_user + j
+        account_type = ACCOUNT_TYPES[j % len(ACCOUNT_TYPES)]
+        rows = generate_transaction_rows(user_id, account_id, account_type, plan.as_of, plan.months, rng)
+        accounts.append({
+            "id": account_id,
+            "user_id": user_id,
+            "name": f"{rng.choice(INSTITUTIONS[account_type])} {account_type.capitalize()}",
+            "nickname": None,
+            "currency": "USD",
+            "type": account_type,
+            "mask": f"{j + 1:04d}",
+            "balance": sum((r["amount"] for r in rows), Decimal("0.00")),
+        })
+        transactions.extend(rows)
+    return user, accounts, transactions
+
+def seed_users(url: str, plan: SeedPlan, start: int, stop: int) -> SeedStats:
+    """Generate and insert users [start, stop) in one transaction. Runs inside a worker."""
+    users, accounts, transactions = [], [], []
+    for index in range(start, stop):
+        u, a, t = build_user(plan, index)
+        users.append(u)
+        accounts.extend(a)
+        transactions.extend(t)
+
+    engine = make_engine(url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(User), users)
+            conn.execute(insert(Account), accounts)
+            conn.execute(insert(Transaction), lookups.encode(Session(bind=conn), transactions))
+    finally:
+        engine.dispose()
+    return SeedStats(users=len(users), accounts=len(accounts), transactions=len(transactions))
+
+def seed_database(url: str, plan: SeedPlan, workers: int = 1, batch_users: int = 50) -> SeedStats:
+    """Seed `plan.users` users in batches spread over `workers` processes, then rebuild rollups."""
+    batches = [(start, min(start + batch_users, plan.users)) for start in range(0, plan.users, batch_users)]
+    stats = SeedStats()
+
+    def _add(s: SeedStats) -> None:
+        stats.users += s.users
+        stats.accounts += s.accounts
+        stats.transactions += s.transactions
+
+    if workers <= 1:
+        for start, stop in batches:
+            _add(seed_users(url, plan, start, stop))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(seed_users, url, plan, start, stop) for start, stop in batches]
+            for f in futures:
+                _add(f.result())
+
+    # One grouped INSERT ... SELECT beats folding millions of rows in the workers
+    engine = make_engine(url)
+    try:
+        with Session(bind=engine) as db:
+            stats.rollups = rollups.rebuild(db)
+            db.commit()
+    finally:
+        engine.dispose()
+    return stats
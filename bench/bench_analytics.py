@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: the old multi-pass statistics code vs the app.analytics kernel.
+
+    python bench/bench_analytics.py --sizes 10000,1000000,10000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics import kernel
+from app.analytics.kernel import column, summarize
+
+def legacy(amounts):
+    """The per-endpoint code that the kernel replaced (float(), inf/NaN checks, 8+ passes)."""
+    valid = []
+    for a in amounts:
+        try:
+            amount = float(a)
+            if not (amount == float('inf') or amount == float('-inf') or amount != amount):
+                valid.append(amount)
+        except (ValueError, TypeError):
+            continue
+    income = [amt for amt in valid if amt > 0]
+    expenses = [abs(amt) for amt in valid if amt < 0]
+    return (
+        statistics.mean(valid), statistics.median(valid),
+        statistics.stdev(valid), statistics.variance(valid),
+        min(valid), max(valid), sum(income), sum(expenses),
+    )
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,1000000,10000000")
+    parser.add_argument("--skip-legacy-above", type=int, default=None,
+                        help="Skip the (slow) legacy baseline above this many rows")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    print(f"numpy: {'yes' if kernel.np is not None else 'no'}")
+    print(f"{'rows':>10} {'legacy s':>10} {'stream s':>10} {'column s':>10} {'speedup':>8}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        decimals = [Decimal(rng.randint(-50000, 30000)) / 100 for _ in range(n)]
+        if args.skip_legacy_above is not None and n > args.skip_legacy_above:
+            t_legacy = None
+        else:
+            t_legacy = timed(legacy, decimals)
+        # Streaming path: what the routers get from a result iterator without numpy
+        t_stream = timed(kernel._summarize_stream, iter(decimals), "amount")
+        # Column path: materialize once, then vectorized summary
+        t_column = timed(lambda: summarize(column(decimals)))
+        best = min(t_stream, t_column)
+        speedup = f"{t_legacy / best:7.1f}x" if t_legacy else "    n/a"
+        legacy_s = f"{t_legacy:10.3f}" if t_legacy else f"{'skipped':>10}"
+        print(f"{n:>10} {legacy_s} {t_stream:10.3f} {t_column:10.3f} {speedup}")
+
+if __name__ == "__main__":
+    main()
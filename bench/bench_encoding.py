@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Response encoding cost for the largest pages of /transactions and /fake/plaid/transactions.
+
+    python bench/bench_encoding.py --tiers 1k,100k --limit 500 --out bench/results/encoding.json
+
+Builds one page of each route for the user with the most transactions, then
+times turning it into response bytes two ways. "response_model" is the
+generic path: validate the returned models again, jsonable_encoder, stdlib
+json. "fast_json" is app.core.responses, which the routes now return. The
+two outputs are checked to decode to the same JSON.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.responses import fast_json
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.routers.transactions import _list_txns
+from app.schemas.plaid_fake import PlaidTransactionsGetResponse
+from app.schemas.transaction import TransactionRead
+from app.services import seeding
+from app.services.fake_plaid import plaidish_transactions_get
+from bench_endpoints import TIERS, build_dataset, percentiles
+
+def response_model_bytes(content, adapter: TypeAdapter) -> bytes:
+    value = adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json")
+    return json.dumps(
+        jsonable_encoder(value), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def time_encoders(content, model, repeat: int) -> dict:
+    adapter = TypeAdapter(model)
+    encoders = {
+        "response_model": lambda: response_model_bytes(content, adapter),
+        "fast_json": lambda: fast_json(content).body,
+    }
+    assert json.loads(encoders["response_model"]()) == json.loads(encoders["fast_json"]())
+    result = {}
+    for name, encode in encoders.items():
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            body = encode()
+            samples.append(time.perf_counter() - t0)
+        result[name] = {**percentiles(samples), "bytes": len(body)}
+    return result
+
+def bench_tier(tier: str, limit: int, repeat: int) -> dict:
+    db_path, _ = build_dataset(tier, 0, 1, False)
+    engine = seeding.make_engine(f"sqlite:///{db_path}")
+    try:
+        with Session(engine) as db:
+            account_id, user_id = db.query(Transaction.account_id, Transaction.user_id).group_by(
+                Transaction.account_id).order_by(func.count().desc()).first()
+            mask = db.get(Account, account_id).mask
+            pages = {
+                "/transactions": (
+                    _list_txns(db, user_id, None, None, None, None, limit, 0, None, False)[0],
+                    list[TransactionRead],
+                ),
+                "/fake/plaid/transactions": (
+                    plaidish_transactions_get(db, user_id, account_id_label=mask, limit=limit),
+                    PlaidTransactionsGetResponse,
+                ),
+            }
+        result = {}
+        for route, (content, model) in pages.items():
+            result[route] = stats = time_encoders(content, model, repeat)
+            slow, fast = stats["response_model"], stats["fast_json"]
+            print(f"[{tier}] {route:26s} {fast['bytes']:>9,} bytes  response_model p50 {slow['p50_ms']:8.2f} ms  "
+                  f"fast_json p50 {fast['p50_ms']:7.2f} ms  ({slow['p50_ms'] / fast['p50_ms']:.1f}x)", flush=True)
+        return result
+    finally:
+        engine.dispose()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Response encoding: response_model vs fast_json")
+    parser.add_argument("--tiers", default="1k,100k", help=f"Comma-separated, from {', '.join(TIERS)}")
+    parser.add_argument("--limit", type=int, default=500, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed encodings per page")
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    report = {"limit": args.limit, "tiers": {}}
+    for tier in args.tiers.split(","):
+        report["tiers"][tier] = bench_tier(tier, args.limit, args.repeat)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
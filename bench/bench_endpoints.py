@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark: every route in app.main, in-process over httpx's ASGI
+transport, against seeded datasets of increasing size.
+
+    python bench/bench_endpoints.py run --tiers 1k,100k --out bench/results/today.json
+    python bench/bench_endpoints.py run --tiers 5m --baseline bench/results/main.json
+    python bench/bench_endpoints.py compare bench/results/main.json bench/results/today.json
+
+Datasets are built once with app.services.seeding and cached under
+bench/.data; each run works on a copy so write routes never change the
+cached data. For every route the report has p50/p95/p99/mean latency in ms,
+SQL statements per request and the process peak RSS after the route ran.
+`compare` exits non-zero when a watched route got slower or issues more
+queries.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import sqlalchemy
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.ai.insights import REFRESH_JOB
+from app.core.security import create_access_token, hash_password
+from app.db.init_db import init_db
+from app.db.session import database_factory
+from app.deps import get_db
+from app.main import app
+from app.models.account import Account
+from app.models.job import Job
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import balances, changes, lookups, seeding
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PASSWORD = "pluto-bench"
+
+# (users, accounts per user, months); ~28.7 transactions per user-month with 3 accounts
+TIERS = {
+    "1k": (3, 3, 12),
+    "100k": (100, 3, 35),
+    "5m": (2900, 3, 60),
+}
+
+# Routes that need something we do not want in a benchmark
+SKIPPED: dict[str, str] = {}
+
+WATCHED = ("/insights", "/transactions", "/fake/plaid/transactions")
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def percentiles(samples: list[float]) -> dict:
+    if len(samples) == 1:
+        p50 = p95 = p99 = samples[0]
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    return {
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+def build_dataset(tier: str, seed: int, workers: int, rebuild: bool) -> tuple[str, dict]:
+    """Seed (or reuse and migrate) the cached database for a tier; returns its path and stats."""
+    data_dir = os.path.join(HERE, ".data")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"{tier}-seed{seed}.db")
+    meta_path = path[:-3] + ".json"
+    if not rebuild and os.path.exists(path) and os.path.exists(meta_path):
+        engine = seeding.make_engine(f"sqlite:///{path}")
+        init_db(engine)
+        engine.dispose()
+        with open(meta_path) as f:
+            return path, json.load(f)
+
+    for stale in (path, meta_path):
+        if os.path.exists(stale):
+            os.remove(stale)
+    users, accounts, months = TIERS[tier]
+    url = f"sqlite:///{path}"
+    engine = seeding.make_engine(url)
+    init_db(engine)
+    plan = seeding.plan_seed(engine, users, accounts, months, seed, date.today(), hash_password(PASSWORD))
+    engine.dispose()
+    print(f"[{tier}] seeding {users} users x {accounts} accounts x {months} months ...", flush=True)
+    t0 = time.perf_counter()
+    stats = seeding.seed_database(url, plan, workers=workers)
+    meta = {
+        "users": stats.users, "accounts": stats.accounts, "transactions": stats.transactions,
+        "rollups": stats.rollups, "seed": seed, "as_of": plan.as_of.isoformat(),
+        "build_seconds": round(time.perf_counter() - t0, 1),
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return path, meta
+
+def route_specs(ctx: dict) -> list[tuple[str, str, str, dict, int]]:
+    """(name, method, path, request kwargs or a factory, repeat divisor) for every route."""
+    today = date.today()
+    counter = itertools.count()
+    account_id, mask = ctx["account_id"], ctx["mask"]
+    doomed, doomed_txns = ctx["doomed"], ctx["doomed_txns"]
+    return [
+        ("GET /healthz", "GET", "/healthz", {}, 1),
+        ("GET /debug/caches", "GET", "/debug/caches", {}, 1),
+        ("POST /auth/signup", "POST", "/auth/signup", lambda: {"json": {
+            "email": f"bench{next(counter)}-{time.time_ns()}@example.com", "password": PASSWORD,
+        }}, 10),
+        ("POST /auth/login", "POST", "/auth/login", {"json": {"email": ctx["email"], "password": PASSWORD}}, 10),
+        ("GET /users/me", "GET", "/users/me", {}, 1),
+        ("GET /accounts", "GET", "/accounts", {}, 1),
+        ("POST /accounts", "POST", "/accounts", lambda: {"json": {"name": "Bench", "mask": f"{next(counter) % 10000:04d}"}}, 1),
+        ("POST /accounts/link", "POST", "/accounts/link", lambda: {"json": {
+            "username": f"benchlink{next(counter):06d}", "password": "x", "account_type": "checking",
+        }}, 5),
+        ("DELETE /accounts/{account_id}", "DELETE", None, lambda: {"url": f"/accounts/{doomed.pop()}"}, 1),
+        ("POST /accounts/plaid/transactions/get", "POST", "/accounts/plaid/transactions/get",
+         {"params": {"account_id": mask, "count": 100}}, 1),
+        ("POST /transactions", "POST", "/transactions", {"json": {
+            "account_id": account_id, "date": today.isoformat(), "amount": "-4.20", "category": "dining",
+        }}, 1),
+        ("DELETE /transactions/{transaction_id}", "DELETE", None,
+         lambda: {"url": f"/transactions/{doomed_txns.pop()}"}, 1),
+        ("GET /transactions", "GET", "/transactions", {"params": {"limit": 100}}, 1),
+        ("GET /transactions?filtered", "GET", "/transactions", {"params": {
+            "account_id": account_id, "category": "groceries", "limit": 100,
+            "from": (today - timedelta(days=365)).isoformat(), "to": today.isoformat(),
+        }}, 1),
+        ("GET /transactions/export", "GET", "/transactions/export", {"params": {"account_id": account_id}}, 5),
+        ("POST /transactions/bulk", "POST", "/transactions/bulk", {
+            "content": "".join(
+                f'{{"account_id": {account_id}, "date": "{today.isoformat()}", "amount": "-1.{i:02d}"}}\n'
+                for i in range(100)
+            ),
+            "headers": {"Content-Type": "application/x-ndjson"},
+        }, 5),
+        ("GET /insights/spending", "GET", "/insights/spending", {}, 1),
+        ("GET /insights/mathematical-summary", "GET", "/insights/mathematical-summary", {}, 1),
+        ("GET /insights/trend-analysis", "GET", "/insights/trend-analysis", {}, 1),
+        ("GET /insights/financial-summary", "GET", "/insights/financial-summary", {}, 1),
+        ("GET /insights/debug-params", "GET", "/insights/debug-params", {}, 1),
+        ("GET /insights/pluto-score", "GET", "/insights/pluto-score", {}, 1),
+        ("GET /insights/dashboard", "GET", "/insights/dashboard", {}, 1),
+        ("GET /insights/series", "GET", "/insights/series", {"params": {"periods": 24, "group_by": "category"}}, 1),
+        ("GET /insights/gemini-insights", "GET", "/insights/gemini-insights", {}, 1),
+        ("POST /insights/gemini-insights/refresh", "POST", "/insights/gemini-insights/refresh", {}, 1),
+        ("GET /jobs/{job_id}", "GET", f"/jobs/{ctx['job_id']}", {}, 1),
+        ("GET /fake/plaid/transactions", "GET", "/fake/plaid/transactions",
+         {"params": {"account_id": mask, "limit": 100}}, 1),
+        ("GET /fake/plaid/transactions/sync", "GET", "/fake/plaid/transactions/sync", {"params": {"count": 100}}, 1),
+        ("GET /fake/plaid/transactions/sync?delta", "GET", "/fake/plaid/transactions/sync",
+         {"params": {"cursor": ctx["sync_cursor"], "count": 100}}, 1),
+    ]
+
+def uncovered_routes(specs) -> list[str]:
+    """Routes registered on the app that the benchmark neither runs nor skips."""
+    known = {name.split("?")[0] for name, *_ in specs} | set(SKIPPED)
+    registered = {
+        f"{method.upper()} {path}"
+        for path, ops in app.openapi()["paths"].items() for method in ops
+    }
+    return sorted(registered - known)
+
+async def bench_tier(tier: str, db_path: str, requests: int, warmup: int, async_db: bool) -> dict:
+    work_path = db_path[:-3] + ".work.db"
+    shutil.copyfile(db_path, work_path)
+    engine = seeding.make_engine(f"sqlite:///{work_path}")
+    init_db(engine)
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    app_engine = create_async_engine(f"sqlite+aiosqlite:///{work_path}") if async_db else engine
+    open_database = database_factory(app_engine)
+
+    async def _get_db():
+        db = open_database()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    queries = 0
+
+    @event.listens_for(getattr(app_engine, "sync_engine", engine), "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal queries
+        queries += 1
+
+    with Session() as db:
+        user = db.query(User).order_by(User.id).first()
+        account = db.query(Account).filter(Account.user_id == user.id).order_by(Account.id).first()
+        n_doomed = max(requests, 1) + warmup
+        first_doomed = (db.execute(select(func.max(Account.id))).scalar() or 0) + 1
+        db.add_all(Account(user_id=user.id, name="Doomed", mask=f"d{i:03d}") for i in range(n_doomed))
+        doomed_txns = db.scalars(insert(Transaction).returning(Transaction.id), lookups.encode(db, [
+            {"user_id": user.id, "account_id": account.id, "date": date.today(), "amount": Decimal("-0.01"),
+             "category": "Other", "description": "Doomed"}
+            for _ in range(n_doomed)
+        ])).all()
+        balances.adjust(db, {account.id: Decimal("-0.01") * n_doomed})
+        # No worker runs here, so Gemini is never called; insight requests join this queued job
+        job = Job(kind=REFRESH_JOB, user_id=user.id, status="queued")
+        db.add(job)
+        db.commit()
+        ctx = {
+            "job_id": job.id,
+            "sync_cursor": changes.encode_sync_cursor(changes.head(db, user.id)),
+            "email": user.email, "account_id": account.id, "mask": account.mask,
+            "doomed": list(range(first_doomed, first_doomed + n_doomed)),
+            "doomed_txns": list(doomed_txns),
+        }
+
+    app.dependency_overrides[get_db] = _get_db
+    results = {}
+    specs = route_specs(ctx)
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for name, method, path, kwargs, divisor in specs:
+                n = max(requests // divisor, 1)
+                samples, counts, errors = [], [], 0
+                for i in range(warmup + n):
+                    kw = dict(kwargs() if callable(kwargs) else kwargs)
+                    url = kw.pop("url", path)
+                    before = queries
+                    t0 = time.perf_counter()
+                    response = await client.request(method, url, **kw)
+                    elapsed = time.perf_counter() - t0
+                    if response.status_code >= 400:
+                        errors += 1
+                    if i >= warmup:
+                        samples.append(elapsed)
+                        counts.append(queries - before)
+                results[name] = {
+                    "n": n, **percentiles(samples),
+                    "queries_per_request": round(statistics.fmean(counts), 2),
+                    "errors": errors,
+                    "peak_rss_mb": peak_rss_mb(),
+                }
+                print(f"[{tier}] {name:42s} p50 {results[name]['p50_ms']:9.2f} ms  "
+                      f"p95 {results[name]['p95_ms']:9.2f} ms  q/req {results[name]['queries_per_request']:6.2f}"
+                      + (f"  errors {errors}" if errors else ""), flush=True)
+    finally:
+        app.dependency_overrides.clear()
+        if async_db:
+            await app_engine.dispose()
+        engine.dispose()
+        os.remove(work_path)
+    return {"routes": results, "skipped": SKIPPED, "uncovered": uncovered_routes(specs), "peak_rss_mb": peak_rss_mb()}
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=HERE, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Print a per-route comparison and return the watched regressions."""
+    regressions = []
+    for tier, cur in current["tiers"].items():
+        base = baseline.get("tiers", {}).get(tier)
+        if not base:
+            continue
+        print(f"\n== {tier}: {base['dataset']['transactions']} -> {cur['dataset']['transactions']} transactions")
+        print(f"{'route':42s} {'p50 ms':>19s} {'p95 ms':>19s} {'q/req':>13s}")
+        for name, c in cur["routes"].items():
+            b = base["routes"].get(name)
+            if not b:
+                continue
+            flags = []
+            for key in ("p50_ms", "p95_ms"):
+                if c[key] > b[key] * (1 + threshold) and c[key] - b[key] > min_delta_ms:
+                    flags.append(key.split("_")[0])
+            if c["queries_per_request"] > b["queries_per_request"]:
+                flags.append("queries")
+            print(f"{name:42s} {b['p50_ms']:9.2f}->{c['p50_ms']:8.2f} {b['p95_ms']:9.2f}->{c['p95_ms']:8.2f} "
+                  f"{b['queries_per_request']:6.2f}->{c['queries_per_request']:5.2f}"
+                  + (f"  REGRESSED ({', '.join(flags)})" if flags else ""))
+            path = name.split(" ", 1)[1]
+            if flags and path.startswith(WATCHED):
+                regressions.append(f"{tier} {name}: {', '.join(flags)}")
+    return regressions
+
+def run(args: argparse.Namespace) -> int:
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "database": "aiosqlite" if args.async_db else "sqlite",
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "tiers": {},
+    }
+    for tier in args.tiers.split(","):
+        db_path, dataset = build_dataset(tier, args.seed, args.workers, args.rebuild)
+        result = asyncio.run(bench_tier(tier, db_path, args.requests, args.warmup, args.async_db))
+        report["tiers"][tier] = {"dataset": dataset, **result}
+
+    out = args.out or os.path.join(HERE, "results", f"endpoints-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {out}")
+    for tier, result in report["tiers"].items():
+        if result["uncovered"]:
+            print(f"[{tier}] routes not benchmarked: {', '.join(result['uncovered'])}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold, args.min_delta_ms)
+        return _verdict(regressions)
+    return 0
+
+def _verdict(regressions: list[str]) -> int:
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    print("\nNo regressions in watched routes")
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every API route against seeded datasets")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="Run the benchmark and write a JSON report")
+    p.add_argument("--tiers", default="1k,100k", help=f"Comma-separated tiers: {', '.join(TIERS)}")
+    p.add_argument("--requests", type=int, default=50, help="Timed requests per route")
+    p.add_argument("--warmup", type=int, default=2, help="Untimed requests per route")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Seeding processes")
+    p.add_argument("--rebuild", action="store_true", help="Re-seed cached datasets")
+    p.add_argument("--async-db", action="store_true", help="Serve requests through aiosqlite instead of pysqlite")
+    p.add_argument("--out", help="Report path (default bench/results/endpoints-<timestamp>.json)")
+    p.add_argument("--baseline", help="Compare against an earlier report")
+
+    c = sub.add_parser("compare", help="Compare two reports")
+    c.add_argument("baseline")
+    c.add_argument("current")
+
+    for q in (p, c):
+        q.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+        q.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return _verdict(compare(baseline, current, args.threshold, args.min_delta_ms))
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
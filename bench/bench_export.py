@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Full-history export: paging /transactions vs the streamed export.
+
+    python bench/bench_export.py --tier 5m --rows 1000000 --out bench/results/export.json
+
+"paged" walks the busiest user's history the old way, one limit/offset page
+of `_list_txns` at a time. "stream" runs the export generator for the same
+user. "bulk" streams the first `--rows` rows of the whole table (all users)
+through the export generator, plain and gzipped: time grows with the row
+count while the process peak RSS (reported after each run) does not.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.transaction import Transaction
+from app.routers.transactions import _criteria, _list_txns
+from app.services import export, seeding
+from bench_endpoints import TIERS, build_dataset, peak_rss_mb
+
+def measure(fn) -> dict:
+    t0 = time.perf_counter()
+    rows, size = fn()
+    elapsed = time.perf_counter() - t0
+    return {"rows": rows, "bytes": size, "seconds": round(elapsed, 3),
+            "rows_per_s": round(rows / elapsed), "peak_rss_mb": peak_rss_mb()}
+
+def paged(db: Session, user_id: int, page: int):
+    rows = size = offset = 0
+    while True:
+        batch, _ = _list_txns(db, user_id, None, None, None, None, page, offset, None, False)
+        if not batch:
+            return rows, size
+        rows += len(batch)
+        size += sum(len(r.model_dump_json()) for r in batch)
+        offset += page
+
+def streamed(db: Session, criteria: list, fmt: str, batch: int, gzip: bool = False):
+    chunks = export.transaction_chunks(db, criteria, fmt, batch)
+    if gzip:
+        chunks = export.gzip_chunks(chunks)
+    size = sum(len(c) for c in chunks)
+    rows = db.query(func.count()).select_from(Transaction).filter(*criteria).scalar()
+    return rows, size
+
+def report(name: str, stats: dict) -> None:
+    print(f"{name:22s} {stats['rows']:>9,} rows  {stats['bytes']:>12,} bytes  {stats['seconds']:8.2f} s  "
+          f"{stats['rows_per_s']:>9,} rows/s  peak RSS {stats['peak_rss_mb']:7.1f} MB", flush=True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Paged listing vs streamed export")
+    parser.add_argument("--tier", default="100k", choices=TIERS)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows for the whole-table stream")
+    parser.add_argument("--page", type=int, default=500, help="Page size for the paged walk")
+    parser.add_argument("--batch", type=int, default=2000, help="Rows per export chunk")
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    db_path, _ = build_dataset(args.tier, 0, 1, False)
+    engine = seeding.make_engine(f"sqlite:///{db_path}")
+    results = {}
+    try:
+        with Session(engine) as db:
+            user_id = db.query(Transaction.user_id).group_by(Transaction.user_id).order_by(
+                func.count().desc()).limit(1).scalar()
+            user = _criteria(user_id, None, None, None, None)
+            cutoff = db.query(Transaction.id).order_by(Transaction.id).offset(args.rows - 1).limit(1).scalar()
+            bulk = [Transaction.id <= cutoff] if cutoff else []
+            runs = {
+                "paged (one user)": lambda: paged(db, user_id, args.page),
+                "stream (one user)": lambda: streamed(db, user, "ndjson", args.batch),
+                "stream ndjson (bulk)": lambda: streamed(db, bulk, "ndjson", args.batch),
+                "stream csv (bulk)": lambda: streamed(db, bulk, "csv", args.batch),
+                "stream ndjson+gzip": lambda: streamed(db, bulk, "ndjson", args.batch, gzip=True),
+            }
+            for name, fn in runs.items():
+                results[name] = measure(fn)
+                report(name, results[name])
+                db.rollback()
+    finally:
+        engine.dispose()
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"tier": args.tier, "args": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Gemini prompt size and build cost: raw transaction dump vs. the compact feature summary.
+
+    python bench/bench_gemini_prompt.py --tiers 1k,100k --out bench/results/prompt.json
+
+For each tier, builds both prompts for the user with the most transactions
+and reports characters, estimated tokens, build time and peak Python memory.
+"legacy" reproduces the old prompt: every transaction in the database,
+formatted with str(). With --live, both prompts are also sent to the
+configured LLM_PROVIDER and its latency is recorded.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.ai import features
+from app.ai.insights import build_prompt, get_llm
+from app.ai.providers import LLMUnavailable
+from app.config import settings
+from app.models.transaction import Transaction
+from app.services import seeding
+from bench_endpoints import TIERS, build_dataset
+
+def legacy_prompt(db: Session) -> str:
+    transactions = [
+        {
+            "id": t.id, "user_id": t.user_id, "account_id": t.account_id, "date": str(t.date),
+            "amount": float(t.amount), "category": t.category, "description": t.description,
+        }
+        for t in db.query(Transaction).all()
+    ]
+    return build_prompt({}).replace("Summary: {}", "Transactions: " + str(transactions))
+
+def measure(build) -> tuple[str, dict]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    prompt = build()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return prompt, {
+        "chars": len(prompt),
+        "tokens_est": features.estimate_tokens(prompt),
+        "build_ms": round(elapsed * 1000, 2),
+        "peak_mb": round(peak / (1024 * 1024), 2),
+    }
+
+def model_latency(prompt: str) -> float | None:
+    t0 = time.perf_counter()
+    try:
+        get_llm().complete(prompt)
+    except LLMUnavailable as e:
+        print(f"  model call failed: {e}")
+        return None
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+def bench_tier(tier: str, budget: int, live: bool) -> dict:
+    db_path, _ = build_dataset(tier, 0, 1, False)
+    engine = seeding.make_engine(f"sqlite:///{db_path}")
+    try:
+        with Session(engine) as db:
+            user_id, txns = db.query(Transaction.user_id, func.count()).group_by(
+                Transaction.user_id).order_by(func.count().desc()).first()
+            modes = {
+                "legacy": lambda: legacy_prompt(db),
+                "summary": lambda: build_prompt(features.summary_for_prompt(
+                    db, user_id, budget, months=settings.GEMINI_SUMMARY_MONTHS)),
+            }
+            result = {"user_transactions": txns, "modes": {}}
+            for name, build in modes.items():
+                prompt, stats = measure(build)
+                if live:
+                    stats["model_ms"] = model_latency(prompt)
+                result["modes"][name] = stats
+                print(f"[{tier}] {name:8s} {stats['chars']:>12,} chars  ~{stats['tokens_est']:>10,} tokens  "
+                      f"build {stats['build_ms']:9.2f} ms  peak {stats['peak_mb']:8.2f} MB"
+                      + (f"  model {stats['model_ms']} ms" if live else ""), flush=True)
+            return result
+    finally:
+        engine.dispose()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Gemini prompt size: raw dump vs compact summary")
+    parser.add_argument("--tiers", default="1k,100k", help=f"Comma-separated, from {', '.join(TIERS)}")
+    parser.add_argument("--budget", type=int, default=settings.GEMINI_PROMPT_TOKEN_BUDGET)
+    parser.add_argument("--live", action="store_true", help="Also time the call to LLM_PROVIDER")
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    if args.live and settings.LLM_PROVIDER == "gemini" and not settings.GEMINI_API_KEY:
+        parser.error("--live with LLM_PROVIDER=gemini needs GEMINI_API_KEY")
+    report = {"budget": args.budget, "tiers": {}}
+    for tier in args.tiers.split(","):
+        report["tiers"][tier] = bench_tier(tier, args.budget, args.live)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Bulk import vs one POST /transactions per row.
+
+    python bench/bench_import.py --rows 100000 --out bench/results/import.json
+
+Imports `--rows` generated transactions for one user of the 1k dataset
+(on a copy) through POST /transactions/bulk as NDJSON and as CSV, streamed
+in `--chunk`-byte pieces over httpx's ASGI transport, and times
+`--single` rows sent the old way, one request each, to extrapolate that
+path to the same row count. A tenth of the bulk rows are deliberately bad
+and must come back as per-row errors.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.security import create_access_token
+from app.db.init_db import init_db
+from app.db.session import database_factory
+from app.deps import get_db
+from app.main import app
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services import seeding
+from bench_endpoints import build_dataset, peak_rss_mb
+
+def generate(account_ids: list[int], rows: int, bad_every: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365)
+    out = []
+    for i in range(rows):
+        row = {
+            "account_id": rng.choice(account_ids), "date": (start + timedelta(days=rng.randrange(365))).isoformat(),
+            "amount": f"{rng.uniform(-200, 50):.2f}", "category": rng.choice(["dining", "groceries", "transport"]),
+            "description": f"Imported {i}",
+        }
+        if bad_every and i % bad_every == bad_every - 1:
+            row["date"] = "bad-date"
+        out.append(row)
+    return out
+
+def encode(rows: list[dict], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return b"".join(json.dumps(r).encode() + b"\n" for r in rows)
+    lines = ["account_id,date,amount,category,description"]
+    lines += [f"{r['account_id']},{r['date']},{r['amount']},{r['category']},{r['description']}" for r in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+async def run(args) -> dict:
+    db_path, _ = build_dataset("1k", 0, 1, False)
+    work_path = db_path[:-3] + ".import.db"
+    shutil.copyfile(db_path, work_path)
+    engine = seeding.make_engine(f"sqlite:///{work_path}")
+    init_db(engine)
+    with Session(engine) as db:
+        user_id = db.scalar(select(Account.user_id).order_by(Account.id).limit(1))
+        account_ids = list(db.scalars(select(Account.id).where(Account.user_id == user_id)))
+    open_database = database_factory(engine)
+
+    async def _get_db():
+        db = open_database()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+    rows = generate(account_ids, args.rows, args.bad_every, args.seed)
+    report = {"rows": args.rows, "modes": {}}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers,
+                                     timeout=None) as client:
+            for fmt, content_type in (("ndjson", "application/x-ndjson"), ("csv", "text/csv")):
+                body = encode(rows, fmt)
+                t0 = time.perf_counter()
+                response = await client.post("/transactions/bulk", content=chunked(body, args.chunk),
+                                             headers={"Content-Type": content_type})
+                elapsed = time.perf_counter() - t0
+                result = response.json()
+                report["modes"][f"bulk {fmt}"] = stats = {
+                    "seconds": round(elapsed, 2), "rows_per_s": round(args.rows / elapsed),
+                    "inserted": result["inserted"], "failed": result["failed"],
+                    "body_mb": round(len(body) / 2**20, 1), "peak_rss_mb": peak_rss_mb(),
+                }
+                print(f"bulk {fmt:6s} {args.rows:,} rows in {elapsed:7.2f} s  ({stats['rows_per_s']:,} rows/s)  "
+                      f"inserted {result['inserted']:,}  failed {result['failed']:,}  peak RSS {stats['peak_rss_mb']} MB",
+                      flush=True)
+
+            t0 = time.perf_counter()
+            for row in rows[:args.single]:
+                await client.post("/transactions", json={**row, "date": row["date"].replace("bad-date", "2024-01-01")})
+            elapsed = time.perf_counter() - t0
+            per_row = elapsed / args.single
+            report["modes"]["per-row POST"] = {
+                "rows": args.single, "seconds": round(elapsed, 2), "rows_per_s": round(1 / per_row),
+                "extrapolated_seconds": round(per_row * args.rows, 1),
+            }
+            print(f"per-row POST {args.single:,} rows in {elapsed:7.2f} s  ({1 / per_row:,.0f} rows/s)  "
+                  f"-> {per_row * args.rows:,.0f} s for {args.rows:,}", flush=True)
+        with Session(engine) as db:
+            report["transactions_after"] = db.scalar(select(func.count()).select_from(Transaction))
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        os.remove(work_path)
+    return report
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="POST /transactions/bulk vs per-row POST /transactions")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single", type=int, default=1000, help="Rows to time through per-row POST")
+    parser.add_argument("--chunk", type=int, default=64 * 1024, help="Request body chunk size in bytes")
+    parser.add_argument("--bad-every", type=int, default=10, help="Make every Nth row invalid (0: none)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+LLM resilience under a misbehaving upstream, offline.
+
+    python bench/bench_llm.py --calls 200 --concurrency 16 --latency 0.2 --jitter 0.3 \\
+        --failure-rate 0.1 --hang-rate 0.05 --out bench/results/llm.json
+
+Sends `--calls` prompts through ResilientLLM from `--concurrency` threads
+against the stub provider (or `pluto llm-stub` with --url) under several
+configurations, and reports answered/fallback counts, caller-side latency
+percentiles and how many provider calls were made. "unguarded" mimics the
+old code path: one call, no client timeout, no retries.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.providers import (
+    CircuitBreaker, HTTPStubProvider, LLMUnavailable, ResilientLLM, StubBehavior, StubProvider,
+)
+from bench_endpoints import percentiles
+
+CONFIGS = {
+    "unguarded": dict(timeout=600, deadline=600, retries=0, hedge_after=0, breaker=0),
+    "timeouts+retries": dict(timeout=1.0, deadline=3.0, retries=2, hedge_after=0, breaker=0),
+    "hedged": dict(timeout=1.0, deadline=3.0, retries=2, hedge_after=0.6, breaker=0),
+    "hedged+breaker": dict(timeout=1.0, deadline=3.0, retries=2, hedge_after=0.6, breaker=5),
+}
+
+def run_config(name: str, cfg: dict, args) -> dict:
+    behavior = StubBehavior(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+                            hang_rate=args.hang_rate, hang_seconds=args.hang_seconds)
+    provider = HTTPStubProvider(args.url) if args.url else StubProvider(behavior, seed=args.seed)
+    llm = ResilientLLM(
+        provider, timeout=cfg["timeout"], deadline=cfg["deadline"], retries=cfg["retries"],
+        backoff=0.05, hedge_after=cfg["hedge_after"],
+        breaker=CircuitBreaker(cfg["breaker"], reset_after=1.0), max_concurrency=args.concurrency * 2,
+    )
+    samples, answered = [], 0
+
+    def one(_):
+        t0 = time.perf_counter()
+        try:
+            llm.complete("prompt")
+            ok = True
+        except LLMUnavailable:
+            ok = False
+        return ok, time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        for ok, elapsed in pool.map(one, range(args.calls)):
+            answered += ok
+            samples.append(elapsed)
+    wall = time.perf_counter() - t0
+    stats = llm.stats()
+    llm.shutdown()
+    result = {
+        "answered": answered, "fallbacks": args.calls - answered, "wall_seconds": round(wall, 2),
+        "latency": {**percentiles(samples), "max_ms": round(max(samples) * 1000, 3)},
+        "provider_calls": getattr(provider, "calls", None), **{k: stats[k] for k in (
+            "retries", "hedges", "hedge_wins", "short_circuited", "breaker_rejections")},
+    }
+    lat = result["latency"]
+    print(f"{name:17s} answered {answered:4d}/{args.calls}  p50 {lat['p50_ms']:8.1f} ms  "
+          f"p99 {lat['p99_ms']:8.1f} ms  max {lat['max_ms']:8.1f} ms  provider calls {result['provider_calls']}  "
+          f"hedge wins {stats['hedge_wins']}  short-circuited {stats['short_circuited']}", flush=True)
+    return result
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="LLM timeouts, retries, hedging and breaker vs a flaky stub")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--failure-rate", type=float, default=0.1)
+    parser.add_argument("--hang-rate", type=float, default=0.05)
+    parser.add_argument("--hang-seconds", type=float, default=10.0, help="How long a hung call stalls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="Use a running `pluto llm-stub` instead of the in-process stub")
+    parser.add_argument("--configs", default=",".join(CONFIGS))
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    report = {"args": vars(args), "configs": {}}
+    for name in args.configs.split(","):
+        report["configs"][name] = run_config(name, CONFIGS[name], args)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Login storm vs. everything else: bcrypt on the request threadpool compared
+with the dedicated hashing pool.
+
+    python bench/bench_login.py --logins 64 --duration 10 --out bench/results/login.json
+
+For each mode, `--logins` clients POST /auth/login in a loop while one probe
+client issues GET /transactions every `--probe-interval` seconds. Reports
+login throughput, 503 rejections and probe latency percentiles, plus a
+probe-only baseline. Uses the cached 1k dataset from bench_endpoints.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.core.security import PasswordHasher, create_access_token
+from app.db.init_db import init_db
+from app.db.session import database_factory
+from app.deps import get_db
+from app.main import app
+from app.models.user import User
+from app.routers import auth
+from app.services import seeding
+from bench_endpoints import PASSWORD, build_dataset, percentiles
+
+async def storm(client, email: str, logins: int, duration: float, probe_interval: float, headers: dict) -> dict:
+    deadline = time.perf_counter() + duration
+    ok = rejected = 0
+    login_samples, probe_samples = [], []
+
+    async def login_loop():
+        nonlocal ok, rejected
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            r = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            if r.status_code == 200:
+                ok += 1
+                login_samples.append(time.perf_counter() - t0)
+            elif r.status_code == 503:
+                rejected += 1
+                await asyncio.sleep(0.05)
+
+    async def probe_loop():
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            r = await client.get("/transactions", params={"limit": 50}, headers=headers)
+            assert r.status_code == 200, r.text
+            probe_samples.append(time.perf_counter() - t0)
+            await asyncio.sleep(probe_interval)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(probe_loop(), *(login_loop() for _ in range(logins)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "logins_ok": ok,
+        "logins_rejected": rejected,
+        "logins_per_second": round(ok / elapsed, 2),
+        "login": percentiles(login_samples) if login_samples else None,
+        "probe_requests": len(probe_samples),
+        "probe": percentiles(probe_samples),
+    }
+
+async def run(args) -> dict:
+    db_path, _ = build_dataset("1k", 0, 1, False)
+    work_path = db_path[:-3] + ".login.db"
+    shutil.copyfile(db_path, work_path)
+    engine = seeding.make_engine(f"sqlite:///{work_path}")
+    init_db(engine)
+    open_database = database_factory(engine)
+
+    async def _get_db():
+        db = open_database()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    with engine.connect() as conn:
+        user_id, email = conn.execute(User.__table__.select().with_only_columns(User.id, User.email).limit(1)).one()
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+    modes = {
+        "threadpool": PasswordHasher(workers=0, queue_limit=0, retry_after=1),
+        "process_pool": PasswordHasher(workers=args.workers, queue_limit=args.queue_limit, retry_after=1),
+    }
+    original = auth.hasher
+    app.dependency_overrides[get_db] = _get_db
+    report = {"logins": args.logins, "duration": args.duration, "workers": args.workers,
+              "queue_limit": args.queue_limit, "modes": {}}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            report["modes"]["probe_only"] = await storm(client, email, 0, args.duration / 2, args.probe_interval, headers)
+            for name, hasher in modes.items():
+                auth.hasher = hasher
+                if hasher.workers:
+                    await hasher.hash("warm up the worker processes")
+                report["modes"][name] = await storm(
+                    client, email, args.logins, args.duration, args.probe_interval, headers
+                )
+                hasher.shutdown()
+                result = report["modes"][name]
+                print(f"{name:13s} logins/s {result['logins_per_second']:7.2f}  503s {result['logins_rejected']:5d}  "
+                      f"probe p50 {result['probe']['p50_ms']:8.2f} ms  p99 {result['probe']['p99_ms']:8.2f} ms",
+                      flush=True)
+    finally:
+        auth.hasher = original
+        app.dependency_overrides.clear()
+        engine.dispose()
+        os.remove(work_path)
+    base = report["modes"]["probe_only"]["probe"]
+    print(f"{'probe_only':13s} probe p50 {base['p50_ms']:8.2f} ms  p99 {base['p99_ms']:8.2f} ms")
+    return report
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Login throughput vs concurrent /transactions latency")
+    parser.add_argument("--logins", type=int, default=64, help="Concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Hashing processes")
+    parser.add_argument("--queue-limit", type=int, default=8)
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Table size and group-by time: category and description strings on every row vs lookup keys.
+
+    python bench/bench_lookups.py --tier 5m --out bench/results/lookups.json
+
+Works on a scratch copy of the tier's dataset. "text" is the previous
+layout, rebuilt from the current one into side tables with the same
+columns, primary keys and indexes: transactions carrying their category
+and description strings, rollups keyed by category name. "encoded" is the
+current layout (integer `category_id` / `merchant_id`). Reported per
+layout: table plus index bytes from SQLite's dbstat, the per-user category
+spend that backs /insights (every user once, from the rollups), and
+whole-table GROUP BYs over transactions by category and by merchant.
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.init_db import init_db
+from app.services import seeding
+from bench_endpoints import TIERS, build_dataset
+
+TEXT_LAYOUT = """
+CREATE TABLE transactions_text (
+    id INTEGER PRIMARY KEY, user_id INTEGER, account_id INTEGER, date DATE NOT NULL,
+    amount NUMERIC(12, 2) NOT NULL, category VARCHAR(64), description VARCHAR(512)
+);
+INSERT INTO transactions_text
+    SELECT t.id, t.user_id, t.account_id, t.date, t.amount, c.name, m.name FROM transactions t
+    LEFT JOIN categories c ON c.id = t.category_id LEFT JOIN merchants m ON m.id = t.merchant_id ORDER BY t.id;
+CREATE INDEX ix_transactions_text_account_id ON transactions_text (account_id);
+CREATE INDEX ix_transactions_text_user_date ON transactions_text (user_id, date, id);
+CREATE INDEX ix_transactions_text_user_account_date ON transactions_text (user_id, account_id, date, id);
+CREATE TABLE daily_rollups_text (
+    user_id INTEGER, account_id INTEGER, date DATE, category VARCHAR(64),
+    txn_count INTEGER NOT NULL, income_total NUMERIC(14, 2) NOT NULL, income_count INTEGER NOT NULL,
+    income_min NUMERIC(12, 2), income_max NUMERIC(12, 2), expense_total NUMERIC(14, 2) NOT NULL,
+    expense_count INTEGER NOT NULL, expense_min NUMERIC(12, 2), expense_max NUMERIC(12, 2),
+    PRIMARY KEY (user_id, account_id, date, category)
+);
+INSERT INTO daily_rollups_text
+    SELECT r.user_id, r.account_id, r.date, coalesce(c.name, ''), r.txn_count, r.income_total, r.income_count,
+           r.income_min, r.income_max, r.expense_total, r.expense_count, r.expense_min, r.expense_max
+    FROM daily_rollups r LEFT JOIN categories c ON c.id = r.category_id;
+CREATE INDEX ix_daily_rollups_text_user_date ON daily_rollups_text (user_id, date);
+"""
+
+QUERIES = {
+    "text": {
+        "category_spend": "SELECT category, SUM(expense_total) AS total FROM daily_rollups_text "
+                          "WHERE user_id = ? AND date >= ? AND expense_count > 0 GROUP BY category ORDER BY total DESC",
+        "by_category": "SELECT category, COUNT(*), SUM(amount) FROM transactions_text GROUP BY category",
+        "by_merchant": "SELECT description, COUNT(*), SUM(amount) FROM transactions_text GROUP BY description",
+    },
+    "encoded": {
+        "category_spend": "SELECT c.name, s.total FROM (SELECT category_id, SUM(expense_total) AS total "
+                          "FROM daily_rollups WHERE user_id = ? AND date >= ? AND expense_count > 0 "
+                          "GROUP BY category_id) s LEFT JOIN categories c ON c.id = s.category_id ORDER BY s.total DESC",
+        "by_category": "SELECT c.name, s.n, s.total FROM (SELECT category_id, COUNT(*) AS n, SUM(amount) AS total "
+                       "FROM transactions GROUP BY category_id) s LEFT JOIN categories c ON c.id = s.category_id",
+        "by_merchant": "SELECT m.name, s.n, s.total FROM (SELECT merchant_id, COUNT(*) AS n, SUM(amount) AS total "
+                       "FROM transactions GROUP BY merchant_id) s LEFT JOIN merchants m ON m.id = s.merchant_id",
+    },
+}
+TABLES = {"text": ("transactions_text", "daily_rollups_text"), "encoded": ("transactions", "daily_rollups")}
+
+def table_bytes(conn: sqlite3.Connection, table: str) -> dict:
+    names = [table] + [n for (n,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table,))]
+    sizes = dict(conn.execute(
+        f"SELECT name, SUM(pgsize) FROM dbstat WHERE name IN ({','.join('?' * len(names))}) GROUP BY name", names
+    ).fetchall())
+    data = sizes.pop(table, 0)
+    return {"table_bytes": data, "index_bytes": sum(sizes.values())}
+
+def timed(fn, repeat: int) -> float:
+    fn()  # warm the page cache
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return round(statistics.median(samples) * 1000, 3)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Text columns vs lookup keys: size and group-by time")
+    parser.add_argument("--tier", default="100k", choices=TIERS)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (median reported)")
+    parser.add_argument("--out", help="Write the report here as JSON")
+    args = parser.parse_args()
+    db_path, _ = build_dataset(args.tier, 0, 1, False)
+    work_path = db_path[:-3] + ".lookups.db"
+    shutil.copyfile(db_path, work_path)
+    engine = seeding.make_engine(f"sqlite:///{work_path}")
+    init_db(engine)
+    engine.dispose()
+    conn = sqlite3.connect(work_path)
+    results = {}
+    try:
+        conn.executescript(TEXT_LAYOUT)
+        conn.execute("VACUUM")
+        users = [u for (u,) in conn.execute("SELECT id FROM users ORDER BY id")]
+        (last,) = conn.execute("SELECT max(date) FROM daily_rollups").fetchone()
+        start = f"{int(last[:4]) - 1}{last[4:]}"
+        for layout, queries in QUERIES.items():
+            transactions, rollups = TABLES[layout]
+            results[layout] = {
+                "transactions": table_bytes(conn, transactions),
+                "daily_rollups": table_bytes(conn, rollups),
+                "category_spend_all_users_ms": timed(
+                    lambda: [conn.execute(queries["category_spend"], (u, start)).fetchall() for u in users], args.repeat
+                ),
+                "group_by_category_ms": timed(lambda: conn.execute(queries["by_category"]).fetchall(), args.repeat),
+                "group_by_merchant_ms": timed(lambda: conn.execute(queries["by_merchant"]).fetchall(), args.repeat),
+            }
+            r = results[layout]
+            print(f"{layout:8s} transactions {r['transactions']['table_bytes']:>13,} B (+{r['transactions']['index_bytes']:,} idx)  "
+                  f"rollups {r['daily_rollups']['table_bytes']:>13,} B (+{r['daily_rollups']['index_bytes']:,} idx)  "
+                  f"spend x{len(users)} {r['category_spend_all_users_ms']:9.1f} ms  "
+                  f"by category {r['group_by_category_ms']:8.1f} ms  by merchant {r['group_by_merchant_ms']:8.1f} ms",
+                  flush=True)
+    finally:
+        conn.close()
+        os.remove(work_path)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"tier": args.tier, "args": vars(args), "results": results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
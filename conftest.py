@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.db.base import Base
+from app.db.session import database_factory
+from app.db.init_db import init_db  # noqa: F401  (registers every model on Base.metadata)
+from app.analytics.columns import column_cache
+from app.core.conditional import response_cache
+from app.core.principals import principal_cache
+from app.core.security import create_access_token
+from app.deps import get_db
+from app.main import app
+from app.models.user import User
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file rather than :memory: so concurrent sessions and the aiosqlite engine see the same data
+    eng = create_engine(
+        f"sqlite:///{tmp_path / 'pluto-test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=eng)
+    yield eng
+    eng.dispose()
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autocommit=False, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def user(db):
+    u = User(email="fixture@example.com", hashed_password="x", full_name="Fixture User")
+    db.add(u); db.commit(); db.refresh(u)
+    return u
+
+@pytest.fixture(params=["sync", "async"])
+def app_engine(request, engine):
+    """Engine behind the client's routes: the sync test engine, or aiosqlite on the same file."""
+    if request.param == "sync":
+        yield engine
+        return
+    # NullPool: TestClient runs each request on a fresh event loop
+    eng = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool)
+    yield eng
+    eng.sync_engine.dispose()
+
+@pytest.fixture
+def client(app_engine, user):
+    open_database = database_factory(app_engine)
+
+    async def _get_db():
+        db = open_database()
+        try:
+            yield db
+        finally:
+            await db.close()
+
+    # Every test database reuses user id 1 (and data version 0), and tokens minted in the same second are identical
+    principal_cache.clear()
+    response_cache.clear()
+    column_cache.clear()
+    app.dependency_overrides[get_db] = _get_db
+    c = TestClient(app)
+    c.headers["Authorization"] = f"Bearer {create_access_token(str(user.id))}"
+    try:
+        yield c
+    finally:
+        app.dependency_overrides.clear()
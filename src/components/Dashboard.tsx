@@ -21,20 +21,38 @@ function useGeminiInsights() {
   const [error, setError] = useState(null);
 
   useEffect(() => {
-    fetch("/insights/gemini-insights")
-      .then((res) => res.json())
-      .then((data) => {
+    const token = localStorage.getItem('access_token');
+    const headers = { 'Authorization': `Bearer ${token}` };
+    let cancelled = false;
+
+    // Insights are generated in the background: a 202 carries the job to poll
+    const load = async () => {
+      try {
+        let res = await fetch("/insights/gemini-insights", { headers });
+        while (res.status === 202 && !cancelled) {
+          const { job } = await res.json();
+          let status = job.status;
+          while ((status === "queued" || status === "running") && !cancelled) {
+            await new Promise((resolve) => setTimeout(resolve, 2000));
+            status = (await (await fetch(job.status_url, { headers })).json()).status;
+          }
+          if (status === "failed") throw new Error("Insight generation failed");
+          res = await fetch("/insights/gemini-insights", { headers });
+        }
+        const data = await res.json();
+        if (cancelled) return;
         if (data.insights) {
           setInsights(data.insights);
         } else {
           setError("No insights found");
         }
-        setLoading(false);
-      })
-      .catch((err) => {
-        setError("Failed to fetch insights");
-        setLoading(false);
-      });
+      } catch (err) {
+        if (!cancelled) setError("Failed to fetch insights");
+      }
+      if (!cancelled) setLoading(false);
+    };
+    load();
+    return () => { cancelled = true; };
   }, []);
 
   return { insights, loading, error };
@@ -0,0 +1,75 @@
+import random
+import statistics
+from decimal import Decimal
+import pytest
+from app.analytics import kernel
+from app.analytics.kernel import column, summarize
+
+@pytest.fixture
+def amounts():
+    rng = random.Random(3)
+    return [Decimal(rng.randint(-20000, 20000)) / 100 for _ in range(501)] + [None, "nan"]
+
+def _expected(values):
+    return dict(
+        mean=round(statistics.mean(values), 2),
+        median=round(statistics.median(values), 2),
+        standard_deviation=round(statistics.stdev(values), 2),
+        variance=round(statistics.variance(values), 2),
+        min_value=round(min(values), 2),
+        max_value=round(max(values), 2),
+    )
+
+@pytest.mark.parametrize("basis", ["amount", "expense"])
+def test_stream_and_column_paths_agree_with_statistics(amounts, basis):
+    valid = [float(a) for a in amounts[:-2]]
+    values = valid if basis == "amount" else [-a for a in valid if a < 0]
+    expected = _expected(values)
+
+    for result in (kernel._summarize_stream(iter(amounts), basis),
+                   summarize(column(a for a in amounts[:-2]), basis=basis)):
+        for field, value in expected.items():
+            assert getattr(result, field) == pytest.approx(value, abs=0.011), field
+        assert result.total_transactions == len(valid)
+        assert result.income_total == pytest.approx(sum(a for a in valid if a > 0), abs=0.01)
+        assert result.expense_total == pytest.approx(-sum(a for a in valid if a < 0), abs=0.01)
+
+def test_empty_and_income_only():
+    assert summarize([]).total_transactions == 0
+    only_income = summarize([Decimal("10.00"), Decimal("5.00")], basis="expense")
+    assert (only_income.mean, only_income.total_transactions) == (0, 0)
+    assert only_income.income_total == only_income.net_flow == 15.0
+
+def test_sql_pushdown_matches_kernel(db, user):
+    from datetime import date, timedelta
+    from app.analytics.sql import summarize_transactions
+    from app.models.transaction import Transaction
+    from app.services.fake_plaid import link_fake_account
+
+    account = link_fake_account(db, user.id, username="pushdown", account_type="checking")
+    end, start = date.today(), date.today() - timedelta(days=365)
+    amounts = [a for (a,) in db.query(Transaction.amount).filter(
+        Transaction.account_id == account.id, Transaction.date >= start, Transaction.date <= end
+    )]
+
+    pushed = summarize_transactions(db, user.id, start, end)
+    assert pushed == summarize(column(amounts))
+    assert summarize_transactions(db, user.id, start, end, account_id=account.id + 1).total_transactions == 0
+
+def test_sql_variance_is_stable_for_large_amounts(db, user):
+    from datetime import date
+    from app.analytics.sql import summarize_transactions
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    # A large mean with a small spread: the sum of squares cancels to noise
+    account = Account(user_id=user.id, name="Treasury", balance=0)
+    db.add(account); db.commit()
+    rng = random.Random(7)
+    amounts = [Decimal("9999990000.00") + Decimal(rng.randint(0, 999)) / 100 for _ in range(200)]
+    db.add_all(Transaction(user_id=user.id, account_id=account.id, date=date(2024, 1, 1), amount=a) for a in amounts)
+    db.commit()
+
+    result = summarize_transactions(db, user.id, date(2024, 1, 1), date(2024, 1, 1))
+    assert result.variance == pytest.approx(round(float(statistics.variance(amounts)), 2), abs=0.011)
+    assert result.standard_deviation == pytest.approx(round(float(statistics.stdev(amounts)), 2), abs=0.011)
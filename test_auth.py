@@ -0,0 +1,52 @@
+import asyncio
+from passlib.context import CryptContext
+from app.core import security
+from app.core.security import HashingBusy, PasswordHasher
+from app.models.user import User
+from app.routers import auth
+
+def test_login_rehashes_when_cost_changes(client, db, monkeypatch):
+    monkeypatch.setattr(auth, "hasher", PasswordHasher(workers=0, queue_limit=0, retry_after=1))
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    assert client.post("/auth/signup", json={"email": "cost@example.com", "password": "pw"}).status_code == 201
+    stored = db.query(User.hashed_password).filter(User.email == "cost@example.com").scalar()
+    assert stored.startswith("$2b$04$")
+
+    monkeypatch.setattr(security, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5))
+    assert client.post("/auth/login", json={"email": "cost@example.com", "password": "wrong"}).status_code == 401
+    assert client.post("/auth/login", json={"email": "cost@example.com", "password": "pw"}).status_code == 200
+    db.expire_all()
+    upgraded = db.query(User.hashed_password).filter(User.email == "cost@example.com").scalar()
+    assert upgraded.startswith("$2b$05$")
+    assert client.post("/auth/login", json={"email": "cost@example.com", "password": "pw"}).status_code == 200
+
+def test_full_queue_answers_503(client, user, monkeypatch):
+    full = PasswordHasher(workers=1, queue_limit=2, retry_after=3)
+    full.pending = 3
+    monkeypatch.setattr(auth, "hasher", full)
+    r = client.post("/auth/login", json={"email": user.email, "password": "x"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "3"
+    assert full.rejected == 1
+
+def test_process_pool_hashes_and_bounds_admission():
+    async def main():
+        pool = PasswordHasher(workers=1, queue_limit=0, retry_after=1)
+        try:
+            hashed = await pool.hash("secret")
+            first = asyncio.ensure_future(pool.verify("secret", hashed))
+            await asyncio.sleep(0)
+            try:
+                await pool.verify("secret", hashed)
+                rejected = False
+            except HashingBusy:
+                rejected = True
+            return hashed, await first, rejected, pool.stats()
+        finally:
+            pool.shutdown()
+
+    hashed, (ok, new_hash), rejected, stats = asyncio.run(main())
+    assert security.verify_password("secret", hashed)
+    assert ok and new_hash is None
+    assert rejected
+    assert stats["pending"] == 0 and stats["rejected"] == 1
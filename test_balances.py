@@ -0,0 +1,91 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.db.migrations import migrate
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import balances
+from app.services.fake_plaid import link_fake_account
+
+def _sum(db, account_id):
+    return db.scalar(select(func.coalesce(func.sum(Transaction.amount), 0)).where(Transaction.account_id == account_id))
+
+def _stored(db, account_id):
+    db.expire_all()
+    return db.get(Account, account_id).balance
+
+def test_writes_keep_the_balance_current(client, db, user):
+    account = link_fake_account(db, user.id, username="bal_checking", account_type="checking")
+    start = _stored(db, account.id)
+    assert start == _sum(db, account.id)
+
+    created = client.post("/transactions", json={
+        "account_id": account.id, "date": "2024-05-01", "amount": "-12.34", "description": "Lunch",
+    }).json()
+    assert _stored(db, account.id) == start - Decimal("12.34")
+
+    body = b'{"account_id": %d, "date": "2024-05-02", "amount": "100.00"}\n' % account.id
+    assert client.post("/transactions/bulk", content=body).json()["inserted"] == 1
+    assert _stored(db, account.id) == start - Decimal("12.34") + Decimal("100.00")
+
+    assert client.delete(f"/transactions/{created['id']}").status_code == 200
+    assert client.delete(f"/transactions/{created['id']}").status_code == 404
+    assert _stored(db, account.id) == start + Decimal("100.00") == _sum(db, account.id)
+
+    listed = {a["id"]: a for a in client.get("/accounts").json()}
+    assert Decimal(listed[account.id]["balance"]) == _stored(db, account.id)
+
+def test_drift_is_detected_and_repaired(client, db, user):
+    account = link_fake_account(db, user.id, username="drift_checking", account_type="checking")
+    other = link_fake_account(db, user.id, username="drift_savings", account_type="savings")
+    db.execute(Account.__table__.update().where(Account.id == account.id).values(balance=Decimal("1.23")))
+    db.commit()
+
+    report = balances.reconcile(db, repair=False, batch_size=1)
+    assert (report["checked"], report["drifted"], report["repaired"]) == (2, 1, 0)
+    assert report["drift"][0]["account_id"] == account.id and report["drift"][0]["stored"] == "1.23"
+
+    report = balances.reconcile(db, batch_size=1)
+    balances.reconcile_stats.record(report)
+    assert report["repaired"] == 1
+    assert _stored(db, account.id) == _sum(db, account.id)
+    assert _stored(db, other.id) == _sum(db, other.id)
+    assert balances.reconcile(db)["drifted"] == 0
+    assert client.get("/debug/caches").json()["account_balances"]["repaired"] >= 1
+
+def test_repair_skips_an_account_written_since_the_check(db, user, monkeypatch):
+    account = link_fake_account(db, user.id, username="race_checking", account_type="checking")
+    db.execute(Account.__table__.update().where(Account.id == account.id).values(balance=Decimal("5.00")))
+    db.commit()
+    check = balances.check
+
+    def racing_check(*args, **kwargs):
+        rows = check(*args, **kwargs)
+        if rows:
+            # Another writer adjusts the balance between the check and the repair
+            balances.adjust(db, {account.id: Decimal("1.00")})
+        return rows
+
+    monkeypatch.setattr(balances, "check", racing_check)
+    report = balances.reconcile(db)
+    assert report["drifted"] == 1 and report["repaired"] == 0
+    assert _stored(db, account.id) == Decimal("6.00")
+
+def test_migration_reconciles_old_balances(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=eng)
+    with Session(eng) as db:
+        db.add(User(id=1, email="old@example.com", hashed_password="x"))
+        db.add(Account(id=1, user_id=1, name="Old", balance=0))
+        db.add_all([
+            Transaction(user_id=1, account_id=1, date=date(2024, 1, 1), amount=Decimal("10.50")),
+            Transaction(user_id=1, account_id=1, date=date(2024, 1, 2), amount=Decimal("-2.25")),
+        ])
+        db.commit()
+    migrate(eng)
+    with Session(eng) as db:
+        assert db.get(Account, 1).balance == Decimal("8.25")
+    eng.dispose()
@@ -0,0 +1,70 @@
+from datetime import date
+from app.analytics.columns import ColumnCache, TransactionColumns, column_cache
+from app.core.conditional import response_cache
+from app.services.fake_plaid import link_fake_account
+
+ENDPOINTS = (
+    "/insights/spending", "/insights/trend-analysis", "/insights/financial-summary",
+    "/insights/dashboard", "/insights/mathematical-summary?days=365",
+)
+
+def _seed(db, user):
+    return [
+        link_fake_account(db, user.id, username=f"columns_{kind}", account_type=kind)
+        for kind in ("checking", "savings")
+    ]
+
+def test_cached_columns_match_the_sql_path(client, db, user, monkeypatch):
+    checking, _ = _seed(db, user)
+    endpoints = ENDPOINTS + (f"/insights/mathematical-summary?days=365&account_id={checking.id}",)
+    cached = {path: client.get(path).json() for path in endpoints}
+    assert column_cache.stats()["users"] == 1
+
+    response_cache.clear()
+    monkeypatch.setattr(column_cache, "max_bytes", 0)
+    for path in endpoints:
+        assert client.get(path).json() == cached[path], path
+
+def test_writes_invalidate_the_cached_columns(client, db, user):
+    checking, savings = _seed(db, user)
+    start = column_cache.stats()
+    client.get("/insights/spending")
+    client.get("/insights/trend-analysis")
+    stats = column_cache.stats()
+    assert (stats["misses"] - start["misses"], stats["hits"] - start["hits"]) == (1, 1)
+    assert stats["bytes"] > 0 and stats["hit_ratio"] is not None
+
+    before = client.get("/insights/mathematical-summary").json()["total_transactions"]
+    client.post("/transactions", json={
+        "account_id": checking.id, "date": date.today().isoformat(), "amount": "-7.25", "description": "Cache test",
+    })
+    assert client.get("/insights/mathematical-summary").json()["total_transactions"] == before + 1
+    assert column_cache.stats()["invalidations"] == start["invalidations"] + 1
+
+    link_fake_account(db, user.id, username="columns_trading", account_type="trading")
+    client.get("/insights/spending")
+    assert client.delete(f"/accounts/{savings.id}").status_code == 200
+    client.get("/insights/spending")
+    assert column_cache.stats()["invalidations"] == start["invalidations"] + 3
+
+    reported = client.get("/debug/caches").json()["transaction_columns"]
+    assert reported["bytes"] == column_cache.nbytes and reported["hits"] == column_cache.hits
+
+def test_least_recently_used_users_are_evicted_by_size(db, user):
+    link_fake_account(db, user.id, username="columns_lru", account_type="checking")
+    cols = TransactionColumns.load(db, user.id)
+    assert cols.nbytes > 0 and cols.categories.typecode == "h"
+
+    cache = ColumnCache(max_bytes=cols.nbytes * 2)
+    cache.put(1, 0, cols)
+    cache.put(2, 0, cols)
+    assert cache.get(1, 0) is cols  # 2 is now the least recently used
+    cache.put(3, 0, cols)
+    assert cache.get(2, 0) is None and cache.get(1, 0) is cols and cache.get(3, 0) is cols
+    assert cache.stats()["evictions"] == 1 and cache.nbytes == cols.nbytes * 2
+
+    # A newer version drops the entry; columns larger than the whole budget are not kept
+    assert cache.get(1, 1) is None and cache.stats()["invalidations"] == 1
+    small = ColumnCache(max_bytes=cols.nbytes - 1)
+    small.put(1, 0, cols)
+    assert small.stats()["users"] == 0
@@ -0,0 +1,79 @@
+from sqlalchemy import event
+from app.services import ledger
+from app.services.fake_plaid import link_fake_account
+
+def _statements(app_engine, client, path, **kwargs):
+    engine = getattr(app_engine, "sync_engine", app_engine)
+    seen = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get(path, **kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return response, [s for s in seen if "FROM users" not in s]
+
+def _stats(client):
+    return client.get("/debug/caches").json()["responses"]
+
+def test_matching_etag_returns_304_after_one_lookup(client, db, user, app_engine):
+    link_fake_account(db, user.id, username="etag_checking", account_type="checking")
+    first = client.get("/insights/spending", params={"days": 90})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and first.headers["cache-control"] == "private, no-cache"
+
+    response, seen = _statements(app_engine, client, "/insights/spending",
+                                 params={"days": 90}, headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == etag
+    assert len(seen) == 1 and "data_versions" in seen[0]
+
+    # The ETag covers the query string
+    other = client.get("/insights/spending", params={"days": 30}, headers={"If-None-Match": etag})
+    assert other.status_code == 200 and other.headers["etag"] != etag
+
+def test_repeat_reads_come_from_the_response_cache(client, db, user, app_engine):
+    link_fake_account(db, user.id, username="cached_checking", account_type="checking")
+    first = client.get("/insights/financial-summary")
+    hits = _stats(client)["hits"]
+
+    second, seen = _statements(app_engine, client, "/insights/financial-summary")
+    assert second.json() == first.json()
+    assert len(seen) == 1
+    assert _stats(client)["hits"] == hits + 1
+
+def test_writes_change_the_etag(client, db, user):
+    def etag(path="/accounts"):
+        return client.get(path).headers["etag"]
+
+    tags = [etag()]
+    account = client.post("/accounts", json={"name": "Everyday"}).json()
+    tags.append(etag())
+    assert [a["id"] for a in client.get("/accounts").json()] == [account["id"]]
+
+    client.post("/transactions", json={
+        "account_id": account["id"], "date": "2024-01-05", "amount": "-12.50", "description": "Lunch",
+    })
+    tags.append(etag())
+    assert len(client.get("/transactions").json()) == 1
+
+    link_fake_account(db, user.id, username="etag_savings", account_type="savings")
+    tags.append(etag())
+    client.delete(f"/accounts/{account['id']}")
+    tags.append(etag())
+    assert len(set(tags)) == len(tags)
+    assert ledger.current(db, user.id) == 4
+
+def test_bump_upserts_per_user(db, user):
+    assert ledger.current(db, user.id) == 0
+    ledger.bump(db, user.id)
+    ledger.bump(db, user.id)
+    db.commit()
+    assert ledger.current(db, user.id) == 2
+    ledger.bump_all(db)
+    db.commit()
+    assert ledger.current(db, user.id) == 3
@@ -0,0 +1,30 @@
+import asyncio
+import time
+from sqlalchemy import text
+from app.db.session import database_factory, is_async_url, sync_url
+
+def test_driver_selection_by_url_scheme():
+    assert is_async_url("sqlite+aiosqlite:///./pluto.db")
+    assert is_async_url("postgresql+asyncpg://u:p@db/pluto")
+    assert not is_async_url("sqlite:///./pluto.db")
+    assert sync_url("sqlite+aiosqlite:///./pluto.db") == "sqlite:///./pluto.db"
+    assert sync_url("postgresql+asyncpg://u:p@db/pluto") == "postgresql+psycopg2://u:p@db/pluto"
+    assert sync_url("sqlite:///./pluto.db") == "sqlite:///./pluto.db"
+
+def _slow_query(db, value):
+    time.sleep(0.2)
+    return db.execute(text("SELECT :v"), {"v": value}).scalar()
+
+def test_gather_runs_calls_concurrently_in_order(engine):
+    async def main():
+        db = database_factory(engine)()
+        try:
+            t0 = time.perf_counter()
+            results = await db.gather((_slow_query, 1), (_slow_query, 2), (_slow_query, 3))
+            return results, time.perf_counter() - t0
+        finally:
+            await db.close()
+
+    results, elapsed = asyncio.run(main())
+    assert results == [1, 2, 3]
+    assert elapsed < 0.5
@@ -0,0 +1,51 @@
+import csv
+import io
+import json
+import zlib
+from app.services import export
+from app.services.fake_plaid import link_fake_account
+from app.models.transaction import Transaction
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+def test_ndjson_export_matches_listing(client, db, user):
+    checking = link_fake_account(db, user.id, username="export_checking", account_type="checking")
+    link_fake_account(db, user.id, username="export_savings", account_type="savings")
+    listed = client.get("/transactions", params={"account_id": checking.id, "limit": 10000}).json()
+
+    response = client.get("/transactions/export", params={"account_id": checking.id}, headers=IDENTITY)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == sorted(listed, key=lambda r: (r["date"], r["id"]))
+
+def test_csv_export_applies_filters(client, db, user):
+    link_fake_account(db, user.id, username="csv_checking", account_type="checking")
+    category = db.query(Transaction.category).first()[0]
+    expected = db.query(Transaction).filter(Transaction.category == category).count()
+
+    response = client.get("/transactions/export", params={"format": "csv", "category": category}, headers=IDENTITY)
+    assert response.headers["content-disposition"] == 'attachment; filename="transactions.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == expected and {r["category"] for r in rows} == {category}
+    assert list(rows[0]) == list(export.FIELDS)
+
+def test_gzip_is_negotiated(client, db, user):
+    link_fake_account(db, user.id, username="gzip_checking", account_type="checking")
+    plain = client.get("/transactions/export", headers=IDENTITY).content
+
+    with client.stream("GET", "/transactions/export", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert zlib.decompress(raw, 31) == plain and len(raw) < len(plain)
+
+    refused = client.get("/transactions/export", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+
+def test_export_reads_in_batches(db, user):
+    link_fake_account(db, user.id, username="batch_checking", account_type="checking")
+    total = db.query(Transaction).count()
+    chunks = list(export.transaction_chunks(db, [Transaction.user_id == user.id], "ndjson", 7))
+    assert len(chunks) == -(-total // 7)
+    assert sum(chunk.count(b"\n") for chunk in chunks) == total
@@ -0,0 +1,55 @@
+import random
+from datetime import date
+from decimal import Decimal
+from app.ai import features
+from app.ai.insights import build_prompt
+from app.models.account import Account
+from app.services import fake_plaid
+
+TODAY = date(2026, 6, 20)
+
+def _history(db, user, months):
+    account = Account(user_id=user.id, name="Checking", type="checking", mask="0001")
+    db.add(account); db.flush()
+    rows = fake_plaid.generate_transaction_rows(user.id, account.id, "checking", today=TODAY,
+                                                months=months, rng=random.Random(7))
+    fake_plaid.insert_transactions(db, rows)
+    db.commit()
+    return account
+
+def test_summary_sections(db, user):
+    account = _history(db, user, months=12)
+    fake_plaid.insert_transactions(db, [fake_plaid._row(
+        user.id, account.id, date(2026, 5, 9), Decimal("-4800.00"), "shopping", "Jewelry Store #0042"
+    )])
+    db.commit()
+
+    summary = features.extract(db, user.id, today=TODAY, months=6)
+    assert summary["window"] == {"from": "2026-01-01", "to": "2026-06-20", "months": 6}
+    assert [m["month"] for m in summary["months"]] == [f"2026-0{i}" for i in range(1, 7)]
+    assert summary["months"][0]["top_categories"]["rent"] == 1100.0
+
+    recurring = {r["merchant"]: r for r in summary["recurring"]}
+    assert recurring["Monthly rent to My Landlord LLC"]["typical_amount"] == 1100.0
+    assert "Netflix subscription" in recurring
+    salary = summary["income_sources"][0]
+    assert salary["source"] == "Monthly salary from Employer Inc" and salary["cadence"] == "monthly"
+    assert [o["merchant"] for o in summary["outliers"]] == ["Jewelry Store #0042"]
+
+def test_prompt_size_is_bounded_by_budget_not_history(db, user):
+    _history(db, user, months=36)
+    budget = 400
+    summary = features.summary_for_prompt(db, user.id, budget, today=TODAY)
+    assert features.estimate_tokens(features.dumps(summary)) <= budget
+    # Trimmed lowest-value sections first, kept the monthly history
+    assert summary["outliers"] == [] and len(summary["months"]) == 6
+
+    untrimmed = features.extract(db, user.id, today=TODAY)
+    assert features.fit_budget(untrimmed, 10**6) == untrimmed
+    assert features.estimate_tokens(build_prompt(untrimmed)) < 2000
+
+def test_months_trimmed_oldest_first():
+    summary = {"months": [{"month": f"2026-0{i}"} for i in range(1, 7)], "outliers": [], "merchants": []}
+    fitted = features.fit_budget(summary, 20)
+    assert fitted["months"] and fitted["months"][-1]["month"] == "2026-06"
+    assert len(summary["months"]) == 6
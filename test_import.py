@@ -0,0 +1,105 @@
+import json
+from decimal import Decimal
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.models.account import Account
+from app.models.daily_rollup import DailyRollup
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services import ledger, rollups
+from app.services.importer import BulkImport
+
+def _account(db, user, name="Import"):
+    account = Account(user_id=user.id, name=name, balance=Decimal("100.00"))
+    db.add(account); db.commit()
+    return account
+
+def _ndjson(rows) -> bytes:
+    return b"".join(json.dumps(r).encode() + b"\n" for r in rows)
+
+def test_ndjson_import_reports_bad_rows(client, db, user):
+    account = _account(db, user)
+    other = User(email="other@example.com", hashed_password="x")
+    db.add(other); db.commit()
+    foreign = _account(db, other, "Theirs")
+    rows = [
+        {"account_id": account.id, "date": "2024-03-01", "amount": "-20.00", "category": "dining"},
+        {"account_id": account.id, "date": "not a date", "amount": "1"},
+        {"account_id": foreign.id, "date": "2024-03-02", "amount": "-5.00"},
+        {"account_id": account.id, "date": "2024-03-03", "amount": 250, "description": "Refund"},
+    ]
+    body = _ndjson(rows[:2]) + b"{broken\n" + _ndjson(rows[2:])
+
+    response = client.post("/transactions/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    result = response.json()
+    assert response.status_code == 200
+    assert result["inserted"] == 2 and result["failed"] == 3
+    assert [e["line"] for e in result["errors"]] == [2, 3, 4]
+    assert result["errors"][0]["error"].startswith("date:")
+    assert result["errors"][2]["error"] == "Account not found"
+
+    db.expire_all()
+    assert db.get(Account, account.id).balance == Decimal("330.00")
+    assert db.get(Account, foreign.id).balance == Decimal("100.00")
+    categories = {t.category for t in db.query(Transaction).filter(Transaction.account_id == account.id)}
+    assert categories == {"dining", "Other"}
+    assert db.query(DailyRollup).filter(DailyRollup.account_id == account.id).count() == 2
+    assert ledger.current(db, user.id) == 1
+
+def test_csv_import_streams_in_batches(db, user):
+    account = _account(db, user)
+    lines = ["account_id,date,amount,category,description"]
+    lines += [f'{account.id},2024-01-{day:02d},-1.50,,"Coffee, ""large""\nsecond line"' for day in range(1, 26)]
+    body = ("\r\n".join(lines) + "\r\n").encode()
+
+    upload = BulkImport(user.id, "csv", batch_rows=4, max_errors=10)
+    batches = []
+    flush = upload.flush
+    upload.flush = lambda session: (flush(session), batches.append(upload.inserted))
+    for start in range(0, len(body), 37):
+        upload.feed(body[start:start + 37])
+    assert batches == [] and db.query(Transaction).count() == 0  # only spooled so far
+    result = upload.finish(db)
+    assert result == {"inserted": 25, "failed": 0, "errors": []}
+    assert batches == [3, 7, 11, 15, 19, 23, 25]  # the header is the first batch's first record
+    assert ledger.current(db, user.id) == 1
+    assert db.get(Account, account.id).balance == Decimal("62.50")
+    descriptions = {t.description for t in db.query(Transaction)}
+    assert descriptions == {'Coffee, "large"\nsecond line'}
+
+    def buckets():
+        return sorted((r.date, r.category_id, r.txn_count, r.expense_total) for r in db.query(DailyRollup))
+    imported = buckets()
+    rollups.rebuild(db, user.id)
+    assert len(imported) == 25 and imported == buckets()
+
+def test_import_without_valid_rows_commits_nothing(client, db, user):
+    response = client.post("/transactions/bulk", params={"format": "csv"}, content=b"account_id,date,amount\n1,2024-01-01\n")
+    assert response.json()["errors"] == [{"line": 2, "error": "expected 3 fields, got 2"}]
+    assert ledger.current(db, user.id) == 0
+
+def test_aborted_import_commits_nothing(engine, db, user, monkeypatch):
+    account = _account(db, user)
+    body = _ndjson({"account_id": account.id, "date": f"2024-02-{day:02d}", "amount": "-3.00"} for day in range(1, 21))
+
+    def committed():
+        with sessionmaker(bind=engine)() as other:
+            return (other.query(Transaction).count(), other.get(Account, account.id).balance,
+                    other.query(DailyRollup).count(), ledger.current(other, user.id))
+    before = committed()
+
+    # The client goes away mid-upload: nothing but the spool was touched
+    dropped = BulkImport(user.id, "ndjson", batch_rows=5, max_errors=10)
+    dropped.feed(body[:len(body) // 2])
+    dropped.body.close()
+    assert committed() == before
+
+    # A failure after some batches were inserted rolls all of them back
+    def fail(*args, **kwargs):
+        raise RuntimeError("rollup failed")
+    monkeypatch.setattr("app.services.rollups.rebuild", fail)
+    upload = BulkImport(user.id, "ndjson", batch_rows=5, max_errors=10)
+    upload.feed(body)
+    with pytest.raises(RuntimeError):
+        upload.finish(db)
+    assert upload.inserted == 20 and committed() == before
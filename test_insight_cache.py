@@ -0,0 +1,93 @@
+import json
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from app.ai import insights as ai_insights
+from app.db.base import Base
+from app.db.migrations import migrate
+from app.models.gemini_insight import GeminiInsight
+from app.services import jobs
+from app.services.fake_plaid import link_fake_account
+from app.services.jobs import JobWorker
+
+@pytest.fixture
+def worker(engine):
+    return JobWorker(sessionmaker(bind=engine, autocommit=False, autoflush=False))
+
+@pytest.fixture
+def gemini(monkeypatch):
+    calls = []
+
+    def _ask(summary):
+        calls.append(summary)
+        return {"insights": [{"id": len(calls), "title": f"Insight {len(calls)}"}]}
+
+    monkeypatch.setattr(ai_insights, "ask_gemini_for_insights", _ask)
+    return calls
+
+def _stats(client):
+    return client.get("/debug/caches").json()["gemini_insights"]
+
+def test_unchanged_data_is_served_from_cache(client, db, user, worker, gemini):
+    link_fake_account(db, user.id, username="cache_checking", account_type="checking")
+    assert client.get("/insights/gemini-insights").status_code == 202
+    worker.drain()
+    before = _stats(client)
+
+    for _ in range(3):
+        served = client.get("/insights/gemini-insights")
+        assert served.status_code == 200 and served.json()["refresh"] is None
+    assert len(gemini) == 1
+    after = _stats(client)
+    assert after["hits"] - before["hits"] == 3
+    assert after["llm_calls_avoided"] - before["llm_calls_avoided"] == 3
+
+def test_new_transactions_change_the_fingerprint(client, db, user, worker, gemini):
+    account = link_fake_account(db, user.id, username="cache_fp", account_type="checking")
+    client.get("/insights/gemini-insights")
+    worker.drain()
+    first = db.query(GeminiInsight).one().fingerprint
+
+    response = client.post("/transactions", json={
+        "account_id": account.id, "date": str(db.query(GeminiInsight).one().created_at.date()),
+        "amount": "-19.99", "category": "dining",
+    })
+    assert response.status_code in (200, 201)
+    stale = client.get("/insights/gemini-insights").json()
+    assert stale["insights"][0]["title"] == "Insight 1"
+    assert stale["refresh"]["status"] == "queued"
+    worker.drain()
+    fresh = client.get("/insights/gemini-insights").json()
+    assert fresh["insights"][0]["title"] == "Insight 2" and fresh["refresh"] is None
+    assert db.query(GeminiInsight).order_by(GeminiInsight.id.desc()).first().fingerprint != first
+
+def test_job_skips_the_model_when_data_is_already_cached(db, user, worker, gemini):
+    jobs.submit(db, ai_insights.REFRESH_JOB, user.id)
+    worker.drain()
+    jobs.submit(db, ai_insights.REFRESH_JOB, user.id)
+    worker.drain()
+    assert len(gemini) == 1
+    assert db.query(GeminiInsight).count() == 1
+
+def test_only_newest_rows_are_kept(db, user):
+    for i in range(6):
+        db.add(GeminiInsight(user_id=user.id, insights_json=json.dumps({"n": i}), fingerprint=str(i)))
+    db.commit()
+    assert ai_insights.prune_insights(db, user.id, keep=3) == 3
+    db.commit()
+    assert [r.fingerprint for r in db.query(GeminiInsight).order_by(GeminiInsight.id)] == ["3", "4", "5"]
+
+def test_migration_adds_fingerprint_column(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=eng)
+    with eng.begin() as conn:
+        conn.execute(text("DROP TABLE gemini_insights"))
+        conn.execute(text(
+            "CREATE TABLE gemini_insights (id INTEGER PRIMARY KEY, user_id INTEGER, "
+            "created_at DATETIME, insights_json TEXT NOT NULL)"
+        ))
+    migrate(eng)
+    columns = {c["name"] for c in inspect(eng).get_columns("gemini_insights")}
+    assert "fingerprint" in columns
+    assert "ix_gemini_insights_user_fingerprint" in {i["name"] for i in inspect(eng).get_indexes("gemini_insights")}
+    eng.dispose()
@@ -0,0 +1,20 @@
+from app.services.fake_plaid import link_fake_account
+
+def _seed(db, user):
+    for kind in ("checking", "savings", "trading"):
+        link_fake_account(db, user.id, username=f"insights_{kind}", account_type=kind)
+
+def test_dashboard_matches_individual_endpoints(client, db, user):
+    _seed(db, user)
+    dashboard = client.get("/insights/dashboard").json()
+
+    assert dashboard["spending"] == client.get("/insights/spending").json()
+    assert dashboard["summary"] == client.get("/insights/financial-summary").json()
+    assert dashboard["trend"] == client.get("/insights/trend-analysis").json()
+    assert dashboard["score"] == client.get("/insights/pluto-score").json()
+
+def test_dashboard_field_selection(client, db, user):
+    _seed(db, user)
+    partial = client.get("/insights/dashboard", params={"fields": "score,trend"}).json()
+    assert set(partial) == {"score", "trend"}
+    assert client.get("/insights/dashboard", params={"fields": "nope"}).status_code == 400
@@ -0,0 +1,111 @@
+import datetime
+import json
+import threading
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.ai import insights as ai_insights
+from app.models.gemini_insight import GeminiInsight
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import JobWorker
+
+GOOD = {"insights": [{"id": 1, "type": "goals", "title": "Save more", "description": "d"}]}
+
+@pytest.fixture
+def worker(engine):
+    return JobWorker(sessionmaker(bind=engine, autocommit=False, autoflush=False), poll_interval=0.05)
+
+@pytest.fixture
+def gemini(monkeypatch):
+    calls = []
+
+    def _ask(transactions):
+        calls.append(transactions)
+        return GOOD
+
+    monkeypatch.setattr(ai_insights, "ask_gemini_for_insights", _ask)
+    return calls
+
+def test_concurrent_requests_share_one_job(client, worker, gemini):
+    first = client.get("/insights/gemini-insights")
+    second = client.get("/insights/gemini-insights")
+    assert first.status_code == second.status_code == 202
+    job = first.json()["job"]
+    assert second.json()["job"]["id"] == job["id"]
+    assert first.headers["location"] == job["status_url"] == f"/jobs/{job['id']}"
+    assert client.post("/insights/gemini-insights/refresh").json()["job"]["id"] == job["id"]
+
+    assert worker.drain() == 1
+    assert len(gemini) == 1
+    assert client.get(job["status_url"]).json()["status"] == "succeeded"
+    served = client.get("/insights/gemini-insights")
+    assert served.status_code == 200
+    assert served.json()["insights"] == GOOD["insights"]
+    assert served.json()["refresh"] is None
+
+def test_stale_insight_is_served_while_refresh_fails(client, db, user, worker, monkeypatch):
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=45)
+    db.add(GeminiInsight(user_id=user.id, created_at=old, insights_json=json.dumps(GOOD)))
+    db.commit()
+    monkeypatch.setattr(ai_insights, "ask_gemini_for_insights",
+                        lambda txns: ai_insights._create_fallback_insight("Gemini did not return any content."))
+
+    served = client.get("/insights/gemini-insights")
+    assert served.status_code == 200
+    assert served.json()["insights"] == GOOD["insights"]
+    job = served.json()["refresh"]
+    assert job["status"] == "queued"
+
+    worker.drain()
+    failed = client.get(job["status_url"]).json()
+    assert failed["status"] == "failed"
+    assert failed["error"] == "Gemini did not return any content."
+    # The last good insight stays; the next request queues a new attempt
+    again = client.get("/insights/gemini-insights").json()
+    assert again["insights"] == GOOD["insights"]
+    assert again["refresh"]["id"] != job["id"]
+
+def test_jobs_are_private(client, db, user):
+    other = Job(kind=ai_insights.REFRESH_JOB, user_id=user.id + 1, status="queued")
+    db.add(other); db.commit()
+    assert client.get(f"/jobs/{other.id}").status_code == 404
+
+def test_racing_submits_collapse(db, engine, user, gemini):
+    Session = sessionmaker(bind=engine)
+    barrier = threading.Barrier(4)
+    ids = []
+
+    def _submit():
+        with Session() as s:
+            barrier.wait()
+            ids.append(jobs.submit(s, ai_insights.REFRESH_JOB, user.id).id)
+
+    threads = [threading.Thread(target=_submit) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(set(ids)) == 1
+    assert db.query(Job).count() == 1
+
+def test_stale_running_job_is_reclaimed(db, user, worker, gemini):
+    started = datetime.datetime.utcnow() - datetime.timedelta(hours=1)
+    job = Job(kind=ai_insights.REFRESH_JOB, user_id=user.id, status="running", started_at=started)
+    db.add(job); db.commit()
+    worker.stale_after = 3600 * 2
+    assert worker.drain() == 0
+    worker.stale_after = 60
+    assert worker.drain() == 1
+    db.refresh(job)
+    assert job.status == "succeeded"
+
+def test_worker_thread_picks_up_submitted_jobs(db, user, worker, gemini):
+    worker.start()
+    try:
+        job = jobs.submit(db, ai_insights.REFRESH_JOB, user.id)
+        for _ in range(100):
+            db.refresh(job)
+            if job.status == "succeeded":
+                break
+            threading.Event().wait(0.05)
+        assert job.status == "succeeded"
+    finally:
+        worker.stop()
@@ -0,0 +1,100 @@
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.ai import insights as ai_insights
+from app.ai.providers import (
+    CircuitBreaker, HTTPStubProvider, LLMError, LLMProvider, LLMUnavailable, ResilientLLM,
+    STUB_RESPONSE, StubBehavior, StubProvider,
+)
+from app.ai.stub_server import create_app
+
+class Scripted(LLMProvider):
+    """Plays back (seconds, error) steps, one per call; ignores the timeout like a hung socket."""
+    name = "scripted"
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate(self, prompt, timeout):
+        delay, error = self.steps[min(self.calls, len(self.steps) - 1)]
+        self.calls += 1
+        self.release.wait(delay)
+        if error:
+            raise LLMError(error)
+        return "ok"
+
+@pytest.fixture
+def scripted():
+    providers = []
+
+    def make(*steps):
+        providers.append(Scripted(*steps))
+        return providers[-1]
+
+    yield make
+    for p in providers:
+        p.release.set()
+
+def test_hung_provider_is_cut_off_at_the_deadline(scripted):
+    llm = ResilientLLM(scripted((30, None)), timeout=0.1, deadline=0.25, retries=5, backoff=0.01)
+    t0 = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        llm.complete("prompt")
+    assert time.monotonic() - t0 < 0.5
+    assert llm.stats()["failed"] == 1
+
+def test_retries_with_backoff(scripted):
+    provider = scripted((0, "boom"), (0, None))
+    llm = ResilientLLM(provider, timeout=1, deadline=2, retries=2, backoff=0.01)
+    assert llm.complete("prompt") == "ok"
+    assert provider.calls == 2 and llm.stats()["retries"] == 1
+
+def test_hedged_request_wins_over_slow_primary(scripted):
+    provider = scripted((30, None), (0, None))
+    llm = ResilientLLM(provider, timeout=2, deadline=2, hedge_after=0.05)
+    t0 = time.monotonic()
+    assert llm.complete("prompt") == "ok"
+    assert time.monotonic() - t0 < 0.5
+    assert llm.stats()["hedge_wins"] == 1
+
+def test_circuit_opens_and_recovers(scripted):
+    now = [0.0]
+    breaker = CircuitBreaker(failures=2, reset_after=30, clock=lambda: now[0])
+    provider = scripted((0, "down"), (0, "down"), (0, None))
+    llm = ResilientLLM(provider, timeout=1, deadline=1, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable):
+            llm.complete("prompt")
+    assert breaker.state == "open"
+    with pytest.raises(LLMUnavailable, match="circuit is open"):
+        llm.complete("prompt")
+    assert provider.calls == 2
+
+    now[0] = 31
+    assert breaker.state == "half_open"
+    assert llm.complete("prompt") == "ok"
+    assert breaker.state == "closed" and provider.calls == 3
+
+def test_insights_fall_back_when_llm_is_unavailable():
+    stub = StubProvider(StubBehavior(latency=0, failure_rate=1.0), seed=1)
+    previous = ai_insights.set_llm(ResilientLLM(stub, timeout=1, deadline=1, retries=1, backoff=0))
+    try:
+        result = ai_insights.ask_gemini_for_insights({"totals": {}})
+    finally:
+        ai_insights.set_llm(previous)
+    assert result["insights"][0]["id"] == 0
+    assert stub.calls == 2
+
+def test_stub_server_injects_failures():
+    provider = HTTPStubProvider("http://stub")
+    provider.client = TestClient(create_app(StubBehavior(latency=0, failure_rate=0.5), seed=3))
+    outcomes = []
+    for _ in range(20):
+        try:
+            outcomes.append(provider.generate("prompt", timeout=1) == STUB_RESPONSE)
+        except LLMError:
+            outcomes.append(False)
+    assert 0 < sum(outcomes) < 20
@@ -0,0 +1,79 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.db.migrations import migrate
+from app.models.category import Category
+from app.models.daily_rollup import DailyRollup
+from app.models.merchant import Merchant
+from app.models.transaction import Transaction
+from app.services import lookups
+from app.services.fake_plaid import link_fake_account
+
+def test_names_are_stored_once(client, db, user):
+    account = link_fake_account(db, user.id, username="lookup_checking", account_type="checking")
+    categories, merchants = db.query(Category).count(), db.query(Merchant).count()
+    assert categories < 20 and merchants < db.query(Transaction).count()
+
+    for _ in range(3):
+        r = client.post("/transactions", json={
+            "account_id": account.id, "date": "2024-05-01", "amount": "-4.50",
+            "category": "coffee", "description": "Corner Cafe",
+        })
+        assert r.status_code == 201 and r.json()["category"] == "coffee"
+    assert db.query(Category).count() == categories + 1
+    assert db.query(Merchant).count() == merchants + 1
+    coffee = db.query(Category).filter(Category.name == "coffee").one()
+    assert coffee.pfc_primary == lookups.DEFAULT_PFC
+
+    listed = client.get("/transactions", params={"category": "coffee"}).json()
+    assert len(listed) == 3 and {t["description"] for t in listed} == {"Corner Cafe"}
+    assert db.query(Transaction).filter(Transaction.category == "coffee").count() == 3
+
+def test_plaid_category_comes_from_the_category_row(client, db, user):
+    account = link_fake_account(db, user.id, username="lookup_pfc", account_type="checking")
+    page = client.get("/fake/plaid/transactions", params={"account_id": account.mask, "limit": 500}).json()
+    names = {t.id: t.category for t in db.query(Transaction).filter(Transaction.account_id == account.id)}
+    for t in page["transactions"]:
+        category = names[int(t["transaction_id"].rsplit("_", 1)[1])]
+        assert t["personal_finance_category"]["primary"] == lookups.pfc_primary(category)
+
+def test_migration_encodes_existing_rows(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=eng)
+    with eng.begin() as conn:
+        conn.execute(text("DROP TABLE daily_rollups"))
+        conn.execute(text("DROP TABLE transactions"))
+        conn.execute(text(
+            "CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id INTEGER, account_id INTEGER, "
+            "date DATE NOT NULL, amount NUMERIC(12, 2) NOT NULL, category VARCHAR(64), description VARCHAR(512))"
+        ))
+        conn.execute(text(
+            "CREATE TABLE daily_rollups (user_id INTEGER, account_id INTEGER, date DATE, category VARCHAR(64), "
+            "txn_count INTEGER, PRIMARY KEY (user_id, account_id, date, category))"
+        ))
+        conn.execute(text("INSERT INTO users (id, email, hashed_password) VALUES (1, 'old@example.com', 'x')"))
+        conn.execute(text(
+            "INSERT INTO accounts (id, user_id, name, currency, type, mask, balance) "
+            "VALUES (1, 1, 'Old', 'USD', 'checking', '0001', 0)"
+        ))
+        conn.execute(text(
+            "INSERT INTO transactions (user_id, account_id, date, amount, category, description) VALUES "
+            "(1, 1, '2024-01-01', -3.00, 'groceries', 'SuperMart groceries'), "
+            "(1, 1, '2024-01-02', -4.00, 'groceries', 'SuperMart groceries'), "
+            "(1, 1, '2024-01-02', 100.00, 'salary', NULL), "
+            "(1, 1, '2024-01-03', -1.00, NULL, 'Cash')"
+        ))
+    migrate(eng)
+    columns = {c["name"] for c in inspect(eng).get_columns("transactions")}
+    assert {"category_id", "merchant_id"} <= columns and not {"category", "description"} & columns
+    with Session(eng) as db:
+        rows = [(t.category, t.description) for t in db.query(Transaction).order_by(Transaction.id)]
+        assert rows == [("groceries", "SuperMart groceries")] * 2 + [("salary", None), (None, "Cash")]
+        assert {c.name: c.pfc_primary for c in db.query(Category)} == {
+            "groceries": "FOOD_AND_DRINK", "salary": "INCOME_SALARY",
+        }
+        assert db.query(Merchant).count() == 2
+        buckets = sorted((str(r.date), r.category_id, r.txn_count) for r in db.query(DailyRollup))
+        groceries = db.query(Category.id).filter(Category.name == "groceries").scalar()
+        assert ("2024-01-02", groceries, 1) in buckets and ("2024-01-03", 0, 1) in buckets and len(buckets) == 4
+    eng.dispose()
@@ -0,0 +1,33 @@
+from app.services.fake_plaid import link_fake_account
+
+def test_cursor_walk_matches_offset_listing(client, db, user):
+    link_fake_account(db, user.id, username="pager_checking", account_type="checking")
+    everything = client.get("/transactions", params={"limit": 1000}).json()
+    assert len(everything) > 20
+
+    seen, cursor, pages = [], None, []
+    while True:
+        r = client.get("/transactions", params={"limit": 7, **({"cursor": cursor} if cursor else {})})
+        pages.append(r)
+        seen += [t["id"] for t in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == [t["id"] for t in everything]
+
+    back = client.get("/transactions", params={"limit": 7, "cursor": pages[2].headers["X-Prev-Cursor"]})
+    assert back.json() == pages[1].json()
+    assert client.get("/transactions", params={"cursor": "garbage"}).status_code == 400
+
+def test_plaid_cursor_carries_estimated_total(client, db, user):
+    account = link_fake_account(db, user.id, username="pager_savings", account_type="checking")
+    first = client.get("/fake/plaid/transactions", params={"account_id": account.mask, "limit": 5}).json()
+    assert first["total_is_estimate"] is False and first["next_cursor"]
+
+    second = client.get("/fake/plaid/transactions", params={
+        "account_id": account.mask, "limit": 5, "cursor": first["next_cursor"]
+    }).json()
+    assert second["total_is_estimate"] is True
+    assert second["total_transactions"] == first["total_transactions"]
+    assert {t["transaction_id"] for t in first["transactions"]}.isdisjoint(
+        t["transaction_id"] for t in second["transactions"])
@@ -0,0 +1,60 @@
+from sqlalchemy import event
+from app.core.cache import TTLCache
+from app.core.principals import principal_cache
+from app.models.user import User
+
+def _user_queries(app_engine, client, path):
+    engine = getattr(app_engine, "sync_engine", app_engine)
+    seen = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return response, seen
+
+def test_repeat_requests_skip_user_lookup(client, app_engine):
+    first, seen = _user_queries(app_engine, client, "/users/me")
+    assert first.status_code == 200 and len(seen) == 1
+    hits = principal_cache.hits
+
+    second, seen = _user_queries(app_engine, client, "/users/me")
+    assert second.json() == first.json()
+    assert seen == []
+    assert principal_cache.hits == hits + 1
+    assert client.get("/debug/caches").json()["principals"]["hits"] >= 1
+
+def test_user_changes_invalidate_cached_principal(client, db, user):
+    assert client.get("/users/me").json()["full_name"] == "Fixture User"
+    user.full_name = "Renamed User"
+    db.commit()
+    assert client.get("/users/me").json()["full_name"] == "Renamed User"
+
+    db.query(User).filter(User.id == user.id).update({"email": "bulk@example.com"})
+    db.commit()
+    assert client.get("/users/me").json()["email"] == "bulk@example.com"
+
+    db.delete(user)
+    db.commit()
+    assert client.get("/users/me").status_code == 401
+
+def test_ttl_cache_expiry_and_lru_bound():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None and cache.get("c") == 3
+    cache.set("d", 4, ttl=1)
+    now[0] = 5
+    assert cache.get("d") is None and cache.get("c") == 3
+    now[0] = 11
+    assert cache.get("c") is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expirations"], stats["hits"]) == (2, 2, 3)
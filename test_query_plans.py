@@ -0,0 +1,106 @@
+"""
+Query-plan regression suite: every statement a router issues must reach the
+large tables through an index. Fails when EXPLAIN QUERY PLAN reports a full
+SCAN of one of them.
+"""
+import re
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event
+from app.services.fake_plaid import link_fake_account
+
+WATCHED_TABLES = (
+    "transactions", "accounts", "daily_rollups", "users", "transaction_changes", "pluto_scores",
+    "gemini_insights", "data_versions", "categories", "merchants", "jobs",
+)
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(WATCHED_TABLES)})\b")
+
+def _requests(account_id, mask):
+    today = date.today()
+    return [
+        ("get", "/users/me", {}),
+        ("get", "/accounts", {}),
+        ("post", "/accounts", {"json": {"name": "Plan", "mask": "7777"}}),
+        ("post", "/transactions", {"json": {
+            "account_id": account_id, "date": today.isoformat(), "amount": "-12.50", "category": "dining"
+        }}),
+        ("get", "/transactions", {"params": {"limit": 5, "include_total": True}}),
+        ("get", "/transactions", {"params": {
+            "account_id": account_id, "category": "groceries",
+            "from": (today - timedelta(days=60)).isoformat(), "to": today.isoformat(),
+        }}),
+        ("get", "/fake/plaid/transactions", {"params": {"account_id": mask, "limit": 5}}),
+        ("get", "/fake/plaid/transactions/sync", {"params": {"count": 5}}),
+        ("get", "/transactions/export", {"params": {"account_id": account_id, "from": (today - timedelta(days=30)).isoformat()}}),
+        ("post", "/transactions/bulk", {
+            "content": f'{{"account_id": {account_id}, "date": "{today.isoformat()}", "amount": "-3.00", '
+                       f'"category": "coffee", "description": "Plan Cafe"}}\n',
+            "headers": {"Content-Type": "application/x-ndjson"},
+        }),
+        ("post", "/accounts/plaid/transactions/get", {"params": {"account_id": mask, "count": 5}}),
+        ("get", "/insights/spending", {}),
+        ("get", "/insights/mathematical-summary", {"params": {"account_id": account_id}}),
+        ("get", "/insights/trend-analysis", {}),
+        ("get", "/insights/financial-summary", {}),
+        ("get", "/insights/pluto-score", {}),
+        ("get", "/insights/dashboard", {}),
+        ("get", "/insights/series", {"params": {"bucket": "week", "group_by": "category"}}),
+        ("get", "/insights/series", {"params": {"metric": "net", "group_by": "account"}}),
+        ("get", "/insights/pluto-score", {"params": {"live": True}}),
+        ("get", "/insights/gemini-insights", {}),
+        ("post", "/insights/gemini-insights/refresh", {}),
+        ("post", "/accounts/link", {"json": {
+            "username": "planlinker", "password": "x", "account_type": "savings"
+        }}),
+    ]
+
+@pytest.fixture
+def captured(app_engine):
+    statements = []
+    target = getattr(app_engine, "sync_engine", app_engine)
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if not executemany and verb in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    event.listen(target, "before_cursor_execute", _capture)
+    yield statements
+    event.remove(target, "before_cursor_execute", _capture)
+
+def _full_scans(engine, statement, parameters):
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [row[-1] for row in plan if FULL_SCAN.match(row[-1])]
+
+def test_router_queries_use_indexes(client, db, user, engine, captured):
+    account = link_fake_account(db, user.id, username="plan_checking", account_type="checking")
+    requests = _requests(account.id, account.mask)
+    captured.clear()
+
+    failures = []
+
+    def check(method, path, label=None, **kwargs):
+        start = len(captured)
+        response = getattr(client, method)(path, **kwargs)
+        assert response.status_code < 400, (path, response.text)
+        for statement, parameters in captured[start:]:
+            for scan in _full_scans(engine, statement, parameters):
+                failures.append(f"{method.upper()} {label or path}: {scan}\n    {statement}")
+        return response
+
+    for method, path, kwargs in requests:
+        check(method, path, **kwargs)
+
+    page = check("get", "/fake/plaid/transactions/sync", params={"count": 500}).json()
+    check("get", "/fake/plaid/transactions/sync", "/fake/plaid/transactions/sync?cursor=",
+          params={"cursor": page["next_cursor"]})
+    job = client.post("/insights/gemini-insights/refresh").json()["job"]
+    check("get", f"/jobs/{job['id']}", "/jobs/{id}")
+    txn = client.post("/transactions", json={"account_id": account.id, "date": "2024-01-01", "amount": "-1.00"}).json()
+    check("delete", f"/transactions/{txn['id']}", "/transactions/{id}")
+    doomed = client.post("/accounts", json={"name": "Doomed", "mask": "0000"}).json()
+    check("delete", f"/accounts/{doomed['id']}", "/accounts/{id}")
+
+    assert captured, "no statements captured"
+    assert not failures, "Full table scans:\n" + "\n".join(failures)
@@ -0,0 +1,37 @@
+import json
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.core.responses import fast_json
+from app.schemas.plaid_fake import PlaidTransactionsGetResponse
+from app.schemas.transaction import TransactionRead
+from app.services.fake_plaid import link_fake_account, plaidish_transactions_get
+
+def _legacy(content, model) -> bytes:
+    """What `response_model` does: validate again, jsonable_encoder, stdlib json."""
+    adapter = TypeAdapter(model)
+    value = adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json")
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")).encode()
+
+def test_fast_json_matches_response_model_encoding(db, user):
+    account = link_fake_account(db, user.id, username="fast_checking", account_type="checking")
+    page = plaidish_transactions_get(db, user.id, account_id_label=account.mask, limit=50)
+    assert page.transactions
+    assert json.loads(fast_json(page).body) == json.loads(_legacy(page, PlaidTransactionsGetResponse))
+
+    rows = [TransactionRead(id=t.transaction_id.rsplit("_", 1)[1], account_id=account.id, date=t.date,
+                            amount=str(t.amount), description=t.name) for t in page.transactions]
+    assert fast_json(rows).body == _legacy(rows, list[TransactionRead])
+
+def test_routes_keep_status_and_headers(client, db, user):
+    account = client.post("/accounts", json={"name": "Everyday"})
+    assert account.status_code == 201 and account.json()["balance"] == "0.00"
+
+    created = client.post("/transactions", json={
+        "account_id": account.json()["id"], "date": "2024-02-01", "amount": "-3.10", "description": "Tea",
+    })
+    assert created.status_code == 201 and created.json()["amount"] == "-3.10"
+
+    listed = client.get("/transactions", params={"include_total": True, "limit": 1})
+    assert listed.headers["content-type"] == "application/json"
+    assert listed.headers["x-total-count"] == "1" and "etag" in listed.headers
+    assert listed.json() == [created.json()]
@@ -0,0 +1,83 @@
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy.orm import sessionmaker
+from app.models.account import Account
+from app.models.daily_rollup import DailyRollup
+from app.models.transaction import Transaction
+from app.services import rollups
+from app.services.fake_plaid import link_fake_account
+
+def _snapshot(db, user_id):
+    rows = db.query(DailyRollup).filter(DailyRollup.user_id == user_id).all()
+    return sorted(
+        (r.account_id, r.date, r.category_id, r.txn_count,
+         float(r.income_total), r.income_count, float(r.expense_total), r.expense_count,
+         None if r.expense_min is None else float(r.expense_min),
+         None if r.expense_max is None else float(r.expense_max))
+        for r in rows
+    )
+
+def test_incremental_rollups_match_rebuild(db, user):
+    for kind in ("checking", "savings", "trading"):
+        link_fake_account(db, user.id, username=f"rollup_{kind}", account_type=kind)
+    incremental = _snapshot(db, user.id)
+    assert incremental
+
+    rollups.rebuild(db, user_id=user.id)
+    db.commit()
+    assert _snapshot(db, user.id) == incremental
+
+def test_create_and_delete_keep_rollups_in_step(client, db, user):
+    account = client.post("/accounts", json={"name": "Manual", "mask": "9999"}).json()
+    day = (date.today() - timedelta(days=2)).isoformat()
+    for amount in ("-10.00", "-30.00", "250.00"):
+        r = client.post("/transactions", json={
+            "account_id": account["id"], "date": day, "amount": amount, "category": "misc"
+        })
+        assert r.status_code == 201
+
+    bucket = db.query(DailyRollup).filter(DailyRollup.account_id == account["id"]).one()
+    assert (bucket.txn_count, bucket.expense_count, bucket.income_count) == (3, 2, 1)
+    assert float(bucket.expense_total) == 40.0
+    assert (float(bucket.expense_min), float(bucket.expense_max)) == (10.0, 30.0)
+
+    spending = client.get("/insights/spending", params={"days": 30}).json()
+    assert spending["total_spending"] == 40.0
+    assert spending["mathematical_insights"]["median"] == 20.0
+    assert spending["mathematical_insights"]["income_total"] == 250.0
+
+    assert client.delete(f"/accounts/{account['id']}").status_code == 200
+    db.expire_all()
+    assert db.query(DailyRollup).filter(DailyRollup.account_id == account["id"]).count() == 0
+
+def test_concurrent_writers_share_a_bucket(engine, db, user):
+    account = Account(user_id=user.id, name="Busy", mask="8888", balance=0)
+    db.add(account); db.commit()
+    day = date.today()
+    sessions = sessionmaker(bind=engine)
+    start = threading.Barrier(8)
+
+    def write(i):
+        with sessions() as s:
+            row = dict(user_id=user.id, account_id=account.id, date=day, amount=Decimal(f"-{i + 1}.00"))
+            start.wait()
+            # The bucket is the first thing each writer touches, so every read of it races
+            rollups.apply_transactions(s, [row])
+            s.add(Transaction(**row))
+            s.commit()
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    db.expire_all()
+    bucket = db.query(DailyRollup).filter(DailyRollup.account_id == account.id).one()
+    assert (bucket.txn_count, bucket.expense_count) == (8, 8)
+    assert (float(bucket.expense_total), float(bucket.expense_min), float(bucket.expense_max)) == (36.0, 1.0, 8.0)
+    assert bucket.income_min is None
+    concurrent = _snapshot(db, user.id)
+    rollups.rebuild(db, user_id=user.id)
+    db.commit()
+    assert _snapshot(db, user.id) == concurrent
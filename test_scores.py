@@ -0,0 +1,70 @@
+import threading
+from datetime import date, timedelta
+from sqlalchemy.orm import sessionmaker
+from app.core.conditional import response_cache
+from app.models.pluto_score import StoredPlutoScore
+from app.models.user import User
+from app.services import scores
+from app.services.fake_plaid import link_fake_account
+
+def test_refresh_only_touches_stale_users(client, db, user):
+    other = User(email="scores@example.com", hashed_password="x")
+    db.add(other); db.commit()
+    account = link_fake_account(db, user.id, username="scores_checking", account_type="checking")
+    link_fake_account(db, other.id, username="scores_savings", account_type="savings")
+
+    assert scores.refresh(db, batch_size=1) == {"refreshed": 2, "batches": 2}
+    assert scores.refresh(db)["refreshed"] == 0
+    dashboard = client.get("/insights/dashboard", params={"fields": "score"}).json()["score"]
+    assert scores.stored(db, user.id, date.today()).model_dump() == dashboard
+
+    client.post("/transactions", json={
+        "account_id": account.id, "date": date.today().isoformat(), "amount": "250.00", "category": "salary",
+    })
+    assert scores.stored(db, user.id, date.today()) is None
+    assert scores.refresh(db)["refreshed"] == 1
+    assert scores.stored(db, user.id, date.today()).income_30d == dashboard["income_30d"] + 250
+
+    # The window moves every day, so tomorrow every score is stale
+    assert scores.refresh(db, today=date.today() + timedelta(days=1))["refreshed"] == 2
+    assert scores.refresh(db, everyone=True)["refreshed"] == 2
+
+def test_endpoint_serves_the_stored_score(client, db, user):
+    link_fake_account(db, user.id, username="scores_endpoint", account_type="checking")
+    before = scores.score_stats.stats()
+
+    first = client.get("/insights/pluto-score").json()  # nothing stored yet: computed and stored
+    assert db.get(StoredPlutoScore, user.id).score == first["score"]
+    db.query(StoredPlutoScore).update({"score": 42.0})
+    db.commit()
+    response_cache.clear()
+    assert client.get("/insights/pluto-score").json()["score"] == 42.0
+    assert client.get("/insights/pluto-score", params={"live": True}).json() == first
+    db.expire_all()
+    assert db.get(StoredPlutoScore, user.id).score == first["score"]
+
+    after = client.get("/debug/caches").json()["pluto_scores"]
+    assert after["stored"] - before["stored"] == 1 and after["live"] - before["live"] == 2
+
+def test_concurrent_cold_requests_store_one_row(engine, db, user):
+    link_fake_account(db, user.id, username="scores_race", account_type="checking")
+    sessions = sessionmaker(bind=engine)
+    start = threading.Barrier(6)
+    results, errors = [], []
+
+    def request():
+        with sessions() as s:
+            start.wait()
+            try:
+                results.append(scores.score(s, user.id))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and len(results) == 6 and len({r.score for r in results}) == 1
+    assert db.query(StoredPlutoScore).filter(StoredPlutoScore.user_id == user.id).count() == 1
+    assert scores.stored(db, user.id, date.today()) == results[0]
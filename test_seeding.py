@@ -0,0 +1,72 @@
+from datetime import date
+from sqlalchemy import text
+from app.db.init_db import init_db
+from app.services import seeding
+
+def _seed(tmp_path, name, workers):
+    url = f"sqlite:///{tmp_path / name}"
+    engine = seeding.make_engine(url)
+    init_db(engine)
+    plan = seeding.plan_seed(engine, users=5, accounts_per_user=3, months=4, seed=42,
+                             as_of=date(2025, 6, 15), password_hash="x")
+    stats = seeding.seed_database(url, plan, workers=workers, batch_users=2)
+    return engine, stats
+
+def _snapshot(engine):
+    with engine.connect() as conn:
+        return (
+            conn.execute(text("SELECT id, email, full_name FROM users ORDER BY id")).all(),
+            conn.execute(text("SELECT * FROM accounts ORDER BY id")).all(),
+            # Lookup ids follow insert order, which varies with the worker count; compare names
+            conn.execute(text(
+                "SELECT account_id, date, amount, c.name, m.name FROM transactions t "
+                "LEFT JOIN categories c ON c.id = t.category_id LEFT JOIN merchants m ON m.id = t.merchant_id "
+                "ORDER BY account_id, date, amount, m.name"
+            )).all(),
+        )
+
+def test_seed_is_deterministic_across_worker_counts(tmp_path):
+    serial, stats = _seed(tmp_path, "serial.db", workers=1)
+    parallel, _ = _seed(tmp_path, "parallel.db", workers=2)
+
+    assert stats.users == 5 and stats.accounts == 15 and stats.transactions > 0
+    assert _snapshot(serial) == _snapshot(parallel)
+
+    with serial.connect() as conn:
+        mismatched = conn.execute(text(
+            "SELECT a.id FROM accounts a JOIN transactions t ON t.account_id = a.id "
+            "GROUP BY a.id HAVING ROUND(SUM(t.amount), 2) != ROUND(a.balance, 2)"
+        )).all()
+        rolled = conn.execute(text("SELECT SUM(txn_count) FROM daily_rollups")).scalar()
+    assert mismatched == []
+    assert rolled == stats.transactions
+    serial.dispose()
+    parallel.dispose()
+
+def test_seed_cli_uses_the_sync_driver_for_async_urls(tmp_path):
+    from app.cli import seed_main
+
+    path = tmp_path / "async.db"
+    seed_main(["--users", "3", "--accounts", "1", "--months", "1", "--workers", "1",
+               "--database-url", f"sqlite+aiosqlite:///{path}"])
+    engine = seeding.make_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM users")).scalar() == 3
+    engine.dispose()
+
+def test_ids_after_a_seed_do_not_collide(tmp_path):
+    from app.models.account import Account
+    from app.models.user import User
+    from sqlalchemy.orm import Session
+
+    engine, stats = _seed(tmp_path, "next.db", workers=1)
+    with Session(bind=engine) as db:
+        user = User(email="after-seed@example.com", hashed_password="x")
+        db.add(user); db.flush()
+        account = Account(user_id=user.id, name="After seed")
+        db.add(account); db.commit()
+        assert (user.id, account.id) == (stats.users + 1, stats.accounts + 1)
+        plan = seeding.plan_seed(engine, users=2, accounts_per_user=1, months=1, seed=1,
+                                 as_of=date(2025, 6, 15), password_hash="x")
+    assert (plan.first_user_id, plan.first_account_id) == (user.id + 1, account.id + 1)
+    engine.dispose()
@@ -0,0 +1,64 @@
+from datetime import date
+from app.analytics.series import bucket_starts
+from app.services.fake_plaid import link_fake_account
+
+def _post(client, account_id, day, amount, category=None):
+    r = client.post("/transactions", json={
+        "account_id": account_id, "date": day, "amount": amount, "category": category,
+    })
+    assert r.status_code == 201
+
+def test_bucket_starts():
+    assert bucket_starts(date(2024, 3, 15), "month", 3) == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+    # 2024-03-15 is a Friday; weeks start on Monday
+    assert bucket_starts(date(2024, 3, 15), "week", 2) == [date(2024, 3, 4), date(2024, 3, 11)]
+    assert bucket_starts(date(2024, 3, 1), "day", 2) == [date(2024, 2, 29), date(2024, 3, 1)]
+
+def test_monthly_series_is_dense_and_grouped(client):
+    checking = client.post("/accounts", json={"name": "Checking", "mask": "1111"}).json()["id"]
+    card = client.post("/accounts", json={"name": "Card", "mask": "2222"}).json()["id"]
+    _post(client, checking, "2024-01-05", "-10.00", "groceries")
+    _post(client, checking, "2024-01-20", "-5.50", "dining")
+    _post(client, card, "2024-03-31", "-20.00", "groceries")
+    _post(client, checking, "2024-03-01", "1000.00", "salary")
+    _post(client, card, "2024-04-01", "-99.00", "groceries")  # after end_date
+
+    params = {"bucket": "month", "periods": 4, "end_date": "2024-03-31"}
+    spend = client.get("/insights/series", params=params).json()
+    assert spend["buckets"] == ["2023-12-01", "2024-01-01", "2024-02-01", "2024-03-01"]
+    assert spend["totals"] == [0.0, 15.5, 0.0, 20.0] and spend["series"] == []
+
+    by_category = client.get("/insights/series", params={**params, "group_by": "category"}).json()
+    assert [(s["name"], s["values"]) for s in by_category["series"]] == [
+        ("groceries", [0.0, 10.0, 0.0, 20.0]),
+        ("dining", [0.0, 5.5, 0.0, 0.0]),
+    ]
+
+    net = client.get("/insights/series", params={**params, "metric": "net", "group_by": "account"}).json()
+    assert [(s["id"], s["name"], s["total"]) for s in net["series"]] == [(checking, "Checking", 984.5), (card, "Card", -20.0)]
+    assert net["totals"] == [0.0, -15.5, 0.0, 980.0]
+
+def test_weekly_and_daily_buckets(client):
+    account = client.post("/accounts", json={"name": "Weekly", "mask": "3333"}).json()["id"]
+    # Sunday 2024-03-10 belongs to the week of Monday 2024-03-04
+    _post(client, account, "2024-03-10", "-1.00")
+    _post(client, account, "2024-03-11", "-2.00")
+    _post(client, account, "2024-03-11", "50.00")
+    weekly = client.get("/insights/series", params={
+        "bucket": "week", "periods": 2, "end_date": "2024-03-15", "group_by": "category",
+    }).json()
+    assert weekly["buckets"] == ["2024-03-04", "2024-03-11"] and weekly["totals"] == [1.0, 2.0]
+    assert [(s["name"], s["values"]) for s in weekly["series"]] == [("Other", [1.0, 2.0])]
+
+    daily = client.get("/insights/series", params={
+        "bucket": "day", "metric": "income", "periods": 3, "end_date": "2024-03-12",
+    }).json()
+    assert daily["buckets"] == ["2024-03-10", "2024-03-11", "2024-03-12"] and daily["totals"] == [0.0, 50.0, 0.0]
+
+def test_series_matches_the_spend_report(client, db, user):
+    link_fake_account(db, user.id, username="series_checking", account_type="checking")
+    daily = client.get("/insights/series", params={"bucket": "day", "periods": 31}).json()
+    spending = client.get("/insights/spending", params={"days": 30}).json()
+    assert round(sum(daily["totals"]), 2) == spending["total_spending"]
+    assert client.get("/insights/series", params={"bucket": "year"}).status_code == 422
+    assert client.get("/insights/series", params={"periods": 0}).status_code == 422
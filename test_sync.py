@@ -0,0 +1,119 @@
+import base64
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.db.migrations import migrate
+from app.models.transaction import Transaction
+from app.models.transaction_change import TransactionChange
+from app.services import changes, ledger
+from app.services.fake_plaid import link_fake_account
+
+def _sync_all(client, cursor=None, count=50):
+    added, modified, removed, calls = {}, {}, set(), 0
+    while True:
+        params = {"count": count, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/fake/plaid/transactions/sync", params=params).json()
+        calls += 1
+        added.update((t["transaction_id"], t) for t in page["added"])
+        modified.update((t["transaction_id"], t) for t in page["modified"])
+        removed.update(r["transaction_id"] for r in page["removed"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return added, modified, removed, cursor, calls
+
+def test_initial_sync_then_deltas(client, db, user):
+    checking = link_fake_account(db, user.id, username="sync_checking", account_type="checking")
+    total = db.query(Transaction).count()
+    added, _, removed, cursor, calls = _sync_all(client)
+    assert len(added) == total and not removed and calls == -(-total // 50)
+
+    # Nothing changed: an empty page and the same position
+    idle = client.get("/fake/plaid/transactions/sync", params={"cursor": cursor}).json()
+    assert idle["added"] == idle["modified"] == idle["removed"] == [] and idle["next_cursor"] == cursor
+
+    created = client.post("/transactions", json={
+        "account_id": checking.id, "date": "2024-05-01", "amount": "-9.99", "description": "Book",
+    }).json()
+    savings = link_fake_account(db, user.id, username="sync_savings", account_type="savings")
+    new_rows = db.query(Transaction).filter(Transaction.account_id == savings.id).count()
+
+    added, _, removed, cursor, _ = _sync_all(client, cursor)
+    assert len(added) == new_rows + 1 and not removed
+    assert f"tx_{checking.mask}_{created['id']}" in added
+
+    client.delete(f"/accounts/{checking.id}")
+    added, _, removed, cursor, _ = _sync_all(client, cursor, count=500)
+    assert not added and len(removed) == total + 1
+    assert all(r.startswith(f"tx_{checking.mask}_") for r in removed)
+
+def test_changes_collapse_within_a_page(client, db, user):
+    account = link_fake_account(db, user.id, username="collapse_checking", account_type="checking")
+    cursor = _sync_all(client, count=500)[3]
+    txn = db.query(Transaction).filter(Transaction.account_id == account.id).first()
+    ledger.bump(db, user.id)
+    changes.record(db, user.id, "modified", Transaction.id == txn.id)
+    changes.record(db, user.id, "modified", Transaction.id == txn.id)
+    db.commit()
+
+    page = client.get("/fake/plaid/transactions/sync", params={"cursor": cursor}).json()
+    assert [t["transaction_id"] for t in page["modified"]] == [f"tx_{account.mask}_{txn.id}"]
+    assert page["added"] == [] and page["has_more"] is False
+
+def test_bulk_import_is_logged(client, db, user):
+    account = link_fake_account(db, user.id, username="bulk_checking", account_type="checking")
+    cursor = _sync_all(client, count=500)[3]
+    body = b"".join(
+        b'{"account_id": %d, "date": "2024-06-%02d", "amount": "-1.00"}\n' % (account.id, day) for day in range(1, 8)
+    )
+    client.post("/transactions/bulk", content=body)
+    added = _sync_all(client, cursor)[0]
+    assert len(added) == 7
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/fake/plaid/transactions/sync", params={"cursor": "bm90LWpzb24"}).status_code == 400
+
+def test_late_commit_with_an_earlier_seq_is_not_skipped(client, db, user):
+    account = link_fake_account(db, user.id, username="late_checking", account_type="checking")
+    cursor = _sync_all(client, count=500)[3]
+    first, second = db.query(Transaction).filter(Transaction.account_id == account.id).limit(2).all()
+    head = changes.head(db, user.id)
+    # seq is drawn at insert time: a writer that drew head.seq + 1 commits after one that drew head.seq + 2
+    db.add(TransactionChange(seq=head.seq + 2, version=head.version + 1, user_id=user.id, account_id=account.id,
+                             account_label=account.mask, transaction_id=first.id, kind="removed"))
+    db.commit()
+    page = client.get("/fake/plaid/transactions/sync", params={"cursor": cursor}).json()
+    assert [r["transaction_id"] for r in page["removed"]] == [f"tx_{account.mask}_{first.id}"]
+
+    db.add(TransactionChange(seq=head.seq + 1, version=head.version + 2, user_id=user.id, account_id=account.id,
+                             account_label=account.mask, transaction_id=second.id, kind="removed"))
+    db.commit()
+    page = client.get("/fake/plaid/transactions/sync", params={"cursor": page["next_cursor"]}).json()
+    assert [r["transaction_id"] for r in page["removed"]] == [f"tx_{account.mask}_{second.id}"]
+
+def test_seq_only_cursors_are_still_accepted(client, db, user):
+    link_fake_account(db, user.id, username="legacy_checking", account_type="checking")
+    legacy = base64.urlsafe_b64encode(b'{"s":0}').rstrip(b"=").decode()
+    page = client.get("/fake/plaid/transactions/sync", params={"cursor": legacy, "count": 500}).json()
+    assert page["added"] and not page["has_more"]
+
+def test_migration_adds_versions(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=eng)
+    with eng.begin() as conn:
+        conn.execute(text("DROP TABLE transaction_changes"))
+        conn.execute(text(
+            "CREATE TABLE transaction_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, "
+            "account_id INTEGER NOT NULL, account_label VARCHAR(8) NOT NULL, transaction_id INTEGER NOT NULL, "
+            "kind VARCHAR(8) NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX ix_transaction_changes_user_seq ON transaction_changes (user_id, seq)"))
+        conn.execute(text(
+            "INSERT INTO transaction_changes (user_id, account_id, account_label, transaction_id, kind) "
+            "VALUES (1, 1, '0001', 7, 'added')"
+        ))
+    migrate(eng)
+    indexes = {i["name"] for i in inspect(eng).get_indexes("transaction_changes")}
+    assert indexes == {"ix_transaction_changes_user_version"}
+    with Session(eng) as db:
+        assert changes.head(db, 1) == changes.SyncCursor(0, 1)
+    eng.dispose()